@@ -0,0 +1,272 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Annotated, Optional
+
+import typer
+from sqlalchemy import create_engine
+
+from openalex.synthetic import SnapshotSize, write_snapshot
+from openalex.tables import SCHEMA
+
+SCRIPTS_DIR = Path(__file__).parent
+SCHEMA_FILES = {
+    "duckdb": SCRIPTS_DIR / "duckdb/openalex-duckdb-schema.sql",
+    "postgresql": SCRIPTS_DIR / "postgres/openalex-pg-schema.sql",
+}
+
+
+@dataclass
+class StageResult:
+    stage: str
+    seconds: float
+    records: int
+    bytes_read: int
+    # of the largest process of the stage, in MB
+    peak_rss: float
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_read / 2**20 / self.seconds if self.seconds else 0
+
+
+def snapshot_bytes(snapshot_dir: Path, entity: str = "*") -> int:
+    return sum(
+        path.stat().st_size for path in snapshot_dir.glob(f"data/{entity}/*/*.gz")
+    )
+
+
+def snapshot_records(snapshot_dir: Path, entity: str = "*") -> int:
+    return sum(
+        json.loads(path.read_text())["meta"]["record_count"]
+        for path in snapshot_dir.glob(f"data/{entity}/manifest")
+    )
+
+
+def run_entities(
+    stage: str,
+    command: list[str],
+    snapshot_dir: Path,
+    cwd: Path,
+    log_file: Path,
+) -> list[StageResult]:
+    """Run a script once per entity with --entities, returning the result of
+    every entity, e.g. flatten_works for stage flatten, followed by their
+    total"""
+
+    name, _, suffix = stage.partition(" ")
+    results = []
+    for entity in SCHEMA:
+        result = run_stage(
+            f"{name}_{entity} {suffix}".strip(),
+            [*command, "--entities", entity],
+            cwd,
+            log_file,
+        )
+        result.records = snapshot_records(snapshot_dir, entity)
+        result.bytes_read = snapshot_bytes(snapshot_dir, entity)
+        results.append(result)
+
+    total = StageResult(
+        stage,
+        sum(result.seconds for result in results),
+        sum(result.records for result in results),
+        sum(result.bytes_read for result in results),
+        max(result.peak_rss for result in results),
+    )
+    return [*results, total]
+
+
+def run_stage(stage: str, command: list[str], cwd: Path, log_file: Path) -> StageResult:
+    """Run a script, returning its time and peak RSS, with records and bytes
+    left to the caller"""
+
+    with open(log_file, "a") as log:
+        log.write(f"$ {' '.join(command)}\n")
+        log.flush()
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=cwd, stdout=log, stderr=log)
+        # the rusage of wait4 covers the process and its own children, e.g.
+        # the workers, ru_maxrss being that of the largest of them
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode:
+        # the log goes away with the working directory
+        sys.stderr.write(log_file.read_text())
+        sys.exit(f"{stage} failed with status {process.returncode}")
+    return StageResult(stage, seconds, 0, 0, usage.ru_maxrss / 1024)
+
+
+def create_schema(db_url: str):
+    engine = create_engine(db_url)
+    schema_sql = SCHEMA_FILES[engine.dialect.name].read_text()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(schema_sql)
+    engine.dispose()
+
+
+def print_results(results: list[StageResult]):
+    print(
+        f"{'stage':<32} {'seconds':>9} {'records/s':>11} {'MB/s':>8} {'peak RSS MB':>12}"
+    )
+    for result in results:
+        print(
+            f"{result.stage:<32} {result.seconds:>9.2f} "
+            f"{result.records_per_second:>11.0f} {result.mb_per_second:>8.2f} "
+            f"{result.peak_rss:>12.0f}"
+        )
+
+
+def main(
+    works: Annotated[int, typer.Option(help="works to generate")] = 20_000,
+    authors: Annotated[int, typer.Option(help="authors to generate")] = 10_000,
+    sources: Annotated[int, typer.Option(help="sources to generate")] = 1_000,
+    institutions: Annotated[int, typer.Option(help="institutions to generate")] = 1_000,
+    concepts: Annotated[int, typer.Option(help="concepts to generate")] = 1_000,
+    topics: Annotated[int, typer.Option(help="topics to generate")] = 500,
+    publishers: Annotated[int, typer.Option(help="publishers to generate")] = 500,
+    authorships: Annotated[int, typer.Option(help="authorships per work")] = 6,
+    references: Annotated[int, typer.Option(help="referenced works per work")] = 25,
+    abstract_words: Annotated[int, typer.Option(help="words per abstract")] = 120,
+    partitions: Annotated[
+        int, typer.Option(help="updated_date partitions per entity")
+    ] = 2,
+    files_per_partition: Annotated[
+        int, typer.Option(help="part_*.gz files per partition")
+    ] = 4,
+    seed: Annotated[int, typer.Option(help="seed of the generated records")] = 0,
+    snapshot_dir: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="generate the snapshot there and keep it, or reuse the one found there"
+        ),
+    ] = None,
+    workers: Annotated[int, typer.Option(help="--workers of both scripts")] = 1,
+    parquet: Annotated[
+        bool, typer.Option(help="also time flattening to Parquet files")
+    ] = False,
+    db_url: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help="database to time the import into, repeatable; must not have the "
+            "openalex schema yet. Defaults to a temporary DuckDB file"
+        ),
+    ] = None,
+    json_output: Annotated[
+        Optional[Path], typer.Option(help="also write the results to this JSON file")
+    ] = None,
+):
+    size = SnapshotSize(
+        works=works,
+        authors=authors,
+        topics=topics,
+        concepts=concepts,
+        institutions=institutions,
+        publishers=publishers,
+        sources=sources,
+        authorships=authorships,
+        references=references,
+        abstract_words=abstract_words,
+        partitions=partitions,
+        files_per_partition=files_per_partition,
+        seed=seed,
+    )
+    results = []
+    with tempfile.TemporaryDirectory(prefix="openalex-benchmark-") as work_dir:
+        work_dir = Path(work_dir)
+        log_file = work_dir / "benchmark.log"
+        if snapshot_dir is None:
+            snapshot_dir = work_dir / "snapshot"
+
+        manifest = snapshot_dir / "data" / "works" / "manifest"
+        if manifest.exists():
+            print(f"reusing the snapshot in {snapshot_dir}")
+        else:
+            start = time.perf_counter()
+            records = sum(write_snapshot(str(snapshot_dir), size).values())
+            seconds = time.perf_counter() - start
+            results.append(
+                StageResult(
+                    "generate",
+                    seconds,
+                    records,
+                    snapshot_bytes(snapshot_dir),
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                )
+            )
+
+        # the flattener reads ./openalex-snapshot and writes into ./csv-files
+        (work_dir / "openalex-snapshot").symlink_to(snapshot_dir.absolute())
+        flatten_script = str(SCRIPTS_DIR / "flatten-openalex-jsonl.py")
+        formats = ["csv", "parquet"] if parquet else ["csv"]
+        for format in formats:
+            results += run_entities(
+                f"flatten {format}",
+                [
+                    sys.executable,
+                    flatten_script,
+                    "--format",
+                    format,
+                    "--workers",
+                    str(workers),
+                ],
+                snapshot_dir,
+                work_dir,
+                log_file,
+            )
+
+        for url in db_url or [f"duckdb:///{work_dir}/benchmark.duckdb"]:
+            create_schema(url)
+            results += run_entities(
+                f"load {url.split(':')[0]}",
+                [
+                    sys.executable,
+                    str(SCRIPTS_DIR / "db-import.py"),
+                    str(snapshot_dir.absolute()),
+                    url,
+                    "--workers",
+                    str(workers),
+                ],
+                snapshot_dir,
+                work_dir,
+                log_file,
+            )
+
+    print_results(results)
+    if json_output:
+        json_output.write_text(
+            json.dumps(
+                {
+                    "size": {
+                        key: value
+                        for key, value in asdict(size).items()
+                        if key != "counts"
+                    },
+                    "stages": [
+                        asdict(result)
+                        | {
+                            "records_per_second": result.records_per_second,
+                            "mb_per_second": result.mb_per_second,
+                        }
+                        for result in results
+                    ],
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
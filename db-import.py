@@ -1,840 +1,1354 @@
-import glob
-import gzip
-import json
+import csv
+import io
+import os
+from collections import Counter
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from functools import partial
 from pathlib import Path
-from typing import Annotated
-from sqlalchemy import Connection, Table, MetaData, Column, create_engine
+from typing import Annotated, Any, Callable, Optional
+from sqlalchemy import (
+    Connection,
+    Dialect,
+    Engine,
+    Table,
+    MetaData,
+    JSON,
+    REAL,
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Text,
+    TypeDecorator,
+    create_engine,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql
+from tqdm import tqdm
 import typer
 
-_metadata = MetaData(schema="openalex")
-table_authors = Table(
-    "authors",
-    _metadata,
-    Column("id"),
-    Column("orcid"),
-    Column("display_name"),
-    Column("display_name_alternatives"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("last_known_institution"),
-    Column("works_api_url"),
-    Column("updated_date"),
-)
-table_author_ids = Table(
-    "authors_ids",
-    _metadata,
-    Column("author_id"),
-    Column("openalex"),
-    Column("orcid"),
-    Column("scopus"),
-    Column("twitter"),
-    Column("wikipedia"),
-    Column("mag"),
-)
-table_counts_by_year = Table(
-    "authors_counts_by_year",
-    _metadata,
-    Column("author_id"),
-    Column("year"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("oa_works_count"),
-)
-table_topics = Table(
-    "topics",
-    _metadata,
-    Column("id"),
-    Column("display_name"),
-    Column("subfield_id"),
-    Column("subfield_display_name"),
-    Column("field_id"),
-    Column("field_display_name"),
-    Column("domain_id"),
-    Column("domain_display_name"),
-    Column("description"),
-    Column("keywords"),
-    Column("works_api_url"),
-    Column("wikipedia_id"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("updated_date"),
-    Column("siblings"),
-)
-table_concepts = Table(
-    "concepts",
-    _metadata,
-    Column("id"),
-    Column("wikidata"),
-    Column("display_name"),
-    Column("level"),
-    Column("description"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("image_url"),
-    Column("image_thumbnail_url"),
-    Column("works_api_url"),
-    Column("updated_date"),
-)
-table_concepts_ancestors = Table(
-    "concepts_ancestors", _metadata, Column("concept_id"), Column("ancestor_id")
-)
-table_concepts_counts_by_year = Table(
-    "concepts_counts_by_year",
-    _metadata,
-    Column("concept_id"),
-    Column("year"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("oa_works_count"),
-)
-table_concepts_ids = Table(
-    "concepts_ids",
-    _metadata,
-    Column("concept_id"),
-    Column("openalex"),
-    Column("wikidata"),
-    Column("wikipedia"),
-    Column("umls_aui"),
-    Column("umls_cui"),
-    Column("mag"),
-)
-# concept_id, related_concept_id, score
-table_concepts_related_concepts = Table(
-    "concepts_related_concepts",
-    _metadata,
-    Column("concept_id"),
-    Column("related_concept_id"),
-    Column("score"),
-)
-# id, ror, display_name, country_code, type, homepage_url, image_url, image_thumbnail_url, display_name_acronyms, display_name_alternatives, works_count, cited_by_count, works_api_url, updated_date
-table_institutions = Table(
-    "institutions",
-    _metadata,
-    Column("id"),
-    Column("ror"),
-    Column("display_name"),
-    Column("country_code"),
-    Column("type"),
-    Column("homepage_url"),
-    Column("image_url"),
-    Column("image_thumbnail_url"),
-    Column("display_name_acronyms"),
-    Column("display_name_alternatives"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("works_api_url"),
-    Column("updated_date"),
-)
-# institution_id, openalex, ror, grid, wikipedia, wikidata, mag
-table_institutions_ids = Table(
-    "institutions_ids",
-    _metadata,
-    Column("institution_id"),
-    Column("openalex"),
-    Column("ror"),
-    Column("grid"),
-    Column("wikipedia"),
-    Column("wikidata"),
-    Column("mag"),
-)
-# institution_id, city, geonames_city_id, region, country_code, country, latitude, longitude
-table_institutions_geo = Table(
-    "institutions_geo",
-    _metadata,
-    Column("institution_id"),
-    Column("city"),
-    Column("geonames_city_id"),
-    Column("region"),
-    Column("country_code"),
-    Column("country"),
-    Column("latitude"),
-    Column("longitude"),
-)
-# institution_id, associated_institution_id, relationship
-table_institutions_associated_institutions = Table(
-    "institutions_associated_institutions",
-    _metadata,
-    Column("institution_id"),
-    Column("associated_institution_id"),
-    Column("relationship"),
-)
-# institution_id, year, works_count, cited_by_count, oa_works_count
-table_institutions_counts_by_year = Table(
-    "institutions_counts_by_year",
-    _metadata,
-    Column("institution_id"),
-    Column("year"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("oa_works_count"),
-)
-# id, display_name, alternate_titles, country_codes, hierarchy_level, parent_publisher, works_count, cited_by_count, sources_api_url, updated_date
-table_publishers = Table(
-    "publishers",
-    _metadata,
-    Column("id"),
-    Column("display_name"),
-    Column("alternate_titles"),
-    Column("country_codes"),
-    Column("hierarchy_level"),
-    Column("parent_publisher"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("sources_api_url"),
-    Column("updated_date"),
-)
-# publisher_id, year, works_count, cited_by_count, oa_works_count
-table_publishers_counts_by_year = Table(
-    "publishers_counts_by_year",
-    _metadata,
-    Column("publisher_id"),
-    Column("year"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("oa_works_count"),
-)
-# publisher_id, openalex, ror, wikidata
-table_publishers_ids = Table(
-    "publishers_ids",
-    _metadata,
-    Column("publisher_id"),
-    Column("openalex"),
-    Column("ror"),
-    Column("wikidata"),
-)
-# id, issn_l, issn, display_name, publisher, works_count, cited_by_count, is_oa, is_in_doaj, homepage_url, works_api_url, updated_date
-table_sources = Table(
-    "sources",
-    _metadata,
-    Column("id"),
-    Column("issn_l"),
-    Column("issn"),
-    Column("display_name"),
-    Column("publisher"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("is_oa"),
-    Column("is_in_doaj"),
-    Column("homepage_url"),
-    Column("works_api_url"),
-    Column("updated_date"),
-)
-# source_id, openalex, issn_l, issn, mag, wikidata, fatcat
-table_sources_ids = Table(
-    "sources_ids",
-    _metadata,
-    Column("source_id"),
-    Column("openalex"),
-    Column("issn_l"),
-    Column("issn"),
-    Column("mag"),
-    Column("wikidata"),
-    Column("fatcat"),
-)
-# source_id, year, works_count, cited_by_count, oa_works_count
-table_sources_counts_by_year = Table(
-    "sources_counts_by_year",
-    _metadata,
-    Column("source_id"),
-    Column("year"),
-    Column("works_count"),
-    Column("cited_by_count"),
-    Column("oa_works_count"),
-)
-# COPY openalex.works (id, doi, title, display_name, publication_year, publication_date, type, cited_by_count, is_retracted, is_paratext, cited_by_api_url, abstract_inverted_index, language) FROM 'csv-files/works.csv.gz';
-table_works = Table(
-    "works",
-    _metadata,
-    Column("id"),
-    Column("doi"),
-    Column("title"),
-    Column("display_name"),
-    Column("publication_year"),
-    Column("publication_date"),
-    Column("type"),
-    Column("cited_by_count"),
-    Column("is_retracted"),
-    Column("is_paratext"),
-    Column("cited_by_api_url"),
-    Column("abstract_inverted_index"),
-    Column("language"),
-)
-# COPY openalex.works_primary_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) FROM 'csv-files/works_primary_locations.csv.gz';
-table_works_primary_locations = Table(
-    "works_primary_locations",
-    _metadata,
-    Column("work_id"),
-    Column("source_id"),
-    Column("landing_page_url"),
-    Column("pdf_url"),
-    Column("is_oa"),
-    Column("version"),
-    Column("license"),
-)
-# COPY openalex.works_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) FROM 'csv-files/works_locations.csv.gz';
-table_works_locations = Table(
-    "works_locations",
-    _metadata,
-    Column("work_id"),
-    Column("source_id"),
-    Column("landing_page_url"),
-    Column("pdf_url"),
-    Column("is_oa"),
-    Column("version"),
-    Column("license"),
-)
-# COPY openalex.works_best_oa_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) FROM 'csv-files/works_best_oa_locations.csv.gz';
-table_works_best_oa_locations = Table(
-    "works_best_oa_locations",
-    _metadata,
-    Column("work_id"),
-    Column("source_id"),
-    Column("landing_page_url"),
-    Column("pdf_url"),
-    Column("is_oa"),
-    Column("version"),
-    Column("license"),
-)
-# COPY openalex.works_authorships (work_id, author_position, author_id, institution_id, raw_affiliation_string) FROM 'csv-files/works_authorships.csv.gz';
-table_works_authorships = Table(
-    "works_authorships",
-    _metadata,
-    Column("work_id"),
-    Column("author_position"),
-    Column("author_id"),
-    Column("institution_id"),
-    Column("raw_affiliation_string"),
-)
-# COPY openalex.works_biblio (work_id, volume, issue, first_page, last_page) FROM 'csv-files/works_biblio.csv.gz';
-table_works_biblio = Table(
-    "works_biblio",
-    _metadata,
-    Column("work_id"),
-    Column("volume"),
-    Column("issue"),
-    Column("first_page"),
-    Column("last_page"),
-)
-# COPY openalex.works_topics (work_id, topic_id, score) FROM 'csv-files/works_topics.csv.gz';
-table_works_topics = Table(
-    "works_topics", _metadata, Column("work_id"), Column("topic_id"), Column("score")
-)
-# COPY openalex.works_concepts (work_id, concept_id, score) FROM 'csv-files/works_concepts.csv.gz';
-table_works_concepts = Table(
-    "works_concepts",
-    _metadata,
-    Column("work_id"),
-    Column("concept_id"),
-    Column("score"),
-)
-# COPY openalex.works_ids (work_id, openalex, doi, mag, pmid, pmcid) FROM 'csv-files/works_ids.csv.gz';
-table_works_ids = Table(
-    "works_ids",
-    _metadata,
-    Column("work_id"),
-    Column("openalex"),
-    Column("doi"),
-    Column("mag"),
-    Column("pmid"),
-    Column("pmcid"),
-)
-# COPY openalex.works_mesh (work_id, descriptor_ui, descriptor_name, qualifier_ui, qualifier_name, is_major_topic) FROM 'csv-files/works_mesh.csv.gz';
-table_works_mesh = Table(
-    "works_mesh",
-    _metadata,
-    Column("work_id"),
-    Column("descriptor_ui"),
-    Column("descriptor_name"),
-    Column("qualifier_ui"),
-    Column("qualifier_name"),
-    Column("is_major_topic"),
-)
-# COPY openalex.works_open_access (work_id, is_oa, oa_status, oa_url, any_repository_has_fulltext) FROM 'csv-files/works_open_access.csv.gz';
-table_works_open_access = Table(
-    "works_open_access",
-    _metadata,
-    Column("work_id"),
-    Column("is_oa"),
-    Column("oa_status"),
-    Column("oa_url"),
-    Column("any_repository_has_fulltext"),
-)
-# COPY openalex.works_referenced_works (work_id, referenced_work_id) FROM 'csv-files/works_referenced_works.csv.gz';
-table_works_referenced_works = Table(
-    "works_referenced_works", _metadata, Column("work_id"), Column("referenced_work_id")
-)
-# COPY openalex.works_related_works (work_id, related_work_id) FROM 'csv-files/works_related_works.csv.gz';
-table_works_related_works = Table(
-    "works_related_works", _metadata, Column("work_id"), Column("related_work_id")
+from openalex import metrics, profiling, stats
+from openalex.codec import dumps
+from openalex.columns import ColumnType, column_type
+from openalex.tables import SCHEMA, row_getter, select_tables
+from openalex.entities import (
+    decode_author,
+    decode_concept,
+    decode_institution,
+    decode_publisher,
+    decode_source,
+    decode_topic,
+    decode_work,
 )
+from openalex.ids import ID_COLUMNS, int_id
+from openalex.idset import IdSet, add_file_ids, temporary_id_set
+from openalex.reader import read_records
+from openalex.snapshot import entity_partitions
 
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
 
-def load_authors(snapshot_dir: Path, conn: Connection):
-    for jsonl_file_name in glob.glob(
-        str(snapshot_dir.joinpath("data", "authors", "*", "*.gz"))
-    ):
-        with gzip.open(jsonl_file_name, "r") as authors_jsonl:
-            for author_json in authors_jsonl:
-                if not author_json.strip():
-                    continue
 
-                author = json.loads(author_json)
+class JSONText(TypeDecorator):
+    """A json column, bound as the JSON text the loaders encode themselves"""
 
-                if not (author_id := author.get("id")):
-                    continue
+    impl = JSON
+    cache_ok = True
 
-                # authors
-                author["display_name_alternatives"] = json.dumps(
-                    author.get("display_name_alternatives"), ensure_ascii=False
-                )
-                author["last_known_institution"] = (
-                    author.get("last_known_institution") or {}
-                ).get("id")
+    def bind_processor(self, dialect: Dialect):
+        return None
 
-                conn.execute(table_authors.insert(), author)
 
-                # ids
-                if author_ids := author.get("ids"):
-                    author_ids["author_id"] = author_id
-                    conn.execute(table_author_ids.insert(), author_ids)
+SQL_TYPES = {
+    ColumnType.text: Text,
+    ColumnType.integer: Integer,
+    ColumnType.bigint: BigInteger,
+    ColumnType.real: REAL,
+    ColumnType.boolean: Boolean,
+    ColumnType.timestamp: DateTime,
+    ColumnType.json: JSONText,
+}
 
-                # counts_by_year
-                if counts_by_year := author.get("counts_by_year"):
-                    for count_by_year in counts_by_year:
-                        count_by_year["author_id"] = author_id
-                        conn.execute(table_counts_by_year.insert(), count_by_year)
 
+def column(name: str, int_ids: bool = False) -> Column:
+    """A column typed as in the schema files, see openalex/columns.py"""
 
-def load_topics(snapshot_dir: Path, conn: Connection):
-    seen_topic_ids = set()
-    for jsonl_file_name in glob.glob(
-        str(snapshot_dir.joinpath("data", "topics", "*", "*.gz"))
-    ):
-        print(jsonl_file_name)
-        with gzip.open(jsonl_file_name, "r") as topics_jsonl:
-            for line in topics_jsonl:
-                if not line.strip():
-                    continue
-                topic = json.loads(line)
-                topic["keywords"] = "; ".join(topic.get("keywords", ""))
-                if not (topic_id := topic.get("id")) or topic_id in seen_topic_ids:
-                    continue
-                seen_topic_ids.add(topic_id)
-                for key in ("subfield", "field", "domain"):
-                    topic[f"{key}_id"] = topic[key]["id"]
-                    topic[f"{key}_display_name"] = topic[key]["display_name"]
-                    del topic[key]
-
-                if "updated" in topic:
-                    topic["updated_date"] = topic["updated"]
-                    del topic["updated"]
-
-                topic["wikipedia_id"] = topic["ids"].get("wikipedia")
-                del topic["ids"]
-                del topic["created_date"]
-
-                topic["siblings"] = json.dumps(
-                    topic.get("siblings"), ensure_ascii=False
-                )
-                conn.execute(table_topics.insert(), topic)
-
-
-def load_concepts(snapshot_dir: Path, conn: Connection):
-    seen_concept_ids = set()
-
-    for jsonl_file_name in glob.glob(
-        str(snapshot_dir.joinpath("data", "concepts", "*", "*.gz"))
-    ):
-        print(jsonl_file_name)
-        with gzip.open(jsonl_file_name, "r") as concepts_jsonl:
-            for concept_json in concepts_jsonl:
-                if not concept_json.strip():
-                    continue
+    return Column(name, SQL_TYPES[column_type(name, int_ids)]())
 
-                concept = json.loads(concept_json)
 
-                if (
-                    not (concept_id := concept.get("id"))
-                    or concept_id in seen_concept_ids
-                ):
-                    continue
-
-                seen_concept_ids.add(concept_id)
-
-                conn.execute(table_concepts.insert(), concept)
-
-                if concept_ids := concept.get("ids"):
-                    concept_ids["concept_id"] = concept_id
-                    concept_ids["umls_aui"] = json.dumps(
-                        concept_ids.get("umls_aui"), ensure_ascii=False
-                    )
-                    concept_ids["umls_cui"] = json.dumps(
-                        concept_ids.get("umls_cui"), ensure_ascii=False
-                    )
-                    conn.execute(table_concepts_ids.insert(), concept_ids)
-
-                if ancestors := concept.get("ancestors"):
-                    for ancestor in ancestors:
-                        if ancestor_id := ancestor.get("id"):
-                            conn.execute(
-                                table_concepts_ancestors.insert(),
-                                {"concept_id": concept_id, "ancestor_id": ancestor_id},
-                            )
-
-                if counts_by_year := concept.get("counts_by_year"):
-                    for count_by_year in counts_by_year:
-                        count_by_year["concept_id"] = concept_id
-                        conn.execute(
-                            table_concepts_counts_by_year.insert(), count_by_year
-                        )
+_metadata = MetaData(schema="openalex")
 
-                if related_concepts := concept.get("related_concepts"):
-                    for related_concept in related_concepts:
-                        if related_concept_id := related_concept.get("id"):
-                            conn.execute(
-                                table_concepts_related_concepts.insert(),
-                                {
-                                    "concept_id": concept_id,
-                                    "related_concept_id": related_concept_id,
-                                    "score": related_concept.get("score"),
-                                },
-                            )
+# tables holding each entity, the entity's own table first, as listed in
+# openalex/tables.py; the first column of every table is the entity id
+ENTITY_TABLES = {
+    entity: [
+        Table(spec.name, _metadata, *(column(name) for name in spec.columns))
+        for spec in specs
+    ]
+    for entity, specs in SCHEMA.items()
+}
+TABLES = {table.name: table for table in _metadata.tables.values()}
+
+# partitions (updated_date=YYYY-MM-DD directories) of the snapshot already
+# loaded, created by db-import.py itself on first use
+table_loaded_partitions = Table(
+    "loaded_partitions",
+    _metadata,
+    Column("entity", String, primary_key=True),
+    Column("partition_name", String, primary_key=True),
+    Column("loaded_at", DateTime, server_default=func.now()),
+)
+# snapshot files already loaded and committed, to resume an interrupted import
+table_loaded_files = Table(
+    "loaded_files",
+    _metadata,
+    Column("file_name", String, primary_key=True),
+    Column("entity", String),
+    Column("row_count", BigInteger),
+    Column("loaded_at", DateTime, server_default=func.now()),
+)
 
 
-def load_institutions(snapshot_dir: Path, conn: Connection):
-    seen_institution_ids = set()
+class TableBuffer:
+    """Collects rows for a single table and inserts them with one executemany"""
 
-    for jsonl_file_name in glob.glob(
-        str(snapshot_dir.joinpath("data", "institutions", "*", "*.gz"))
+    def __init__(
+        self, conn: Connection, table: Table, batch_size: int, batch_bytes: int
+    ):
+        self.conn = conn
+        self.table = table
+        self.columns = table.columns.keys()
+        self.extract = row_getter(tuple(self.columns))
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.rows: list[dict] = []
+        self.size = 0
+
+    def add(self, row: dict) -> bool:
+        # executemany binds every row against the columns of the first one,
+        # so each row must carry exactly the table's columns
+        row = dict(zip(self.columns, self.extract(row)))
+        self.rows.append(row)
+        self.size += sum(len(value) for value in row.values() if isinstance(value, str))
+
+        return len(self.rows) >= self.batch_size or self.size >= self.batch_bytes
+
+    def flush(self):
+        if self.rows:
+            self.conn.execute(self.table.insert(), self.rows)
+            self.rows = []
+            self.size = 0
+
+
+class CopyBuffer:
+    """Collects rows for a single table as in-memory CSV and streams them
+    to PostgreSQL with COPY FROM STDIN"""
+
+    def __init__(
+        self, conn: Connection, table: Table, batch_size: int, batch_bytes: int
+    ):
+        self.conn = conn
+        self.table = table
+        self.columns = table.columns.keys()
+        self.extract = row_getter(tuple(self.columns))
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.rows = 0
+
+        preparer = conn.dialect.identifier_preparer
+        self.statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+            preparer.format_table(table),
+            ", ".join(preparer.quote(column) for column in self.columns),
+        )
+
+        self.buffer = io.StringIO()
+        # None stays an unquoted empty field, which COPY reads as NULL,
+        # while empty strings are quoted and stay empty strings
+        self.writer = csv.writer(self.buffer, quoting=csv.QUOTE_NOTNULL)
+
+    def add(self, row: dict) -> bool:
+        self.writer.writerow(self.extract(row))
+        self.rows += 1
+
+        return self.rows >= self.batch_size or self.buffer.tell() >= self.batch_bytes
+
+    def flush(self):
+        if self.rows:
+            # make sure conn.commit() covers the rows copied on the raw connection
+            if not self.conn.in_transaction():
+                self.conn.begin()
+
+            self.buffer.seek(0)
+            # psycopg2's own connection, copy_expert() not being in the DBAPI
+            psycopg2_conn: Any = self.conn.connection.dbapi_connection
+            with psycopg2_conn.cursor() as cursor:
+                cursor.copy_expert(self.statement, self.buffer)
+
+            self.buffer.seek(0)
+            self.buffer.truncate()
+            self.rows = 0
+
+
+class ArrowBuffer:
+    """Collects rows for a single table column by column and hands them
+    to DuckDB as one Arrow table"""
+
+    # timestamps and json stay strings, which DuckDB casts on insert
+    arrow_types = {
+        BigInteger: "int64",
+        Integer: "int32",
+        Boolean: "bool_",
+        REAL: "float32",
+    }
+
+    def __init__(
+        self, conn: Connection, table: Table, batch_size: int, batch_bytes: int
+    ):
+        self.conn = conn
+        self.table = table
+        self.columns = table.columns.keys()
+        self.extract = row_getter(tuple(self.columns))
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.values: list[list] = [[] for _ in self.columns]
+        self.rows = 0
+        self.size = 0
+
+        self.types = [
+            getattr(pyarrow, self.arrow_types.get(type(column.type), "string"))()
+            for column in table.columns
+        ]
+
+        preparer = conn.dialect.identifier_preparer
+        self.view_name = f"_arrow_{table.name}"
+        self.statement = "INSERT INTO {} ({}) SELECT * FROM {}".format(
+            preparer.format_table(table),
+            ", ".join(preparer.quote(column) for column in self.columns),
+            self.view_name,
+        )
+
+    def add(self, row: dict) -> bool:
+        for values, value in zip(self.values, self.extract(row)):
+            values.append(value)
+            if isinstance(value, str):
+                self.size += len(value)
+        self.rows += 1
+
+        return self.rows >= self.batch_size or self.size >= self.batch_bytes
+
+    def flush(self):
+        if self.rows:
+            assert pyarrow is not None
+            if not self.conn.in_transaction():
+                self.conn.begin()
+
+            batch = pyarrow.table(
+                [
+                    self.to_array(values, arrow_type)
+                    for values, arrow_type in zip(self.values, self.types)
+                ],
+                names=self.columns,
+            )
+            # duckdb_engine's connection, whose register() isn't in the DBAPI
+            duckdb_conn: Any = self.conn.connection.dbapi_connection
+            duckdb_conn.register(self.view_name, batch)
+            try:
+                duckdb_conn.execute(self.statement)
+            finally:
+                duckdb_conn.unregister(self.view_name)
+
+            self.values = [[] for _ in self.columns]
+            self.rows = 0
+            self.size = 0
+
+    @staticmethod
+    def to_array(values: list, arrow_type):
+        assert pyarrow is not None
+        try:
+            return pyarrow.array(values, type=arrow_type)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            # let duckdb cast whatever pyarrow can't convert on its own
+            return pyarrow.array(
+                [None if value is None else str(value) for value in values],
+                type=pyarrow.string(),
+            )
+
+
+class BatchWriter:
+    """Routes rows to a TableBuffer (or CopyBuffer, ArrowBuffer) per table
+
+    With merge set, rows go to temporary staging tables instead, and flush()
+    merges every staged entity into the entity's tables: stored child rows
+    of the staged entities are replaced in bulk, and the entity rows are
+    upserted when the entity table has a primary key, or else replaced too.
+
+    With int_ids set, OpenAlex ids are written as their number.
+
+    With tables set, only the rows of those tables are built and written, the
+    load_* functions checking writer.tables. Merging still stages the rows of
+    the entity tables, whose ids tell which stored rows to replace.
+    """
+
+    def __init__(
+        self,
+        conn: Connection,
+        batch_size: int,
+        batch_bytes: int,
+        buffer_class: (
+            type[TableBuffer] | type[CopyBuffer] | type[ArrowBuffer]
+        ) = TableBuffer,
+        merge: bool = False,
+        int_ids: bool = False,
+        tables: frozenset[str] | None = None,
     ):
-        print(jsonl_file_name)
-        with gzip.open(jsonl_file_name, "r") as institutions_jsonl:
-            for institution_json in institutions_jsonl:
-                if not institution_json.strip():
+        self.conn = conn
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.buffer_class = buffer_class
+        self.buffers: dict[Table, TableBuffer | CopyBuffer | ArrowBuffer] = {}
+        self.merge = merge
+        self.staging_tables: dict[Table, Table] = {}
+        # tables with rows staged since the last flush
+        self.staged: set[Table] = set()
+        self.int_ids = int_ids
+        self.id_columns: dict[Table, list[str]] = {}
+        self.rows = 0
+        self.table_rows: Counter[str] = Counter()
+        # tables written, and those whose rows are built, which with merge
+        # also include the entity tables
+        self.selected = frozenset(TABLES) if tables is None else tables
+        self.tables = self.selected
+        if merge:
+            self.tables |= {specs[0].name for specs in SCHEMA.values()}
+
+    def write(self, table: Table, row: dict):
+        if (buffer := self.buffers.get(table)) is None:
+            buffer = self.buffers[table] = self.buffer_class(
+                self.conn, self.buffer_table(table), self.batch_size, self.batch_bytes
+            )
+            self.id_columns[table] = [
+                column for column in table.columns.keys() if column in ID_COLUMNS
+            ]
+        if self.int_ids:
+            for column in self.id_columns[table]:
+                row[column] = int_id(row.get(column))
+        if buffer.add(row):
+            with stats.timed("write"):
+                buffer.flush()
+        if self.merge:
+            self.staged.add(table)
+        if table.name in self.selected:
+            self.rows += 1
+            self.table_rows[table.name] += 1
+
+    def buffer_table(self, table: Table) -> Table:
+        """The table the rows of table are inserted into, typed for the ids
+        the rows hold"""
+
+        if self.merge:
+            return self.staging_table(table)
+        if self.int_ids:
+            return Table(
+                table.name,
+                MetaData(schema=table.schema),
+                *(column(c.name, int_ids=True) for c in table.columns),
+            )
+        return table
+
+    def staging_table(self, table: Table) -> Table:
+        if (staging_table := self.staging_tables.get(table)) is None:
+            staging_table = Table(
+                f"staging_{table.name}",
+                MetaData(),
+                *(column(c.name, self.int_ids) for c in table.columns),
+            )
+            self.conn.execute(
+                text(
+                    "CREATE TEMPORARY TABLE IF NOT EXISTS {} AS"
+                    " SELECT * FROM {} LIMIT 0".format(
+                        staging_table.name,
+                        self.conn.dialect.identifier_preparer.format_table(table),
+                    )
+                )
+            )
+            self.staging_tables[table] = staging_table
+        return staging_table
+
+    def flush(self):
+        with stats.timed("write"):
+            for buffer in self.buffers.values():
+                buffer.flush()
+            if self.merge:
+                self.merge_staged()
+        stats.current().rows.update(self.table_rows)
+        self.table_rows.clear()
+
+    def merge_staged(self):
+        # only the entities staged since the last flush, the staging tables
+        # of the others being empty
+        for tables in ENTITY_TABLES.values():
+            if tables[0] not in self.staged:
+                continue
+
+            staged_ids = select(self.staging_tables[tables[0]].c.id)
+            upsert = has_primary_key(self.conn, tables[0])
+            for table in tables:
+                if table.name not in self.selected:
                     continue
-
-                institution = json.loads(institution_json)
-
-                if (
-                    not (institution_id := institution.get("id"))
-                    or institution_id in seen_institution_ids
-                ):
+                staging_table = self.staging_table(table)
+                if table is tables[0] and upsert:
+                    self.conn.execute(
+                        upsert_from(self.conn.dialect, table, staging_table)
+                    )
                     continue
 
-                seen_institution_ids.add(institution_id)
-
-                # institutions
-                institution["display_name_acronyms"] = json.dumps(
-                    institution.get("display_name_acronyms"), ensure_ascii=False
-                )
-                institution["display_name_alternatives"] = json.dumps(
-                    institution.get("display_name_alternatives"), ensure_ascii=False
+                # stored rows go even when the entities have no such rows now
+                self.conn.execute(
+                    table.delete().where(table.columns[0].in_(staged_ids))
                 )
-                conn.execute(table_institutions.insert(), institution)
-
-                # ids
-                if institution_ids := institution.get("ids"):
-                    institution_ids["institution_id"] = institution_id
-                    conn.execute(table_institutions_ids.insert(), institution_ids)
-
-                # geo
-                if institution_geo := institution.get("geo"):
-                    institution_geo["institution_id"] = institution_id
-                    conn.execute(table_institutions_geo.insert(), institution_geo)
-
-                # associated_institutions
-                if associated_institutions := institution.get(
-                    "associated_institutions",
-                    institution.get("associated_insitutions"),
-                    # typo in api
-                ):
-                    for associated_institution in associated_institutions:
-                        if associated_institution_id := associated_institution.get(
-                            "id"
-                        ):
-                            conn.execute(
-                                table_institutions_associated_institutions.insert(),
-                                {
-                                    "institution_id": institution_id,
-                                    "associated_institution_id": associated_institution_id,
-                                    "relationship": associated_institution.get(
-                                        "relationship"
-                                    ),
-                                },
-                            )
-
-                # counts_by_year
-                if counts_by_year := institution.get("counts_by_year"):
-                    for count_by_year in counts_by_year:
-                        count_by_year["institution_id"] = institution_id
-                        conn.execute(
-                            table_institutions_counts_by_year.insert(), count_by_year
+                if table in self.staged:
+                    self.conn.execute(
+                        table.insert().from_select(
+                            table.columns.keys(), select(staging_table)
                         )
+                    )
 
+            for table in tables:
+                if table in self.staged:
+                    self.conn.execute(self.staging_tables[table].delete())
+        self.staged.clear()
+
+
+_primary_keys: dict[Table, bool] = {}
+
+
+def has_primary_key(conn: Connection, table: Table) -> bool:
+    # the primary keys in the schema files are commented out by default
+    if table not in _primary_keys:
+        _primary_keys[table] = (
+            conn.execute(
+                text(
+                    "SELECT 1 FROM information_schema.table_constraints"
+                    " WHERE table_schema = :schema AND table_name = :table"
+                    " AND constraint_type = 'PRIMARY KEY'"
+                ),
+                {"schema": table.schema, "table": table.name},
+            ).first()
+            is not None
+        )
+    return _primary_keys[table]
+
+
+def upsert_from(dialect: Dialect, table: Table, staging_table: Table):
+    columns = table.columns.keys()
+    if dialect.name == "duckdb":
+        return (
+            table.insert()
+            .prefix_with("OR REPLACE")
+            .from_select(columns, select(staging_table))
+        )
+
+    statement = postgresql.insert(table).from_select(columns, select(staging_table))
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={
+            column: statement.excluded[column] for column in columns if column != "id"
+        },
+    )
+
+
+def drop_indexes(conn: Connection):
+    """Drop the indexes of openalex/tables.py, which every insert would
+    otherwise have to update; primary keys are kept for --merge"""
+
+    for specs in SCHEMA.values():
+        for spec in specs:
+            for column in spec.indexes:
+                conn.execute(
+                    text(f"DROP INDEX IF EXISTS openalex.{spec.index_name(column)}")
+                )
+    conn.commit()
 
-def load_publishers(snapshot_dir: Path, conn: Connection):
-    seen_publisher_ids = set()
-
-    for jsonl_file_name in glob.glob(
-        str(snapshot_dir.joinpath("data", "publishers", "*", "*.gz"))
-    ):
-        print(jsonl_file_name)
-        with gzip.open(jsonl_file_name, "r") as concepts_jsonl:
-            for publisher_json in concepts_jsonl:
-                if not publisher_json.strip():
-                    continue
 
-                publisher = json.loads(publisher_json)
+def index_statements(conn: Connection) -> list[str]:
+    """Statements creating the primary keys and indexes of openalex/tables.py
+    that the tables don't have yet"""
 
-                if (
-                    not (publisher_id := publisher.get("id"))
-                    or publisher_id in seen_publisher_ids
-                ):
-                    continue
-
-                seen_publisher_ids.add(publisher_id)
-
-                # publishers
-                publisher["alternate_titles"] = json.dumps(
-                    publisher.get("alternate_titles"), ensure_ascii=False
+    statements = []
+    for specs in SCHEMA.values():
+        for spec in specs:
+            if spec.primary_key and not has_primary_key(conn, TABLES[spec.name]):
+                statements.append(
+                    f"ALTER TABLE openalex.{spec.name}"
+                    f" ADD PRIMARY KEY ({', '.join(spec.primary_key)})"
                 )
-                publisher["country_codes"] = json.dumps(
-                    publisher.get("country_codes"), ensure_ascii=False
+            for column in spec.indexes:
+                statements.append(
+                    f"CREATE INDEX IF NOT EXISTS {spec.index_name(column)}"
+                    f" ON openalex.{spec.name} ({column})"
                 )
-                conn.execute(table_publishers.insert(), publisher)
+    return statements
 
-                if publisher_ids := publisher.get("ids"):
-                    publisher_ids["publisher_id"] = publisher_id
-                    conn.execute(table_publishers_ids.insert(), publisher_ids)
 
-                if counts_by_year := publisher.get("counts_by_year"):
-                    for count_by_year in counts_by_year:
-                        count_by_year["publisher_id"] = publisher_id
-                        conn.execute(
-                            table_publishers_counts_by_year.insert(), count_by_year
-                        )
+def build_index(engine: Engine, statement: str, settings: dict[str, str]):
+    with engine.connect() as conn:
+        for name, value in settings.items():
+            conn.execute(
+                text("SELECT set_config(:name, :value, false)"),
+                {"name": name, "value": value},
+            )
+        conn.execute(text(statement))
+        conn.commit()
 
 
-def load_sources(snapshot_dir: Path, conn: Connection):
-    seen_source_ids = set()
-    for jsonl_file_name in glob.glob(
-        str(snapshot_dir.joinpath("data", "sources", "*", "*.gz"))
+def build_indexes(db_url: str, echo: bool, workers: int, maintenance_work_mem: str):
+    """Create the primary keys and indexes once the tables are loaded, which
+    is much faster than updating them row by row"""
+
+    engine = create_engine(db_url, echo=echo, pool_size=workers)
+    with engine.connect() as conn:
+        statements = index_statements(conn)
+
+    settings = {}
+    executor_workers = workers
+    if engine.dialect.name == "postgresql":
+        settings = {
+            "maintenance_work_mem": maintenance_work_mem,
+            # every concurrent build gets its share of the cores, as parallel
+            # workers helping its own process
+            "max_parallel_maintenance_workers": str(
+                max((os.cpu_count() or 1) // workers - 1, 0)
+            ),
+        }
+    else:
+        # duckdb builds an index with all its threads, and has a single writer
+        executor_workers = 1
+
+    with (
+        ThreadPoolExecutor(max_workers=executor_workers) as executor,
+        tqdm(total=len(statements), desc="indexes", unit="index") as progress,
     ):
-        print(jsonl_file_name)
-        with gzip.open(jsonl_file_name, "r") as sources_jsonl:
-            for source_json in sources_jsonl:
-                if not source_json.strip():
-                    continue
-
-                source = json.loads(source_json)
-
-                if not (source_id := source.get("id")) or source_id in seen_source_ids:
-                    continue
-
-                seen_source_ids.add(source_id)
-
-                source["issn"] = json.dumps(source.get("issn"))
-                conn.execute(table_sources.insert(), source)
-
-                if source_ids := source.get("ids"):
-                    source_ids["source_id"] = source_id
-                    source_ids["issn"] = json.dumps(source_ids.get("issn"))
-                    conn.execute(table_sources_ids.insert(), source_ids)
-
-                if counts_by_year := source.get("counts_by_year"):
-                    for count_by_year in counts_by_year:
-                        count_by_year["source_id"] = source_id
-                        conn.execute(
-                            table_sources_counts_by_year.insert(), count_by_year
-                        )
+        futures = [
+            executor.submit(build_index, engine, statement, settings)
+            for statement in statements
+        ]
+        for future in as_completed(futures):
+            future.result()
+            progress.update()
+
+
+def buffer_class(dialect: Dialect):
+    # bulk paths are much faster than any parameterised insert
+    if dialect.driver == "psycopg2":
+        return CopyBuffer
+    if dialect.name == "duckdb" and pyarrow is not None:
+        return ArrowBuffer
+    return TableBuffer
+
+
+def load_authors_file(jsonl_file_name: str, writer: BatchWriter, seen_ids: IdSet):
+    for author in read_records(jsonl_file_name, decode_author, seen_ids):
+        author_id = author["id"]
+
+        # authors
+        if "authors" in writer.tables:
+            author["display_name_alternatives"] = dumps(
+                author.get("display_name_alternatives")
+            )
+            author["last_known_institution"] = (
+                author.get("last_known_institution") or {}
+            ).get("id")
+            writer.write(TABLES["authors"], author)
+
+        # ids
+        if "authors_ids" in writer.tables and (author_ids := author.get("ids")):
+            author_ids["author_id"] = author_id
+            writer.write(TABLES["authors_ids"], author_ids)
+
+        # counts_by_year
+        if "authors_counts_by_year" in writer.tables and (
+            counts_by_year := author.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["author_id"] = author_id
+                writer.write(TABLES["authors_counts_by_year"], count_by_year)
+
+
+def load_topics_file(jsonl_file_name: str, writer: BatchWriter, seen_ids: IdSet):
+    for topic in read_records(jsonl_file_name, decode_topic, seen_ids):
+        topic["keywords"] = "; ".join(topic.get("keywords", ""))
+        for key in ("subfield", "field", "domain"):
+            topic[f"{key}_id"] = topic[key]["id"]
+            topic[f"{key}_display_name"] = topic[key]["display_name"]
+            del topic[key]
+
+        if "updated" in topic:
+            topic["updated_date"] = topic["updated"]
+            del topic["updated"]
+
+        topic["wikipedia_id"] = topic["ids"].get("wikipedia")
+        del topic["ids"]
+
+        topic["siblings"] = dumps(topic.get("siblings"))
+        writer.write(TABLES["topics"], topic)
+
+
+def load_concepts_file(jsonl_file_name: str, writer: BatchWriter, seen_ids: IdSet):
+    for concept in read_records(jsonl_file_name, decode_concept, seen_ids):
+        concept_id = concept["id"]
+
+        if "concepts" in writer.tables:
+            writer.write(TABLES["concepts"], concept)
+
+        if "concepts_ids" in writer.tables and (concept_ids := concept.get("ids")):
+            concept_ids["concept_id"] = concept_id
+            concept_ids["umls_aui"] = dumps(concept_ids.get("umls_aui"))
+            concept_ids["umls_cui"] = dumps(concept_ids.get("umls_cui"))
+            writer.write(TABLES["concepts_ids"], concept_ids)
+
+        if "concepts_ancestors" in writer.tables and (
+            ancestors := concept.get("ancestors")
+        ):
+            for ancestor in ancestors:
+                if ancestor_id := ancestor.get("id"):
+                    writer.write(
+                        TABLES["concepts_ancestors"],
+                        {"concept_id": concept_id, "ancestor_id": ancestor_id},
+                    )
 
+        if "concepts_counts_by_year" in writer.tables and (
+            counts_by_year := concept.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["concept_id"] = concept_id
+                writer.write(TABLES["concepts_counts_by_year"], count_by_year)
+
+        if "concepts_related_concepts" in writer.tables and (
+            related_concepts := concept.get("related_concepts")
+        ):
+            for related_concept in related_concepts:
+                if related_concept_id := related_concept.get("id"):
+                    writer.write(
+                        TABLES["concepts_related_concepts"],
+                        {
+                            "concept_id": concept_id,
+                            "related_concept_id": related_concept_id,
+                            "score": related_concept.get("score"),
+                        },
+                    )
 
-def load_works(snapshot_dir: Path, conn: Connection):
-    for jsonl_file_name in glob.glob(
-        str(snapshot_dir.joinpath("data", "works", "*", "*.gz"))
-    ):
-        print(jsonl_file_name)
-        with gzip.open(jsonl_file_name, "r") as works_jsonl:
-            for work_json in works_jsonl:
-                if not work_json.strip():
-                    continue
 
-                work = json.loads(work_json)
+def load_institutions_file(jsonl_file_name: str, writer: BatchWriter, seen_ids: IdSet):
+    for institution in read_records(jsonl_file_name, decode_institution, seen_ids):
+        institution_id = institution["id"]
+
+        # institutions
+        if "institutions" in writer.tables:
+            institution["display_name_acronyms"] = dumps(
+                institution.get("display_name_acronyms")
+            )
+            institution["display_name_alternatives"] = dumps(
+                institution.get("display_name_alternatives")
+            )
+            writer.write(TABLES["institutions"], institution)
+
+        # ids
+        if "institutions_ids" in writer.tables and (
+            institution_ids := institution.get("ids")
+        ):
+            institution_ids["institution_id"] = institution_id
+            writer.write(TABLES["institutions_ids"], institution_ids)
+
+        # geo
+        if "institutions_geo" in writer.tables and (
+            institution_geo := institution.get("geo")
+        ):
+            institution_geo["institution_id"] = institution_id
+            writer.write(TABLES["institutions_geo"], institution_geo)
+
+        # associated_institutions
+        if "institutions_associated_institutions" in writer.tables and (
+            associated_institutions := institution.get(
+                "associated_institutions",
+                institution.get("associated_insitutions"),
+                # typo in api
+            )
+        ):
+            for associated_institution in associated_institutions:
+                if associated_institution_id := associated_institution.get("id"):
+                    writer.write(
+                        TABLES["institutions_associated_institutions"],
+                        {
+                            "institution_id": institution_id,
+                            "associated_institution_id": associated_institution_id,
+                            "relationship": associated_institution.get("relationship"),
+                        },
+                    )
 
-                if not (work_id := work.get("id")):
-                    continue
+        # counts_by_year
+        if "institutions_counts_by_year" in writer.tables and (
+            counts_by_year := institution.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["institution_id"] = institution_id
+                writer.write(TABLES["institutions_counts_by_year"], count_by_year)
+
+
+def load_publishers_file(jsonl_file_name: str, writer: BatchWriter, seen_ids: IdSet):
+    for publisher in read_records(jsonl_file_name, decode_publisher, seen_ids):
+        publisher_id = publisher["id"]
+
+        # publishers
+        if "publishers" in writer.tables:
+            publisher["alternate_titles"] = dumps(publisher.get("alternate_titles"))
+            publisher["country_codes"] = dumps(publisher.get("country_codes"))
+            writer.write(TABLES["publishers"], publisher)
+
+        if "publishers_ids" in writer.tables and (
+            publisher_ids := publisher.get("ids")
+        ):
+            publisher_ids["publisher_id"] = publisher_id
+            writer.write(TABLES["publishers_ids"], publisher_ids)
+
+        if "publishers_counts_by_year" in writer.tables and (
+            counts_by_year := publisher.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["publisher_id"] = publisher_id
+                writer.write(TABLES["publishers_counts_by_year"], count_by_year)
+
+
+def load_sources_file(jsonl_file_name: str, writer: BatchWriter, seen_ids: IdSet):
+    for source in read_records(jsonl_file_name, decode_source, seen_ids):
+        source_id = source["id"]
+
+        if "sources" in writer.tables:
+            source["issn"] = dumps(source.get("issn"))
+            writer.write(TABLES["sources"], source)
+
+        if "sources_ids" in writer.tables and (source_ids := source.get("ids")):
+            source_ids["source_id"] = source_id
+            source_ids["issn"] = dumps(source_ids.get("issn"))
+            writer.write(TABLES["sources_ids"], source_ids)
+
+        if "sources_counts_by_year" in writer.tables and (
+            counts_by_year := source.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["source_id"] = source_id
+                writer.write(TABLES["sources_counts_by_year"], count_by_year)
+
+
+def load_works_file(jsonl_file_name: str, writer: BatchWriter, seen_ids: IdSet):
+    for work in read_records(jsonl_file_name, decode_work, seen_ids):
+        work_id = work["id"]
+
+        # works
+        if "works" in writer.tables:
+            if (abstract := work.get("abstract_inverted_index")) is not None:
+                work["abstract_inverted_index"] = dumps(abstract)
+            writer.write(TABLES["works"], work)
+
+        # primary_locations
+        if "works_primary_locations" in writer.tables and (
+            primary_location := (work.get("primary_location") or {})
+        ):
+            if primary_location.get("source") and primary_location["source"].get("id"):
+                writer.write(
+                    TABLES["works_primary_locations"],
+                    {
+                        "work_id": work_id,
+                        "source_id": primary_location["source"]["id"],
+                        "landing_page_url": primary_location.get("landing_page_url"),
+                        "pdf_url": primary_location.get("pdf_url"),
+                        "is_oa": primary_location.get("is_oa"),
+                        "version": primary_location.get("version"),
+                        "license": primary_location.get("license"),
+                    },
+                )
 
-                # works
-                if (abstract := work.get("abstract_inverted_index")) is not None:
-                    work["abstract_inverted_index"] = json.dumps(
-                        abstract, ensure_ascii=False
+        # locations
+        if "works_locations" in writer.tables and (locations := work.get("locations")):
+            for location in locations:
+                if location.get("source") and location.get("source").get("id"):
+                    writer.write(
+                        TABLES["works_locations"],
+                        {
+                            "work_id": work_id,
+                            "source_id": location["source"]["id"],
+                            "landing_page_url": location.get("landing_page_url"),
+                            "pdf_url": location.get("pdf_url"),
+                            "is_oa": location.get("is_oa"),
+                            "version": location.get("version"),
+                            "license": location.get("license"),
+                        },
                     )
 
-                conn.execute(table_works.insert(), work)
+        # best_oa_locations
+        if "works_best_oa_locations" in writer.tables and (
+            best_oa_location := (work.get("best_oa_location") or {})
+        ):
+            if best_oa_location.get("source") and best_oa_location["source"].get("id"):
+                writer.write(
+                    TABLES["works_best_oa_locations"],
+                    {
+                        "work_id": work_id,
+                        "source_id": best_oa_location["source"]["id"],
+                        "landing_page_url": best_oa_location.get("landing_page_url"),
+                        "pdf_url": best_oa_location.get("pdf_url"),
+                        "is_oa": best_oa_location.get("is_oa"),
+                        "version": best_oa_location.get("version"),
+                        "license": best_oa_location.get("license"),
+                    },
+                )
 
-                # primary_locations
-                if primary_location := (work.get("primary_location") or {}):
-                    if primary_location.get("source") and primary_location[
-                        "source"
-                    ].get("id"):
-                        conn.execute(
-                            table_works_primary_locations.insert(),
+        # authorships
+        if "works_authorships" in writer.tables and (
+            authorships := work.get("authorships")
+        ):
+            for authorship in authorships:
+                if author_id := authorship.get("author", {}).get("id"):
+                    institutions = authorship.get("institutions")
+                    institution_ids = [i.get("id") for i in institutions]
+                    institution_ids = [i for i in institution_ids if i]
+                    institution_ids = institution_ids or [None]
+
+                    for institution_id in institution_ids:
+                        writer.write(
+                            TABLES["works_authorships"],
                             {
                                 "work_id": work_id,
-                                "source_id": primary_location["source"]["id"],
-                                "landing_page_url": primary_location.get(
-                                    "landing_page_url"
+                                "author_position": authorship.get("author_position"),
+                                "author_id": author_id,
+                                "institution_id": institution_id,
+                                "raw_affiliation_string": authorship.get(
+                                    "raw_affiliation_string"
                                 ),
-                                "pdf_url": primary_location.get("pdf_url"),
-                                "is_oa": primary_location.get("is_oa"),
-                                "version": primary_location.get("version"),
-                                "license": primary_location.get("license"),
                             },
                         )
 
-                # locations
-                if locations := work.get("locations"):
-                    for location in locations:
-                        if location.get("source") and location.get("source").get("id"):
-                            conn.execute(
-                                table_works_locations.insert(),
-                                {
-                                    "work_id": work_id,
-                                    "source_id": location["source"]["id"],
-                                    "landing_page_url": location.get(
-                                        "landing_page_url"
-                                    ),
-                                    "pdf_url": location.get("pdf_url"),
-                                    "is_oa": location.get("is_oa"),
-                                    "version": location.get("version"),
-                                    "license": location.get("license"),
-                                },
-                            )
-
-                # best_oa_locations
-                if best_oa_location := (work.get("best_oa_location") or {}):
-                    if best_oa_location.get("source") and best_oa_location[
-                        "source"
-                    ].get("id"):
-                        conn.execute(
-                            table_works_best_oa_locations.insert(),
-                            {
-                                "work_id": work_id,
-                                "source_id": best_oa_location["source"]["id"],
-                                "landing_page_url": best_oa_location.get(
-                                    "landing_page_url"
-                                ),
-                                "pdf_url": best_oa_location.get("pdf_url"),
-                                "is_oa": best_oa_location.get("is_oa"),
-                                "version": best_oa_location.get("version"),
-                                "license": best_oa_location.get("license"),
-                            },
-                        )
+        # biblio
+        if "works_biblio" in writer.tables and (biblio := work.get("biblio")):
+            biblio["work_id"] = work_id
+            writer.write(TABLES["works_biblio"], biblio)
+
+        # topics
+        if "works_topics" in writer.tables:
+            for topic in work.get("topics", []):
+                if topic_id := topic.get("id"):
+                    writer.write(
+                        TABLES["works_topics"],
+                        {
+                            "work_id": work_id,
+                            "topic_id": topic_id,
+                            "score": topic.get("score"),
+                        },
+                    )
 
-                # authorships
-                if authorships := work.get("authorships"):
-                    for authorship in authorships:
-                        if author_id := authorship.get("author", {}).get("id"):
-                            institutions = authorship.get("institutions")
-                            institution_ids = [i.get("id") for i in institutions]
-                            institution_ids = [i for i in institution_ids if i]
-                            institution_ids = institution_ids or [None]
-
-                            for institution_id in institution_ids:
-                                conn.execute(
-                                    table_works_authorships.insert(),
-                                    {
-                                        "work_id": work_id,
-                                        "author_position": authorship.get(
-                                            "author_position"
-                                        ),
-                                        "author_id": author_id,
-                                        "institution_id": institution_id,
-                                        "raw_affiliation_string": authorship.get(
-                                            "raw_affiliation_string"
-                                        ),
-                                    },
-                                )
-
-                # biblio
-                if biblio := work.get("biblio"):
-                    biblio["work_id"] = work_id
-                    conn.execute(table_works_biblio.insert(), biblio)
-
-                # topics
-                for topic in work.get("topics", []):
-                    if topic_id := topic.get("id"):
-                        conn.execute(
-                            table_works_topics.insert(),
-                            {
-                                "work_id": work_id,
-                                "topic_id": topic_id,
-                                "score": topic.get("score"),
-                            },
-                        )
+        # concepts
+        if "works_concepts" in writer.tables:
+            for concept in work.get("concepts"):
+                if concept_id := concept.get("id"):
+                    writer.write(
+                        TABLES["works_concepts"],
+                        {
+                            "work_id": work_id,
+                            "concept_id": concept_id,
+                            "score": concept.get("score"),
+                        },
+                    )
 
-                # concepts
-                for concept in work.get("concepts"):
-                    if concept_id := concept.get("id"):
-                        conn.execute(
-                            table_works_concepts.insert(),
-                            {
-                                "work_id": work_id,
-                                "concept_id": concept_id,
-                                "score": concept.get("score"),
-                            },
-                        )
+        # ids
+        if "works_ids" in writer.tables and (ids := work.get("ids")):
+            ids["work_id"] = work_id
+            writer.write(TABLES["works_ids"], ids)
+
+        # mesh
+        if "works_mesh" in writer.tables:
+            for mesh in work.get("mesh"):
+                mesh["work_id"] = work_id
+                writer.write(TABLES["works_mesh"], mesh)
+
+        # open_access
+        if "works_open_access" in writer.tables and (
+            open_access := work.get("open_access")
+        ):
+            open_access["work_id"] = work_id
+            writer.write(TABLES["works_open_access"], open_access)
+
+        # referenced_works
+        if "works_referenced_works" in writer.tables:
+            for referenced_work in work.get("referenced_works"):
+                if referenced_work:
+                    writer.write(
+                        TABLES["works_referenced_works"],
+                        {
+                            "work_id": work_id,
+                            "referenced_work_id": referenced_work,
+                        },
+                    )
 
-                # ids
-                if ids := work.get("ids"):
-                    ids["work_id"] = work_id
-                    conn.execute(table_works_ids.insert(), ids)
-
-                # mesh
-                for mesh in work.get("mesh"):
-                    mesh["work_id"] = work_id
-                    conn.execute(table_works_mesh.insert(), mesh)
-
-                # open_access
-                if open_access := work.get("open_access"):
-                    open_access["work_id"] = work_id
-                    conn.execute(table_works_open_access.insert(), open_access)
-
-                # referenced_works
-                for referenced_work in work.get("referenced_works"):
-                    if referenced_work:
-                        conn.execute(
-                            table_works_referenced_works.insert(),
-                            {
-                                "work_id": work_id,
-                                "referenced_work_id": referenced_work,
-                            },
-                        )
+        # related_works
+        if "works_related_works" in writer.tables:
+            for related_work in work.get("related_works"):
+                if related_work:
+                    writer.write(
+                        TABLES["works_related_works"],
+                        {"work_id": work_id, "related_work_id": related_work},
+                    )
 
-                # related_works
-                for related_work in work.get("related_works"):
-                    if related_work:
-                        conn.execute(
-                            table_works_related_works.insert(),
-                            {"work_id": work_id, "related_work_id": related_work},
-                        )
+
+LoadFile = Callable[[str, BatchWriter], None]
+
+DEFAULT_BATCH_BYTES = 64 * 1024 * 1024
+
+
+def new_partitions(
+    conn: Connection,
+    snapshot_dir: str | os.PathLike,
+    entity: str,
+    incremental: bool,
+    resume: bool,
+    seen_ids: IdSet,
+) -> dict[str, list[str]]:
+    """Snapshot files of an entity by partition, leaving out the partitions
+    already loaded in incremental mode and the files already loaded when
+    resuming, whose ids are added to seen_ids"""
+
+    partitions = entity_partitions(os.fspath(snapshot_dir), entity)
+    if incremental:
+        loaded = set(
+            conn.scalars(
+                select(table_loaded_partitions.c.partition_name).where(
+                    table_loaded_partitions.c.entity == entity
+                )
+            )
+        )
+        partitions = {
+            partition: jsonl_file_names
+            for partition, jsonl_file_names in partitions.items()
+            if partition not in loaded
+        }
+    if resume:
+        loaded = set(
+            conn.scalars(
+                select(table_loaded_files.c.file_name).where(
+                    table_loaded_files.c.entity == entity
+                )
+            )
+        )
+        add_file_ids(
+            seen_ids,
+            [
+                jsonl_file_name
+                for jsonl_file_names in partitions.values()
+                for jsonl_file_name in jsonl_file_names
+                if file_key(jsonl_file_name) in loaded
+            ],
+        )
+        # partitions left empty are kept, they may not be recorded yet
+        partitions = {
+            partition: [
+                jsonl_file_name
+                for jsonl_file_name in jsonl_file_names
+                if file_key(jsonl_file_name) not in loaded
+            ]
+            for partition, jsonl_file_names in partitions.items()
+        }
+
+    return partitions
+
+
+def file_key(jsonl_file_name: str) -> str:
+    # <entity>/<partition>/<file>, wherever the snapshot is
+    return "/".join(Path(jsonl_file_name).parts[-3:])
+
+
+def record_files(conn: Connection, entity: str, loaded_files: dict[str, int]):
+    if loaded_files:
+        file_names = [file_key(jsonl_file_name) for jsonl_file_name in loaded_files]
+        conn.execute(
+            table_loaded_files.delete().where(
+                table_loaded_files.c.file_name.in_(file_names)
+            )
+        )
+        conn.execute(
+            table_loaded_files.insert(),
+            [
+                {"file_name": file_name, "entity": entity, "row_count": rows}
+                for file_name, rows in zip(file_names, loaded_files.values())
+            ],
+        )
+
+
+def record_partitions(conn: Connection, entity: str, partitions: list[str]):
+    if partitions:
+        conn.execute(
+            table_loaded_partitions.delete().where(
+                table_loaded_partitions.c.entity == entity,
+                table_loaded_partitions.c.partition_name.in_(partitions),
+            )
+        )
+        conn.execute(
+            table_loaded_partitions.insert(),
+            [{"entity": entity, "partition_name": p} for p in partitions],
+        )
+
+
+def load_entity(
+    entity: str,
+    partitions: dict[str, list[str]],
+    load_file: LoadFile,
+    writer: BatchWriter,
+    commit_each_file: bool = True,
+):
+    """Load the files of an entity, newest partition first so that only the
+    latest version of an entity is kept, committing after each file or only
+    once at the end"""
+
+    loaded_files = {}
+    pending = sum(map(len, partitions.values()))
+    for partition in sorted(partitions, reverse=True):
+        for jsonl_file_name in partitions[partition]:
+            metrics.set_status(entity, pending)
+            pending -= 1
+            print(jsonl_file_name)
+            rows = writer.rows
+            load_file(jsonl_file_name, writer)
+            writer.flush()
+            loaded_files[jsonl_file_name] = writer.rows - rows
+
+            if commit_each_file:
+                with stats.timed("commit"):
+                    record_files(writer.conn, entity, loaded_files)
+                    writer.conn.commit()
+                loaded_files = {}
+            stats.collect()
+    metrics.set_status(entity, 0)
+
+    with stats.timed("commit"):
+        record_files(writer.conn, entity, loaded_files)
+        record_partitions(writer.conn, entity, list(partitions))
+        writer.conn.commit()
+    stats.collect()
+
+
+# per-process state of the parallel loader, set up by init_worker
+_worker = {}
+
+
+def init_worker(
+    db_url: str,
+    echo: bool,
+    batch_size: int,
+    batch_bytes: int,
+    merge: bool = False,
+    int_ids: bool = False,
+    tables: frozenset[str] | None = None,
+    pool_size: int = 1,
+):
+    _worker["engine"] = create_engine(
+        db_url,
+        echo=echo,
+        insertmanyvalues_page_size=batch_size,
+        pool_size=pool_size,
+    )
+    _worker["batch_size"] = batch_size
+    _worker["batch_bytes"] = batch_bytes
+    _worker["merge"] = merge
+    _worker["int_ids"] = int_ids
+    _worker["tables"] = tables
+
+
+def load_file_task(
+    load_file: LoadFile, entity: str, jsonl_file_name: str
+) -> tuple[int, stats.Stats]:
+    engine = _worker["engine"]
+    with engine.connect() as conn:
+        writer = BatchWriter(
+            conn,
+            _worker["batch_size"],
+            _worker["batch_bytes"],
+            buffer_class(engine.dialect),
+            _worker["merge"],
+            _worker["int_ids"],
+            _worker["tables"],
+        )
+        load_file(jsonl_file_name, writer)
+        writer.flush()
+        with stats.timed("commit"):
+            record_files(conn, entity, {jsonl_file_name: writer.rows})
+            conn.commit()
+
+    # the stats of worker processes and threads are handed back to the main one
+    return writer.rows, stats.take()
+
+
+def load_parallel(
+    entity: str,
+    desc: str,
+    jsonl_file_names: list[str],
+    load_file: LoadFile,
+    executor: Executor,
+    workers: int,
+):
+    futures = [
+        executor.submit(load_file_task, load_file, entity, jsonl_file_name)
+        for jsonl_file_name in jsonl_file_names
+    ]
+
+    rows = 0
+    metrics.set_status(entity, len(futures), workers)
+    with tqdm(total=len(futures), desc=desc, unit="file") as progress:
+        for done, future in enumerate(as_completed(futures), 1):
+            file_rows, file_stats = future.result()
+            rows += file_rows
+            stats.collect(file_stats)
+            metrics.set_status(entity, len(futures) - done, workers)
+            progress.set_postfix(rows=rows)
+            progress.update()
 
 
 def main(
     snapshot_dir: Path,
     db_url: str,
     echo: Annotated[bool, typer.Option(help="echo sqlalchemy statements")] = False,
+    batch_size: Annotated[
+        int, typer.Option(help="rows per table to buffer before inserting")
+    ] = 10_000,
+    batch_bytes: Annotated[
+        int, typer.Option(help="bytes of text per table to buffer before inserting")
+    ] = DEFAULT_BATCH_BYTES,
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="load works and authors files in parallel, each in its own transaction"
+        ),
+    ] = 1,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            help="only load partitions not loaded before, merging them (implies --merge)"
+        ),
+    ] = False,
+    merge: Annotated[
+        bool,
+        typer.Option(
+            help="replace entities that are already stored instead of duplicating them"
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        typer.Option(help="skip the files loaded by a previous, interrupted import"),
+    ] = False,
+    int_ids: Annotated[
+        bool,
+        typer.Option(
+            help="write OpenAlex ids as BIGINT numbers, for the *-int-ids.sql schemas"
+        ),
+    ] = False,
+    defer_indexes: Annotated[
+        bool,
+        typer.Option(
+            help="drop the indexes before loading, and create them and the primary keys once loaded"
+        ),
+    ] = False,
+    maintenance_work_mem: Annotated[
+        str,
+        typer.Option(
+            help="memory of each PostgreSQL index build, with --defer-indexes"
+        ),
+    ] = "1GB",
+    stats_interval: Annotated[
+        float,
+        typer.Option(help="seconds between progress lines on stderr, 0 for none"),
+    ] = 60,
+    stats_file: Annotated[
+        Optional[str],
+        typer.Option(help="write the final summary there as JSON, instead of stderr"),
+    ] = None,
+    metrics_port: Annotated[
+        Optional[int],
+        typer.Option(help="serve live metrics in the Prometheus format on this port"),
+    ] = None,
+    metrics_file: Annotated[
+        Optional[str],
+        typer.Option(help="write live metrics in the Prometheus format to this file"),
+    ] = None,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            help="profile the loading of every entity, by worker, with cProfile"
+        ),
+    ] = False,
+    profile_dir: Annotated[
+        str, typer.Option(help="directory of the profile dumps and report")
+    ] = "profiles",
+    profile_top: Annotated[
+        int, typer.Option(help="functions listed in the profile report")
+    ] = 40,
+    entities: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help="entities to load, repeatable or comma-separated, defaults to all"
+        ),
+    ] = None,
+    tables: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help="tables to load, e.g. works_authorships, repeatable or "
+            "comma-separated, defaults to all those of the entities"
+        ),
+    ] = None,
 ):
-    with create_engine(db_url, echo=echo).connect() as conn:
-        load_topics(snapshot_dir, conn)
-        load_authors(snapshot_dir, conn)
-        load_concepts(snapshot_dir, conn)
-        load_institutions(snapshot_dir, conn)
-        load_publishers(snapshot_dir, conn)
-        load_sources(snapshot_dir, conn)
-        load_works(snapshot_dir, conn)
-
+    try:
+        selected = select_tables(entities or (), tables or ())
+    except ValueError as error:
+        raise typer.BadParameter(str(error))
+    selected_tables = frozenset(
+        spec.name for specs in selected.values() for spec in specs
+    )
+    if defer_indexes and (merge or incremental):
+        # merging deletes the stored rows of every staged entity from the
+        # child tables, through their indexes on the entity ids
+        raise typer.BadParameter(
+            "only for full imports, not with --merge or --incremental,"
+            " which need the indexes on the entity ids of the child tables",
+            param_hint="--defer-indexes",
+        )
+
+    stats.start(stats_interval)
+    metrics.start(metrics_port, metrics_file)
+    if profile:
+        profiling.prepare(profile_dir)
+    profiled = partial(profiling.profiled, directory=profile_dir if profile else None)
+    merge = merge or incremental
+
+    engine = create_engine(db_url, echo=echo, insertmanyvalues_page_size=batch_size)
+    with engine.connect() as conn:
+        table_loaded_partitions.create(conn, checkfirst=True)
+        table_loaded_files.create(conn, checkfirst=True)
         conn.commit()
+        if defer_indexes:
+            drop_indexes(conn)
+        writer = BatchWriter(
+            conn,
+            batch_size,
+            batch_bytes,
+            buffer_class(engine.dialect),
+            merge,
+            int_ids,
+            selected_tables,
+        )
+
+        # entities other than works and authors are small, they are loaded
+        # serially and committed at once, so that they're never resumed halfway
+        for entity, load_file in [
+            ("topics", load_topics_file),
+            ("concepts", load_concepts_file),
+            ("institutions", load_institutions_file),
+            ("publishers", load_publishers_file),
+            ("sources", load_sources_file),
+        ]:
+            if entity not in selected:
+                continue
+            with temporary_id_set() as seen_ids:
+                load_entity(
+                    entity,
+                    new_partitions(
+                        conn, snapshot_dir, entity, incremental, resume, seen_ids
+                    ),
+                    partial(profiled(load_file, entity), seen_ids=seen_ids),
+                    writer,
+                    commit_each_file=False,
+                )
+        if workers == 1:
+            for entity, load_file in [
+                ("authors", load_authors_file),
+                ("works", load_works_file),
+            ]:
+                if entity not in selected:
+                    continue
+                with temporary_id_set() as seen_ids:
+                    load_entity(
+                        entity,
+                        new_partitions(
+                            conn, snapshot_dir, entity, incremental, resume, seen_ids
+                        ),
+                        partial(profiled(load_file, entity), seen_ids=seen_ids),
+                        writer,
+                    )
+
+    if workers > 1:
+        worker_args = (
+            db_url,
+            echo,
+            batch_size,
+            batch_bytes,
+            merge,
+            int_ids,
+            selected_tables,
+        )
+        if engine.dialect.name == "duckdb":
+            # only one process may open a duckdb database for writing,
+            # so the workers are threads sharing a pool of connections
+            init_worker(*worker_args, pool_size=workers)
+            executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=worker_args
+            )
+
+        with executor:
+            for entity, load_file in [
+                ("authors", load_authors_file),
+                ("works", load_works_file),
+            ]:
+                if entity not in selected:
+                    continue
+                with (
+                    temporary_id_set(
+                        shared=isinstance(executor, ProcessPoolExecutor)
+                    ) as seen_ids,
+                    engine.connect() as conn,
+                ):
+                    partitions = new_partitions(
+                        conn, snapshot_dir, entity, incremental, resume, seen_ids
+                    )
+
+                    # the files of a partition are loaded in parallel, but
+                    # partitions one after the other, newest first, so that
+                    # only the latest version of an entity is kept
+                    for partition in sorted(partitions, reverse=True):
+                        load_parallel(
+                            entity,
+                            f"{entity} {partition}",
+                            partitions[partition],
+                            partial(profiled(load_file, entity), seen_ids=seen_ids),
+                            executor,
+                            workers,
+                        )
+                        record_partitions(conn, entity, [partition])
+                        conn.commit()
+
+    if defer_indexes:
+        # with --workers, that many indexes are built at once
+        build_indexes(db_url, echo, workers, maintenance_work_mem)
+    stats.write_summary(stats_file)
+    metrics.stop()
+    if profile:
+        print(f"profile report: {profiling.report(profile_dir, profile_top)}")
 
 
 if __name__ == "__main__":
@@ -1,4 +1,8 @@
---authors
+--
+-- Written by generate-sql.py from openalex/tables.py, edit the tables there
+--
+
+-- authors
 
 COPY openalex.authors (id, orcid, display_name, display_name_alternatives, works_count, cited_by_count, last_known_institution, works_api_url, updated_date) FROM 'csv-files/authors.csv.gz';
 COPY openalex.authors_ids (author_id, openalex, orcid, scopus, twitter, wikipedia, mag) FROM 'csv-files/authors_ids.csv.gz';
@@ -8,7 +12,7 @@ COPY openalex.authors_counts_by_year (author_id, year, works_count, cited_by_cou
 
 COPY openalex.topics (id, display_name, subfield_id, subfield_display_name, field_id, field_display_name, domain_id, domain_display_name, description, keywords, works_api_url, wikipedia_id, works_count, cited_by_count, updated_date, siblings) FROM 'csv-files/topics.csv.gz';
 
---concepts
+-- concepts
 
 COPY openalex.concepts (id, wikidata, display_name, level, description, works_count, cited_by_count, image_url, image_thumbnail_url, works_api_url, updated_date) FROM 'csv-files/concepts.csv.gz';
 COPY openalex.concepts_ancestors (concept_id, ancestor_id) FROM 'csv-files/concepts_ancestors.csv.gz';
@@ -16,7 +20,7 @@ COPY openalex.concepts_counts_by_year (concept_id, year, works_count, cited_by_c
 COPY openalex.concepts_ids (concept_id, openalex, wikidata, wikipedia, umls_aui, umls_cui, mag) FROM 'csv-files/concepts_ids.csv.gz';
 COPY openalex.concepts_related_concepts (concept_id, related_concept_id, score) FROM 'csv-files/concepts_related_concepts.csv.gz';
 
---institutions
+-- institutions
 
 COPY openalex.institutions (id, ror, display_name, country_code, type, homepage_url, image_url, image_thumbnail_url, display_name_acronyms, display_name_alternatives, works_count, cited_by_count, works_api_url, updated_date) FROM 'csv-files/institutions.csv.gz';
 COPY openalex.institutions_ids (institution_id, openalex, ror, grid, wikipedia, wikidata, mag) FROM 'csv-files/institutions_ids.csv.gz';
@@ -24,19 +28,19 @@ COPY openalex.institutions_geo (institution_id, city, geonames_city_id, region,
 COPY openalex.institutions_associated_institutions (institution_id, associated_institution_id, relationship) FROM 'csv-files/institutions_associated_institutions.csv.gz';
 COPY openalex.institutions_counts_by_year (institution_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/institutions_counts_by_year.csv.gz';
 
---publishers
+-- publishers
 
 COPY openalex.publishers (id, display_name, alternate_titles, country_codes, hierarchy_level, parent_publisher, works_count, cited_by_count, sources_api_url, updated_date) FROM 'csv-files/publishers.csv.gz';
 COPY openalex.publishers_ids (publisher_id, openalex, ror, wikidata) FROM 'csv-files/publishers_ids.csv.gz';
 COPY openalex.publishers_counts_by_year (publisher_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/publishers_counts_by_year.csv.gz';
 
---sources
+-- sources
 
 COPY openalex.sources (id, issn_l, issn, display_name, publisher, works_count, cited_by_count, is_oa, is_in_doaj, homepage_url, works_api_url, updated_date) FROM 'csv-files/sources.csv.gz';
 COPY openalex.sources_ids (source_id, openalex, issn_l, issn, mag, wikidata, fatcat) FROM 'csv-files/sources_ids.csv.gz';
 COPY openalex.sources_counts_by_year (source_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/sources_counts_by_year.csv.gz';
 
---works
+-- works
 
 COPY openalex.works (id, doi, title, display_name, publication_year, publication_date, type, cited_by_count, is_retracted, is_paratext, cited_by_api_url, abstract_inverted_index, language) FROM 'csv-files/works.csv.gz';
 COPY openalex.works_primary_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) FROM 'csv-files/works_primary_locations.csv.gz';
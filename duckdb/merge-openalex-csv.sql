@@ -0,0 +1,193 @@
+--
+-- Written by generate-sql.py from openalex/tables.py, edit the tables there
+--
+
+BEGIN;
+
+-- authors
+
+CREATE TEMPORARY TABLE staging_authors AS SELECT * FROM openalex.authors LIMIT 0;
+CREATE TEMPORARY TABLE staging_authors_ids AS SELECT * FROM openalex.authors_ids LIMIT 0;
+CREATE TEMPORARY TABLE staging_authors_counts_by_year AS SELECT * FROM openalex.authors_counts_by_year LIMIT 0;
+COPY staging_authors (id, orcid, display_name, display_name_alternatives, works_count, cited_by_count, last_known_institution, works_api_url, updated_date) FROM 'csv-files/authors.csv.gz';
+COPY staging_authors_ids (author_id, openalex, orcid, scopus, twitter, wikipedia, mag) FROM 'csv-files/authors_ids.csv.gz';
+COPY staging_authors_counts_by_year (author_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/authors_counts_by_year.csv.gz';
+DELETE FROM openalex.authors WHERE id IN (SELECT id FROM staging_authors);
+DELETE FROM openalex.authors_ids WHERE author_id IN (SELECT id FROM staging_authors);
+DELETE FROM openalex.authors_counts_by_year WHERE author_id IN (SELECT id FROM staging_authors);
+INSERT INTO openalex.authors SELECT * FROM staging_authors;
+INSERT INTO openalex.authors_ids SELECT * FROM staging_authors_ids;
+INSERT INTO openalex.authors_counts_by_year SELECT * FROM staging_authors_counts_by_year;
+DROP TABLE staging_authors;
+DROP TABLE staging_authors_ids;
+DROP TABLE staging_authors_counts_by_year;
+
+-- topics
+
+CREATE TEMPORARY TABLE staging_topics AS SELECT * FROM openalex.topics LIMIT 0;
+COPY staging_topics (id, display_name, subfield_id, subfield_display_name, field_id, field_display_name, domain_id, domain_display_name, description, keywords, works_api_url, wikipedia_id, works_count, cited_by_count, updated_date, siblings) FROM 'csv-files/topics.csv.gz';
+DELETE FROM openalex.topics WHERE id IN (SELECT id FROM staging_topics);
+INSERT INTO openalex.topics SELECT * FROM staging_topics;
+DROP TABLE staging_topics;
+
+-- concepts
+
+CREATE TEMPORARY TABLE staging_concepts AS SELECT * FROM openalex.concepts LIMIT 0;
+CREATE TEMPORARY TABLE staging_concepts_ancestors AS SELECT * FROM openalex.concepts_ancestors LIMIT 0;
+CREATE TEMPORARY TABLE staging_concepts_counts_by_year AS SELECT * FROM openalex.concepts_counts_by_year LIMIT 0;
+CREATE TEMPORARY TABLE staging_concepts_ids AS SELECT * FROM openalex.concepts_ids LIMIT 0;
+CREATE TEMPORARY TABLE staging_concepts_related_concepts AS SELECT * FROM openalex.concepts_related_concepts LIMIT 0;
+COPY staging_concepts (id, wikidata, display_name, level, description, works_count, cited_by_count, image_url, image_thumbnail_url, works_api_url, updated_date) FROM 'csv-files/concepts.csv.gz';
+COPY staging_concepts_ancestors (concept_id, ancestor_id) FROM 'csv-files/concepts_ancestors.csv.gz';
+COPY staging_concepts_counts_by_year (concept_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/concepts_counts_by_year.csv.gz';
+COPY staging_concepts_ids (concept_id, openalex, wikidata, wikipedia, umls_aui, umls_cui, mag) FROM 'csv-files/concepts_ids.csv.gz';
+COPY staging_concepts_related_concepts (concept_id, related_concept_id, score) FROM 'csv-files/concepts_related_concepts.csv.gz';
+DELETE FROM openalex.concepts WHERE id IN (SELECT id FROM staging_concepts);
+DELETE FROM openalex.concepts_ancestors WHERE concept_id IN (SELECT id FROM staging_concepts);
+DELETE FROM openalex.concepts_counts_by_year WHERE concept_id IN (SELECT id FROM staging_concepts);
+DELETE FROM openalex.concepts_ids WHERE concept_id IN (SELECT id FROM staging_concepts);
+DELETE FROM openalex.concepts_related_concepts WHERE concept_id IN (SELECT id FROM staging_concepts);
+INSERT INTO openalex.concepts SELECT * FROM staging_concepts;
+INSERT INTO openalex.concepts_ancestors SELECT * FROM staging_concepts_ancestors;
+INSERT INTO openalex.concepts_counts_by_year SELECT * FROM staging_concepts_counts_by_year;
+INSERT INTO openalex.concepts_ids SELECT * FROM staging_concepts_ids;
+INSERT INTO openalex.concepts_related_concepts SELECT * FROM staging_concepts_related_concepts;
+DROP TABLE staging_concepts;
+DROP TABLE staging_concepts_ancestors;
+DROP TABLE staging_concepts_counts_by_year;
+DROP TABLE staging_concepts_ids;
+DROP TABLE staging_concepts_related_concepts;
+
+-- institutions
+
+CREATE TEMPORARY TABLE staging_institutions AS SELECT * FROM openalex.institutions LIMIT 0;
+CREATE TEMPORARY TABLE staging_institutions_ids AS SELECT * FROM openalex.institutions_ids LIMIT 0;
+CREATE TEMPORARY TABLE staging_institutions_geo AS SELECT * FROM openalex.institutions_geo LIMIT 0;
+CREATE TEMPORARY TABLE staging_institutions_associated_institutions AS SELECT * FROM openalex.institutions_associated_institutions LIMIT 0;
+CREATE TEMPORARY TABLE staging_institutions_counts_by_year AS SELECT * FROM openalex.institutions_counts_by_year LIMIT 0;
+COPY staging_institutions (id, ror, display_name, country_code, type, homepage_url, image_url, image_thumbnail_url, display_name_acronyms, display_name_alternatives, works_count, cited_by_count, works_api_url, updated_date) FROM 'csv-files/institutions.csv.gz';
+COPY staging_institutions_ids (institution_id, openalex, ror, grid, wikipedia, wikidata, mag) FROM 'csv-files/institutions_ids.csv.gz';
+COPY staging_institutions_geo (institution_id, city, geonames_city_id, region, country_code, country, latitude, longitude) FROM 'csv-files/institutions_geo.csv.gz';
+COPY staging_institutions_associated_institutions (institution_id, associated_institution_id, relationship) FROM 'csv-files/institutions_associated_institutions.csv.gz';
+COPY staging_institutions_counts_by_year (institution_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/institutions_counts_by_year.csv.gz';
+DELETE FROM openalex.institutions WHERE id IN (SELECT id FROM staging_institutions);
+DELETE FROM openalex.institutions_ids WHERE institution_id IN (SELECT id FROM staging_institutions);
+DELETE FROM openalex.institutions_geo WHERE institution_id IN (SELECT id FROM staging_institutions);
+DELETE FROM openalex.institutions_associated_institutions WHERE institution_id IN (SELECT id FROM staging_institutions);
+DELETE FROM openalex.institutions_counts_by_year WHERE institution_id IN (SELECT id FROM staging_institutions);
+INSERT INTO openalex.institutions SELECT * FROM staging_institutions;
+INSERT INTO openalex.institutions_ids SELECT * FROM staging_institutions_ids;
+INSERT INTO openalex.institutions_geo SELECT * FROM staging_institutions_geo;
+INSERT INTO openalex.institutions_associated_institutions SELECT * FROM staging_institutions_associated_institutions;
+INSERT INTO openalex.institutions_counts_by_year SELECT * FROM staging_institutions_counts_by_year;
+DROP TABLE staging_institutions;
+DROP TABLE staging_institutions_ids;
+DROP TABLE staging_institutions_geo;
+DROP TABLE staging_institutions_associated_institutions;
+DROP TABLE staging_institutions_counts_by_year;
+
+-- publishers
+
+CREATE TEMPORARY TABLE staging_publishers AS SELECT * FROM openalex.publishers LIMIT 0;
+CREATE TEMPORARY TABLE staging_publishers_ids AS SELECT * FROM openalex.publishers_ids LIMIT 0;
+CREATE TEMPORARY TABLE staging_publishers_counts_by_year AS SELECT * FROM openalex.publishers_counts_by_year LIMIT 0;
+COPY staging_publishers (id, display_name, alternate_titles, country_codes, hierarchy_level, parent_publisher, works_count, cited_by_count, sources_api_url, updated_date) FROM 'csv-files/publishers.csv.gz';
+COPY staging_publishers_ids (publisher_id, openalex, ror, wikidata) FROM 'csv-files/publishers_ids.csv.gz';
+COPY staging_publishers_counts_by_year (publisher_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/publishers_counts_by_year.csv.gz';
+DELETE FROM openalex.publishers WHERE id IN (SELECT id FROM staging_publishers);
+DELETE FROM openalex.publishers_ids WHERE publisher_id IN (SELECT id FROM staging_publishers);
+DELETE FROM openalex.publishers_counts_by_year WHERE publisher_id IN (SELECT id FROM staging_publishers);
+INSERT INTO openalex.publishers SELECT * FROM staging_publishers;
+INSERT INTO openalex.publishers_ids SELECT * FROM staging_publishers_ids;
+INSERT INTO openalex.publishers_counts_by_year SELECT * FROM staging_publishers_counts_by_year;
+DROP TABLE staging_publishers;
+DROP TABLE staging_publishers_ids;
+DROP TABLE staging_publishers_counts_by_year;
+
+-- sources
+
+CREATE TEMPORARY TABLE staging_sources AS SELECT * FROM openalex.sources LIMIT 0;
+CREATE TEMPORARY TABLE staging_sources_ids AS SELECT * FROM openalex.sources_ids LIMIT 0;
+CREATE TEMPORARY TABLE staging_sources_counts_by_year AS SELECT * FROM openalex.sources_counts_by_year LIMIT 0;
+COPY staging_sources (id, issn_l, issn, display_name, publisher, works_count, cited_by_count, is_oa, is_in_doaj, homepage_url, works_api_url, updated_date) FROM 'csv-files/sources.csv.gz';
+COPY staging_sources_ids (source_id, openalex, issn_l, issn, mag, wikidata, fatcat) FROM 'csv-files/sources_ids.csv.gz';
+COPY staging_sources_counts_by_year (source_id, year, works_count, cited_by_count, oa_works_count) FROM 'csv-files/sources_counts_by_year.csv.gz';
+DELETE FROM openalex.sources WHERE id IN (SELECT id FROM staging_sources);
+DELETE FROM openalex.sources_ids WHERE source_id IN (SELECT id FROM staging_sources);
+DELETE FROM openalex.sources_counts_by_year WHERE source_id IN (SELECT id FROM staging_sources);
+INSERT INTO openalex.sources SELECT * FROM staging_sources;
+INSERT INTO openalex.sources_ids SELECT * FROM staging_sources_ids;
+INSERT INTO openalex.sources_counts_by_year SELECT * FROM staging_sources_counts_by_year;
+DROP TABLE staging_sources;
+DROP TABLE staging_sources_ids;
+DROP TABLE staging_sources_counts_by_year;
+
+-- works
+
+CREATE TEMPORARY TABLE staging_works AS SELECT * FROM openalex.works LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_primary_locations AS SELECT * FROM openalex.works_primary_locations LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_locations AS SELECT * FROM openalex.works_locations LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_best_oa_locations AS SELECT * FROM openalex.works_best_oa_locations LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_authorships AS SELECT * FROM openalex.works_authorships LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_biblio AS SELECT * FROM openalex.works_biblio LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_topics AS SELECT * FROM openalex.works_topics LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_concepts AS SELECT * FROM openalex.works_concepts LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_ids AS SELECT * FROM openalex.works_ids LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_mesh AS SELECT * FROM openalex.works_mesh LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_open_access AS SELECT * FROM openalex.works_open_access LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_referenced_works AS SELECT * FROM openalex.works_referenced_works LIMIT 0;
+CREATE TEMPORARY TABLE staging_works_related_works AS SELECT * FROM openalex.works_related_works LIMIT 0;
+COPY staging_works (id, doi, title, display_name, publication_year, publication_date, type, cited_by_count, is_retracted, is_paratext, cited_by_api_url, abstract_inverted_index, language) FROM 'csv-files/works.csv.gz';
+COPY staging_works_primary_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) FROM 'csv-files/works_primary_locations.csv.gz';
+COPY staging_works_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) FROM 'csv-files/works_locations.csv.gz';
+COPY staging_works_best_oa_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) FROM 'csv-files/works_best_oa_locations.csv.gz';
+COPY staging_works_authorships (work_id, author_position, author_id, institution_id, raw_affiliation_string) FROM 'csv-files/works_authorships.csv.gz';
+COPY staging_works_biblio (work_id, volume, issue, first_page, last_page) FROM 'csv-files/works_biblio.csv.gz';
+COPY staging_works_topics (work_id, topic_id, score) FROM 'csv-files/works_topics.csv.gz';
+COPY staging_works_concepts (work_id, concept_id, score) FROM 'csv-files/works_concepts.csv.gz';
+COPY staging_works_ids (work_id, openalex, doi, mag, pmid, pmcid) FROM 'csv-files/works_ids.csv.gz';
+COPY staging_works_mesh (work_id, descriptor_ui, descriptor_name, qualifier_ui, qualifier_name, is_major_topic) FROM 'csv-files/works_mesh.csv.gz';
+COPY staging_works_open_access (work_id, is_oa, oa_status, oa_url, any_repository_has_fulltext) FROM 'csv-files/works_open_access.csv.gz';
+COPY staging_works_referenced_works (work_id, referenced_work_id) FROM 'csv-files/works_referenced_works.csv.gz';
+COPY staging_works_related_works (work_id, related_work_id) FROM 'csv-files/works_related_works.csv.gz';
+DELETE FROM openalex.works WHERE id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_primary_locations WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_locations WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_best_oa_locations WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_authorships WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_biblio WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_topics WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_concepts WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_ids WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_mesh WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_open_access WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_referenced_works WHERE work_id IN (SELECT id FROM staging_works);
+DELETE FROM openalex.works_related_works WHERE work_id IN (SELECT id FROM staging_works);
+INSERT INTO openalex.works SELECT * FROM staging_works;
+INSERT INTO openalex.works_primary_locations SELECT * FROM staging_works_primary_locations;
+INSERT INTO openalex.works_locations SELECT * FROM staging_works_locations;
+INSERT INTO openalex.works_best_oa_locations SELECT * FROM staging_works_best_oa_locations;
+INSERT INTO openalex.works_authorships SELECT * FROM staging_works_authorships;
+INSERT INTO openalex.works_biblio SELECT * FROM staging_works_biblio;
+INSERT INTO openalex.works_topics SELECT * FROM staging_works_topics;
+INSERT INTO openalex.works_concepts SELECT * FROM staging_works_concepts;
+INSERT INTO openalex.works_ids SELECT * FROM staging_works_ids;
+INSERT INTO openalex.works_mesh SELECT * FROM staging_works_mesh;
+INSERT INTO openalex.works_open_access SELECT * FROM staging_works_open_access;
+INSERT INTO openalex.works_referenced_works SELECT * FROM staging_works_referenced_works;
+INSERT INTO openalex.works_related_works SELECT * FROM staging_works_related_works;
+DROP TABLE staging_works;
+DROP TABLE staging_works_primary_locations;
+DROP TABLE staging_works_locations;
+DROP TABLE staging_works_best_oa_locations;
+DROP TABLE staging_works_authorships;
+DROP TABLE staging_works_biblio;
+DROP TABLE staging_works_topics;
+DROP TABLE staging_works_concepts;
+DROP TABLE staging_works_ids;
+DROP TABLE staging_works_mesh;
+DROP TABLE staging_works_open_access;
+DROP TABLE staging_works_referenced_works;
+DROP TABLE staging_works_related_works;
+
+COMMIT;
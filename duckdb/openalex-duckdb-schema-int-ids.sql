@@ -0,0 +1,786 @@
+--
+-- Written by generate-sql.py from openalex/tables.py, edit the tables there
+--
+
+--
+-- Name: openalex; Type: SCHEMA; Schema: -; Owner: -
+--
+
+CREATE SCHEMA openalex;
+
+
+--
+-- Name: authors; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.authors (
+    id bigint NOT NULL,
+    orcid text,
+    display_name text,
+    display_name_alternatives json,
+    works_count integer,
+    cited_by_count integer,
+    last_known_institution bigint,
+    works_api_url text,
+    updated_date timestamp without time zone
+);
+
+
+--
+-- Name: authors_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.authors_ids (
+    author_id bigint NOT NULL,
+    openalex bigint,
+    orcid text,
+    scopus text,
+    twitter text,
+    wikipedia text,
+    mag bigint
+);
+
+
+--
+-- Name: authors_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.authors_counts_by_year (
+    author_id bigint NOT NULL,
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
+);
+
+
+--
+-- Name: topics; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.topics (
+    id bigint NOT NULL,
+    display_name text,
+    subfield_id bigint,
+    subfield_display_name text,
+    field_id bigint,
+    field_display_name text,
+    domain_id bigint,
+    domain_display_name text,
+    description text,
+    keywords text,
+    works_api_url text,
+    wikipedia_id text,
+    works_count integer,
+    cited_by_count integer,
+    updated_date timestamp without time zone,
+    siblings json
+);
+
+
+--
+-- Name: concepts; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.concepts (
+    id bigint NOT NULL,
+    wikidata text,
+    display_name text,
+    level integer,
+    description text,
+    works_count integer,
+    cited_by_count integer,
+    image_url text,
+    image_thumbnail_url text,
+    works_api_url text,
+    updated_date timestamp without time zone
+);
+
+
+--
+-- Name: concepts_ancestors; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.concepts_ancestors (
+    concept_id bigint,
+    ancestor_id bigint
+);
+
+
+--
+-- Name: concepts_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.concepts_counts_by_year (
+    concept_id bigint NOT NULL,
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
+);
+
+
+--
+-- Name: concepts_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.concepts_ids (
+    concept_id bigint NOT NULL,
+    openalex bigint,
+    wikidata text,
+    wikipedia text,
+    umls_aui json,
+    umls_cui json,
+    mag bigint
+);
+
+
+--
+-- Name: concepts_related_concepts; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.concepts_related_concepts (
+    concept_id bigint,
+    related_concept_id bigint,
+    score real
+);
+
+
+--
+-- Name: institutions; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.institutions (
+    id bigint NOT NULL,
+    ror text,
+    display_name text,
+    country_code text,
+    type text,
+    homepage_url text,
+    image_url text,
+    image_thumbnail_url text,
+    display_name_acronyms json,
+    display_name_alternatives json,
+    works_count integer,
+    cited_by_count integer,
+    works_api_url text,
+    updated_date timestamp without time zone
+);
+
+
+--
+-- Name: institutions_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.institutions_ids (
+    institution_id bigint NOT NULL,
+    openalex bigint,
+    ror text,
+    grid text,
+    wikipedia text,
+    wikidata text,
+    mag bigint
+);
+
+
+--
+-- Name: institutions_geo; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.institutions_geo (
+    institution_id bigint NOT NULL,
+    city text,
+    geonames_city_id text,
+    region text,
+    country_code text,
+    country text,
+    latitude real,
+    longitude real
+);
+
+
+--
+-- Name: institutions_associated_institutions; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.institutions_associated_institutions (
+    institution_id bigint,
+    associated_institution_id bigint,
+    relationship text
+);
+
+
+--
+-- Name: institutions_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.institutions_counts_by_year (
+    institution_id bigint NOT NULL,
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
+);
+
+
+--
+-- Name: publishers; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.publishers (
+    id bigint NOT NULL,
+    display_name text,
+    alternate_titles json,
+    country_codes json,
+    hierarchy_level integer,
+    parent_publisher text,
+    works_count integer,
+    cited_by_count integer,
+    sources_api_url text,
+    updated_date timestamp without time zone
+);
+
+
+--
+-- Name: publishers_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.publishers_ids (
+    publisher_id bigint,
+    openalex bigint,
+    ror text,
+    wikidata text
+);
+
+
+--
+-- Name: publishers_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.publishers_counts_by_year (
+    publisher_id bigint NOT NULL,
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
+);
+
+
+--
+-- Name: sources; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.sources (
+    id bigint NOT NULL,
+    issn_l text,
+    issn json,
+    display_name text,
+    publisher text,
+    works_count integer,
+    cited_by_count integer,
+    is_oa boolean,
+    is_in_doaj boolean,
+    homepage_url text,
+    works_api_url text,
+    updated_date timestamp without time zone
+);
+
+
+--
+-- Name: sources_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.sources_ids (
+    source_id bigint,
+    openalex bigint,
+    issn_l text,
+    issn json,
+    mag bigint,
+    wikidata text,
+    fatcat text
+);
+
+
+--
+-- Name: sources_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.sources_counts_by_year (
+    source_id bigint NOT NULL,
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
+);
+
+
+--
+-- Name: works; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works (
+    id bigint NOT NULL,
+    doi text,
+    title text,
+    display_name text,
+    publication_year integer,
+    publication_date text,
+    type text,
+    cited_by_count integer,
+    is_retracted boolean,
+    is_paratext boolean,
+    cited_by_api_url text,
+    abstract_inverted_index json,
+    language text
+);
+
+
+--
+-- Name: works_primary_locations; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_primary_locations (
+    work_id bigint,
+    source_id bigint,
+    landing_page_url text,
+    pdf_url text,
+    is_oa boolean,
+    version text,
+    license text
+);
+
+
+--
+-- Name: works_locations; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_locations (
+    work_id bigint,
+    source_id bigint,
+    landing_page_url text,
+    pdf_url text,
+    is_oa boolean,
+    version text,
+    license text
+);
+
+
+--
+-- Name: works_best_oa_locations; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_best_oa_locations (
+    work_id bigint,
+    source_id bigint,
+    landing_page_url text,
+    pdf_url text,
+    is_oa boolean,
+    version text,
+    license text
+);
+
+
+--
+-- Name: works_authorships; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_authorships (
+    work_id bigint,
+    author_position text,
+    author_id bigint,
+    institution_id bigint,
+    raw_affiliation_string text
+);
+
+
+--
+-- Name: works_biblio; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_biblio (
+    work_id bigint NOT NULL,
+    volume text,
+    issue text,
+    first_page text,
+    last_page text
+);
+
+
+--
+-- Name: works_topics; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_topics (
+    work_id bigint,
+    topic_id bigint,
+    score real
+);
+
+
+--
+-- Name: works_concepts; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_concepts (
+    work_id bigint,
+    concept_id bigint,
+    score real
+);
+
+
+--
+-- Name: works_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_ids (
+    work_id bigint NOT NULL,
+    openalex bigint,
+    doi text,
+    mag bigint,
+    pmid text,
+    pmcid text
+);
+
+
+--
+-- Name: works_mesh; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_mesh (
+    work_id bigint,
+    descriptor_ui text,
+    descriptor_name text,
+    qualifier_ui text,
+    qualifier_name text,
+    is_major_topic boolean
+);
+
+
+--
+-- Name: works_open_access; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_open_access (
+    work_id bigint NOT NULL,
+    is_oa boolean,
+    oa_status text,
+    oa_url text,
+    any_repository_has_fulltext boolean
+);
+
+
+--
+-- Name: works_referenced_works; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_referenced_works (
+    work_id bigint,
+    referenced_work_id bigint
+);
+
+
+--
+-- Name: works_related_works; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.works_related_works (
+    work_id bigint,
+    related_work_id bigint
+);
+
+
+----
+---- Name: authors authors_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.authors ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: authors_ids authors_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.authors_ids ADD PRIMARY KEY (author_id);
+--
+--
+----
+---- Name: authors_counts_by_year authors_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.authors_counts_by_year ADD PRIMARY KEY (author_id, year);
+--
+--
+----
+---- Name: topics topics_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.topics ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: concepts concepts_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.concepts ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: concepts_counts_by_year concepts_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.concepts_counts_by_year ADD PRIMARY KEY (concept_id, year);
+--
+--
+----
+---- Name: concepts_ids concepts_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.concepts_ids ADD PRIMARY KEY (concept_id);
+--
+--
+----
+---- Name: institutions institutions_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.institutions ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: institutions_ids institutions_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.institutions_ids ADD PRIMARY KEY (institution_id);
+--
+--
+----
+---- Name: institutions_geo institutions_geo_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.institutions_geo ADD PRIMARY KEY (institution_id);
+--
+--
+----
+---- Name: institutions_counts_by_year institutions_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.institutions_counts_by_year ADD PRIMARY KEY (institution_id, year);
+--
+--
+----
+---- Name: publishers publishers_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.publishers ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: publishers_counts_by_year publishers_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.publishers_counts_by_year ADD PRIMARY KEY (publisher_id, year);
+--
+--
+----
+---- Name: sources sources_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.sources ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: sources_counts_by_year sources_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.sources_counts_by_year ADD PRIMARY KEY (source_id, year);
+--
+--
+----
+---- Name: works works_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.works ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: works_biblio works_biblio_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.works_biblio ADD PRIMARY KEY (work_id);
+--
+--
+----
+---- Name: works_ids works_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.works_ids ADD PRIMARY KEY (work_id);
+--
+--
+----
+---- Name: works_open_access works_open_access_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.works_open_access ADD PRIMARY KEY (work_id);
+--
+--
+
+--
+-- Name: authors_ids_author_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX authors_ids_author_id_idx ON openalex.authors_ids (author_id);
+
+--
+-- Name: authors_counts_by_year_author_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX authors_counts_by_year_author_id_idx ON openalex.authors_counts_by_year (author_id);
+
+--
+-- Name: concepts_ancestors_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_ancestors_concept_id_idx ON openalex.concepts_ancestors (concept_id);
+
+--
+-- Name: concepts_counts_by_year_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_counts_by_year_concept_id_idx ON openalex.concepts_counts_by_year (concept_id);
+
+--
+-- Name: concepts_ids_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_ids_concept_id_idx ON openalex.concepts_ids (concept_id);
+
+--
+-- Name: concepts_related_concepts_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_related_concepts_concept_id_idx ON openalex.concepts_related_concepts (concept_id);
+
+--
+-- Name: concepts_related_concepts_related_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_related_concepts_related_concept_id_idx ON openalex.concepts_related_concepts (related_concept_id);
+
+--
+-- Name: institutions_ids_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_ids_institution_id_idx ON openalex.institutions_ids (institution_id);
+
+--
+-- Name: institutions_geo_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_geo_institution_id_idx ON openalex.institutions_geo (institution_id);
+
+--
+-- Name: institutions_associated_institutions_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_associated_institutions_institution_id_idx ON openalex.institutions_associated_institutions (institution_id);
+
+--
+-- Name: institutions_counts_by_year_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_counts_by_year_institution_id_idx ON openalex.institutions_counts_by_year (institution_id);
+
+--
+-- Name: publishers_ids_publisher_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX publishers_ids_publisher_id_idx ON openalex.publishers_ids (publisher_id);
+
+--
+-- Name: publishers_counts_by_year_publisher_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX publishers_counts_by_year_publisher_id_idx ON openalex.publishers_counts_by_year (publisher_id);
+
+--
+-- Name: sources_ids_source_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX sources_ids_source_id_idx ON openalex.sources_ids (source_id);
+
+--
+-- Name: sources_counts_by_year_source_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX sources_counts_by_year_source_id_idx ON openalex.sources_counts_by_year (source_id);
+
+--
+-- Name: works_primary_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_primary_locations_work_id_idx ON openalex.works_primary_locations (work_id);
+
+--
+-- Name: works_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_locations_work_id_idx ON openalex.works_locations (work_id);
+
+--
+-- Name: works_best_oa_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_best_oa_locations_work_id_idx ON openalex.works_best_oa_locations (work_id);
+
+--
+-- Name: works_authorships_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_authorships_work_id_idx ON openalex.works_authorships (work_id);
+
+--
+-- Name: works_biblio_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_biblio_work_id_idx ON openalex.works_biblio (work_id);
+
+--
+-- Name: works_topics_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_topics_work_id_idx ON openalex.works_topics (work_id);
+
+--
+-- Name: works_concepts_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_concepts_work_id_idx ON openalex.works_concepts (work_id);
+
+--
+-- Name: works_ids_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_ids_work_id_idx ON openalex.works_ids (work_id);
+
+--
+-- Name: works_mesh_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_mesh_work_id_idx ON openalex.works_mesh (work_id);
+
+--
+-- Name: works_open_access_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_open_access_work_id_idx ON openalex.works_open_access (work_id);
+
+--
+-- Name: works_referenced_works_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_referenced_works_work_id_idx ON openalex.works_referenced_works (work_id);
+
+--
+-- Name: works_related_works_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_related_works_work_id_idx ON openalex.works_related_works (work_id);
@@ -1,9 +1,14 @@
+--
+-- Written by generate-sql.py from openalex/tables.py, edit the tables there
+--
+
 --
 -- Name: openalex; Type: SCHEMA; Schema: -; Owner: -
 --
 
 CREATE SCHEMA openalex;
 
+
 --
 -- Name: authors; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -21,6 +26,21 @@ CREATE TABLE openalex.authors (
 );
 
 
+--
+-- Name: authors_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.authors_ids (
+    author_id text NOT NULL,
+    openalex text,
+    orcid text,
+    scopus text,
+    twitter text,
+    wikipedia text,
+    mag bigint
+);
+
+
 --
 -- Name: authors_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -35,20 +55,9 @@ CREATE TABLE openalex.authors_counts_by_year (
 
 
 --
--- Name: authors_ids; Type: TABLE; Schema: openalex; Owner: -
+-- Name: topics; Type: TABLE; Schema: openalex; Owner: -
 --
 
-CREATE TABLE openalex.authors_ids (
-    author_id text NOT NULL,
-    openalex text,
-    orcid text,
-    scopus text,
-    twitter text,
-    wikipedia text,
-    mag bigint
-);
-
-
 CREATE TABLE openalex.topics (
     id text NOT NULL,
     display_name text,
@@ -68,6 +77,7 @@ CREATE TABLE openalex.topics (
     siblings json
 );
 
+
 --
 -- Name: concepts; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -159,26 +169,17 @@ CREATE TABLE openalex.institutions (
 
 
 --
--- Name: institutions_associated_institutions; Type: TABLE; Schema: openalex; Owner: -
---
-
-CREATE TABLE openalex.institutions_associated_institutions (
-    institution_id text,
-    associated_institution_id text,
-    relationship text
-);
-
-
---
--- Name: institutions_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+-- Name: institutions_ids; Type: TABLE; Schema: openalex; Owner: -
 --
 
-CREATE TABLE openalex.institutions_counts_by_year (
+CREATE TABLE openalex.institutions_ids (
     institution_id text NOT NULL,
-    year integer NOT NULL,
-    works_count integer,
-    cited_by_count integer,
-    oa_works_count integer
+    openalex text,
+    ror text,
+    grid text,
+    wikipedia text,
+    wikidata text,
+    mag bigint
 );
 
 
@@ -199,17 +200,26 @@ CREATE TABLE openalex.institutions_geo (
 
 
 --
--- Name: institutions_ids; Type: TABLE; Schema: openalex; Owner: -
+-- Name: institutions_associated_institutions; Type: TABLE; Schema: openalex; Owner: -
 --
 
-CREATE TABLE openalex.institutions_ids (
+CREATE TABLE openalex.institutions_associated_institutions (
+    institution_id text,
+    associated_institution_id text,
+    relationship text
+);
+
+
+--
+-- Name: institutions_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.institutions_counts_by_year (
     institution_id text NOT NULL,
-    openalex text,
-    ror text,
-    grid text,
-    wikipedia text,
-    wikidata text,
-    mag bigint
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
 );
 
 
@@ -231,6 +241,18 @@ CREATE TABLE openalex.publishers (
 );
 
 
+--
+-- Name: publishers_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.publishers_ids (
+    publisher_id text,
+    openalex text,
+    ror text,
+    wikidata text
+);
+
+
 --
 -- Name: publishers_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -244,18 +266,6 @@ CREATE TABLE openalex.publishers_counts_by_year (
 );
 
 
---
--- Name: publishers_ids; Type: TABLE; Schema: openalex; Owner: -
---
-
-CREATE TABLE openalex.publishers_ids (
-    publisher_id text,
-    openalex text,
-    ror text,
-    wikidata text
-);
-
-
 --
 -- Name: sources; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -276,19 +286,6 @@ CREATE TABLE openalex.sources (
 );
 
 
---
--- Name: sources_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
---
-
-CREATE TABLE openalex.sources_counts_by_year (
-    source_id text NOT NULL,
-    year integer NOT NULL,
-    works_count integer,
-    cited_by_count integer,
-    oa_works_count integer
-);
-
-
 --
 -- Name: sources_ids; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -304,6 +301,19 @@ CREATE TABLE openalex.sources_ids (
 );
 
 
+--
+-- Name: sources_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.sources_counts_by_year (
+    source_id text NOT NULL,
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
+);
+
+
 --
 -- Name: works; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -324,6 +334,7 @@ CREATE TABLE openalex.works (
     language text
 );
 
+
 --
 -- Name: works_primary_locations; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -394,6 +405,7 @@ CREATE TABLE openalex.works_biblio (
     last_page text
 );
 
+
 --
 -- Name: works_topics; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -404,6 +416,7 @@ CREATE TABLE openalex.works_topics (
     score real
 );
 
+
 --
 -- Name: works_concepts; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -477,139 +490,168 @@ CREATE TABLE openalex.works_related_works (
 
 
 ----
----- Name: authors_counts_by_year authors_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: authors authors_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.authors_counts_by_year
---    ADD CONSTRAINT authors_counts_by_year_pkey PRIMARY KEY (author_id, year);
+--ALTER TABLE openalex.authors ADD PRIMARY KEY (id);
 --
 --
 ----
 ---- Name: authors_ids authors_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.authors_ids
---    ADD CONSTRAINT authors_ids_pkey PRIMARY KEY (author_id);
+--ALTER TABLE openalex.authors_ids ADD PRIMARY KEY (author_id);
 --
 --
 ----
----- Name: authors authors_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: authors_counts_by_year authors_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.authors_counts_by_year ADD PRIMARY KEY (author_id, year);
+--
+--
+----
+---- Name: topics topics_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.topics ADD PRIMARY KEY (id);
+--
+--
+----
+---- Name: concepts concepts_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.authors
---    ADD CONSTRAINT authors_pkey PRIMARY KEY (id);
+--ALTER TABLE openalex.concepts ADD PRIMARY KEY (id);
 --
 --
 ----
 ---- Name: concepts_counts_by_year concepts_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.concepts_counts_by_year
---    ADD CONSTRAINT concepts_counts_by_year_pkey PRIMARY KEY (concept_id, year);
+--ALTER TABLE openalex.concepts_counts_by_year ADD PRIMARY KEY (concept_id, year);
 --
 --
 ----
 ---- Name: concepts_ids concepts_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.concepts_ids
---    ADD CONSTRAINT concepts_ids_pkey PRIMARY KEY (concept_id);
+--ALTER TABLE openalex.concepts_ids ADD PRIMARY KEY (concept_id);
 --
 --
 ----
----- Name: concepts concepts_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: institutions institutions_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.concepts
---    ADD CONSTRAINT concepts_pkey PRIMARY KEY (id);
+--ALTER TABLE openalex.institutions ADD PRIMARY KEY (id);
 --
 --
 ----
----- Name: institutions_counts_by_year institutions_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: institutions_ids institutions_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.institutions_counts_by_year
---    ADD CONSTRAINT institutions_counts_by_year_pkey PRIMARY KEY (institution_id, year);
+--ALTER TABLE openalex.institutions_ids ADD PRIMARY KEY (institution_id);
 --
 --
 ----
 ---- Name: institutions_geo institutions_geo_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.institutions_geo
---    ADD CONSTRAINT institutions_geo_pkey PRIMARY KEY (institution_id);
+--ALTER TABLE openalex.institutions_geo ADD PRIMARY KEY (institution_id);
 --
 --
 ----
----- Name: institutions_ids institutions_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: institutions_counts_by_year institutions_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.institutions_ids
---    ADD CONSTRAINT institutions_ids_pkey PRIMARY KEY (institution_id);
+--ALTER TABLE openalex.institutions_counts_by_year ADD PRIMARY KEY (institution_id, year);
 --
 --
 ----
----- Name: institutions institutions_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: publishers publishers_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.institutions
---    ADD CONSTRAINT institutions_pkey PRIMARY KEY (id);
+--ALTER TABLE openalex.publishers ADD PRIMARY KEY (id);
 --
 --
 ----
----- Name: sources source_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: publishers_counts_by_year publishers_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.sources
---    ADD CONSTRAINT source_pkey PRIMARY KEY (id);
+--ALTER TABLE openalex.publishers_counts_by_year ADD PRIMARY KEY (publisher_id, year);
+--
+--
+----
+---- Name: sources sources_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.sources ADD PRIMARY KEY (id);
 --
 --
 ----
 ---- Name: sources_counts_by_year sources_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.sources_counts_by_year
---    ADD CONSTRAINT sources_counts_by_year_pkey PRIMARY KEY (source_id, year);
+--ALTER TABLE openalex.sources_counts_by_year ADD PRIMARY KEY (source_id, year);
+--
+--
+----
+---- Name: works works_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE openalex.works ADD PRIMARY KEY (id);
 --
 --
 ----
 ---- Name: works_biblio works_biblio_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.works_biblio
---    ADD CONSTRAINT works_biblio_pkey PRIMARY KEY (work_id);
+--ALTER TABLE openalex.works_biblio ADD PRIMARY KEY (work_id);
 --
 --
 ----
 ---- Name: works_ids works_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.works_ids
---    ADD CONSTRAINT works_ids_pkey PRIMARY KEY (work_id);
+--ALTER TABLE openalex.works_ids ADD PRIMARY KEY (work_id);
 --
 --
 ----
 ---- Name: works_open_access works_open_access_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.works_open_access
---    ADD CONSTRAINT works_open_access_pkey PRIMARY KEY (work_id);
+--ALTER TABLE openalex.works_open_access ADD PRIMARY KEY (work_id);
 --
 --
-----
----- Name: works works_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
-----
+
 --
---ALTER TABLE ONLY openalex.works
---    ADD CONSTRAINT works_pkey PRIMARY KEY (id);
+-- Name: authors_ids_author_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
+CREATE INDEX authors_ids_author_id_idx ON openalex.authors_ids (author_id);
+
+--
+-- Name: authors_counts_by_year_author_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX authors_counts_by_year_author_id_idx ON openalex.authors_counts_by_year (author_id);
+
 --
 -- Name: concepts_ancestors_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX concepts_ancestors_concept_id_idx ON openalex.concepts_ancestors (concept_id);
 
+--
+-- Name: concepts_counts_by_year_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_counts_by_year_concept_id_idx ON openalex.concepts_counts_by_year (concept_id);
+
+--
+-- Name: concepts_ids_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_ids_concept_id_idx ON openalex.concepts_ids (concept_id);
 
 --
 -- Name: concepts_related_concepts_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
@@ -617,34 +659,128 @@ CREATE INDEX concepts_ancestors_concept_id_idx ON openalex.concepts_ancestors (c
 
 CREATE INDEX concepts_related_concepts_concept_id_idx ON openalex.concepts_related_concepts (concept_id);
 
-
 --
 -- Name: concepts_related_concepts_related_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX concepts_related_concepts_related_concept_id_idx ON openalex.concepts_related_concepts (related_concept_id);
 
+--
+-- Name: institutions_ids_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_ids_institution_id_idx ON openalex.institutions_ids (institution_id);
+
+--
+-- Name: institutions_geo_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_geo_institution_id_idx ON openalex.institutions_geo (institution_id);
+
+--
+-- Name: institutions_associated_institutions_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_associated_institutions_institution_id_idx ON openalex.institutions_associated_institutions (institution_id);
+
+--
+-- Name: institutions_counts_by_year_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_counts_by_year_institution_id_idx ON openalex.institutions_counts_by_year (institution_id);
+
+--
+-- Name: publishers_ids_publisher_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX publishers_ids_publisher_id_idx ON openalex.publishers_ids (publisher_id);
+
+--
+-- Name: publishers_counts_by_year_publisher_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX publishers_counts_by_year_publisher_id_idx ON openalex.publishers_counts_by_year (publisher_id);
+
+--
+-- Name: sources_ids_source_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX sources_ids_source_id_idx ON openalex.sources_ids (source_id);
+
+--
+-- Name: sources_counts_by_year_source_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX sources_counts_by_year_source_id_idx ON openalex.sources_counts_by_year (source_id);
+
 --
 -- Name: works_primary_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX works_primary_locations_work_id_idx ON openalex.works_primary_locations (work_id);
 
-
 --
 -- Name: works_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX works_locations_work_id_idx ON openalex.works_locations (work_id);
 
-
 --
 -- Name: works_best_oa_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX works_best_oa_locations_work_id_idx ON openalex.works_best_oa_locations (work_id);
 
+--
+-- Name: works_authorships_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_authorships_work_id_idx ON openalex.works_authorships (work_id);
+
+--
+-- Name: works_biblio_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_biblio_work_id_idx ON openalex.works_biblio (work_id);
+
+--
+-- Name: works_topics_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_topics_work_id_idx ON openalex.works_topics (work_id);
+
+--
+-- Name: works_concepts_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_concepts_work_id_idx ON openalex.works_concepts (work_id);
 
 --
--- PostgreSQL database dump complete
+-- Name: works_ids_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
+
+CREATE INDEX works_ids_work_id_idx ON openalex.works_ids (work_id);
+
+--
+-- Name: works_mesh_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_mesh_work_id_idx ON openalex.works_mesh (work_id);
+
+--
+-- Name: works_open_access_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_open_access_work_id_idx ON openalex.works_open_access (work_id);
+
+--
+-- Name: works_referenced_works_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_referenced_works_work_id_idx ON openalex.works_referenced_works (work_id);
+
+--
+-- Name: works_related_works_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_related_works_work_id_idx ON openalex.works_related_works (work_id);
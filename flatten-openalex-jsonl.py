@@ -1,14 +1,51 @@
 import csv
-import glob
-import gzip
 import json
 import os
+import shutil
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, suppress
 from dataclasses import dataclass
-from typing import TextIO
-from ordered_set import OrderedSet
+from enum import Enum
+from itertools import groupby
+from pathlib import Path
+from typing import Annotated, Callable, Optional, Sequence, TextIO
+import typer
+
+from openalex import metrics, profiling, stats
+from openalex.codec import dumps
+from openalex.columns import ColumnType, column_type
+from openalex.compression import Codec, Compression
+from openalex.entities import (
+    decode_author,
+    decode_concept,
+    decode_institution,
+    decode_publisher,
+    decode_source,
+    decode_topic,
+    decode_work,
+)
+from openalex.ids import ID_COLUMNS, int_id
+from openalex.idset import IdSet, add_file_ids, temporary_id_set
+from openalex.reader import read_records
+from openalex.snapshot import entity_partitions
+from openalex.tables import SCHEMA, TableSpec, select_tables
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 SNAPSHOT_DIR = "openalex-snapshot"
 CSV_DIR = "csv-files"
+# partitions of the snapshot flattened so far, by entity
+STATE_FILE = os.path.join(CSV_DIR, "flattened-partitions.json")
+# works and authors are flattened to one directory of shards per snapshot
+# file first, and the shards are concatenated once all files are done
+SHARD_DIR = os.path.join(CSV_DIR, "shards")
+# with --format parquet, every table is a directory of Parquet files instead
+PARQUET_DIR = "parquet-files"
 
 if not os.path.exists(CSV_DIR):
     os.mkdir(CSV_DIR)
@@ -19,1178 +56,1010 @@ FILES_PER_ENTITY = int(os.environ.get("OPENALEX_DEMO_FILES_PER_ENTITY", "0"))
 @dataclass
 class FileSpec:
     name: str
-    columns: OrderedSet[str]
+    table: TableSpec
 
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self.table.columns
 
+
+# a CSV file per table of openalex/tables.py, keyed by the table name without
+# the entity's prefix, e.g. csv_files["works"]["authorships"]
 csv_files: dict[str, dict[str, FileSpec]] = {
-    "authors": {
-        "authors": FileSpec(
-            name=os.path.join(CSV_DIR, "authors.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "id",
-                    "orcid",
-                    "display_name",
-                    "display_name_alternatives",
-                    "works_count",
-                    "cited_by_count",
-                    "last_known_institution",
-                    "works_api_url",
-                    "updated_date",
-                ]
-            ),
-        ),
-        "ids": FileSpec(
-            name=os.path.join(CSV_DIR, "authors_ids.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "author_id",
-                    "openalex",
-                    "orcid",
-                    "scopus",
-                    "twitter",
-                    "wikipedia",
-                    "mag",
-                ]
-            ),
-        ),
-        "counts_by_year": FileSpec(
-            name=os.path.join(CSV_DIR, "authors_counts_by_year.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "author_id",
-                    "year",
-                    "works_count",
-                    "cited_by_count",
-                    "oa_works_count",
-                ]
-            ),
-        ),
-    },
-    "concepts": {
-        "concepts": FileSpec(
-            name=os.path.join(CSV_DIR, "concepts.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "id",
-                    "wikidata",
-                    "display_name",
-                    "level",
-                    "description",
-                    "works_count",
-                    "cited_by_count",
-                    "image_url",
-                    "image_thumbnail_url",
-                    "works_api_url",
-                    "updated_date",
-                ]
-            ),
-        ),
-        "ancestors": FileSpec(
-            name=os.path.join(CSV_DIR, "concepts_ancestors.csv.gz"),
-            columns=OrderedSet(["concept_id", "ancestor_id"]),
-        ),
-        "counts_by_year": FileSpec(
-            name=os.path.join(CSV_DIR, "concepts_counts_by_year.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "concept_id",
-                    "year",
-                    "works_count",
-                    "cited_by_count",
-                    "oa_works_count",
-                ]
-            ),
-        ),
-        "ids": FileSpec(
-            name=os.path.join(CSV_DIR, "concepts_ids.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "concept_id",
-                    "openalex",
-                    "wikidata",
-                    "wikipedia",
-                    "umls_aui",
-                    "umls_cui",
-                    "mag",
-                ]
-            ),
-        ),
-        "related_concepts": FileSpec(
-            name=os.path.join(CSV_DIR, "concepts_related_concepts.csv.gz"),
-            columns=OrderedSet(["concept_id", "related_concept_id", "score"]),
-        ),
-    },
-    "topics": {
-        "topics": FileSpec(
-            name=os.path.join(CSV_DIR, "topics.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "id",
-                    "display_name",
-                    "subfield_id",
-                    "subfield_display_name",
-                    "field_id",
-                    "field_display_name",
-                    "domain_id",
-                    "domain_display_name",
-                    "description",
-                    "keywords",
-                    "works_api_url",
-                    "wikipedia_id",
-                    "works_count",
-                    "cited_by_count",
-                    "updated_date",
-                    "siblings",
-                ]
-            ),
-        ),
-    },
-    "institutions": {
-        "institutions": FileSpec(
-            name=os.path.join(CSV_DIR, "institutions.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "id",
-                    "ror",
-                    "display_name",
-                    "country_code",
-                    "type",
-                    "homepage_url",
-                    "image_url",
-                    "image_thumbnail_url",
-                    "display_name_acronyms",
-                    "display_name_alternatives",
-                    "works_count",
-                    "cited_by_count",
-                    "works_api_url",
-                    "updated_date",
-                ]
-            ),
-        ),
-        "ids": FileSpec(
-            name=os.path.join(CSV_DIR, "institutions_ids.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "institution_id",
-                    "openalex",
-                    "ror",
-                    "grid",
-                    "wikipedia",
-                    "wikidata",
-                    "mag",
-                ]
-            ),
-        ),
-        "geo": FileSpec(
-            name=os.path.join(CSV_DIR, "institutions_geo.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "institution_id",
-                    "city",
-                    "geonames_city_id",
-                    "region",
-                    "country_code",
-                    "country",
-                    "latitude",
-                    "longitude",
-                ]
-            ),
-        ),
-        "associated_institutions": FileSpec(
-            name=os.path.join(CSV_DIR, "institutions_associated_institutions.csv.gz"),
-            columns=OrderedSet(
-                ["institution_id", "associated_institution_id", "relationship"]
-            ),
-        ),
-        "counts_by_year": FileSpec(
-            name=os.path.join(CSV_DIR, "institutions_counts_by_year.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "institution_id",
-                    "year",
-                    "works_count",
-                    "cited_by_count",
-                    "oa_works_count",
-                ]
-            ),
-        ),
-    },
-    "publishers": {
-        "publishers": FileSpec(
-            name=os.path.join(CSV_DIR, "publishers.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "id",
-                    "display_name",
-                    "alternate_titles",
-                    "country_codes",
-                    "hierarchy_level",
-                    "parent_publisher",
-                    "works_count",
-                    "cited_by_count",
-                    "sources_api_url",
-                    "updated_date",
-                ]
-            ),
-        ),
-        "counts_by_year": FileSpec(
-            name=os.path.join(CSV_DIR, "publishers_counts_by_year.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "publisher_id",
-                    "year",
-                    "works_count",
-                    "cited_by_count",
-                    "oa_works_count",
-                ]
-            ),
-        ),
-        "ids": FileSpec(
-            name=os.path.join(CSV_DIR, "publishers_ids.csv.gz"),
-            columns=OrderedSet(["publisher_id", "openalex", "ror", "wikidata"]),
-        ),
-    },
-    "sources": {
-        "sources": FileSpec(
-            name=os.path.join(CSV_DIR, "sources.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "id",
-                    "issn_l",
-                    "issn",
-                    "display_name",
-                    "publisher",
-                    "works_count",
-                    "cited_by_count",
-                    "is_oa",
-                    "is_in_doaj",
-                    "homepage_url",
-                    "works_api_url",
-                    "updated_date",
-                ]
-            ),
-        ),
-        "ids": FileSpec(
-            name=os.path.join(CSV_DIR, "sources_ids.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "source_id",
-                    "openalex",
-                    "issn_l",
-                    "issn",
-                    "mag",
-                    "wikidata",
-                    "fatcat",
-                ]
-            ),
-        ),
-        "counts_by_year": FileSpec(
-            name=os.path.join(CSV_DIR, "sources_counts_by_year.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "source_id",
-                    "year",
-                    "works_count",
-                    "cited_by_count",
-                    "oa_works_count",
-                ]
-            ),
-        ),
-    },
-    "works": {
-        "works": FileSpec(
-            name=os.path.join(CSV_DIR, "works.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "id",
-                    "doi",
-                    "title",
-                    "display_name",
-                    "publication_year",
-                    "publication_date",
-                    "type",
-                    "cited_by_count",
-                    "is_retracted",
-                    "is_paratext",
-                    "cited_by_api_url",
-                    "abstract_inverted_index",
-                    "language",
-                ]
-            ),
-        ),
-        "primary_locations": FileSpec(
-            name=os.path.join(CSV_DIR, "works_primary_locations.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "work_id",
-                    "source_id",
-                    "landing_page_url",
-                    "pdf_url",
-                    "is_oa",
-                    "version",
-                    "license",
-                ]
-            ),
-        ),
-        "locations": FileSpec(
-            name=os.path.join(CSV_DIR, "works_locations.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "work_id",
-                    "source_id",
-                    "landing_page_url",
-                    "pdf_url",
-                    "is_oa",
-                    "version",
-                    "license",
-                ]
-            ),
-        ),
-        "best_oa_locations": FileSpec(
-            name=os.path.join(CSV_DIR, "works_best_oa_locations.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "work_id",
-                    "source_id",
-                    "landing_page_url",
-                    "pdf_url",
-                    "is_oa",
-                    "version",
-                    "license",
-                ]
-            ),
-        ),
-        "authorships": FileSpec(
-            name=os.path.join(CSV_DIR, "works_authorships.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "work_id",
-                    "author_position",
-                    "author_id",
-                    "institution_id",
-                    "raw_affiliation_string",
-                ]
-            ),
-        ),
-        "biblio": FileSpec(
-            name=os.path.join(CSV_DIR, "works_biblio.csv.gz"),
-            columns=OrderedSet(
-                ["work_id", "volume", "issue", "first_page", "last_page"]
-            ),
-        ),
-        "topics": FileSpec(
-            name=os.path.join(CSV_DIR, "works_topics.csv.gz"),
-            columns=OrderedSet(["work_id", "topic_id", "score"]),
-        ),
-        "concepts": FileSpec(
-            name=os.path.join(CSV_DIR, "works_concepts.csv.gz"),
-            columns=OrderedSet(["work_id", "concept_id", "score"]),
-        ),
-        "ids": FileSpec(
-            name=os.path.join(CSV_DIR, "works_ids.csv.gz"),
-            columns=OrderedSet(["work_id", "openalex", "doi", "mag", "pmid", "pmcid"]),
-        ),
-        "mesh": FileSpec(
-            name=os.path.join(CSV_DIR, "works_mesh.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "work_id",
-                    "descriptor_ui",
-                    "descriptor_name",
-                    "qualifier_ui",
-                    "qualifier_name",
-                    "is_major_topic",
-                ]
-            ),
-        ),
-        "open_access": FileSpec(
-            name=os.path.join(CSV_DIR, "works_open_access.csv.gz"),
-            columns=OrderedSet(
-                [
-                    "work_id",
-                    "is_oa",
-                    "oa_status",
-                    "oa_url",
-                    "any_repository_has_fulltext",
-                ]
-            ),
-        ),
-        "referenced_works": FileSpec(
-            name=os.path.join(CSV_DIR, "works_referenced_works.csv.gz"),
-            columns=OrderedSet(["work_id", "referenced_work_id"]),
-        ),
-        "related_works": FileSpec(
-            name=os.path.join(CSV_DIR, "works_related_works.csv.gz"),
-            columns=OrderedSet(["work_id", "related_work_id"]),
-        ),
-    },
+    entity: {
+        spec.name.removeprefix(f"{entity}_"): FileSpec(
+            name=os.path.join(CSV_DIR, f"{spec.name}.csv"), table=spec
+        )
+        for spec in specs
+    }
+    for entity, specs in SCHEMA.items()
 }
 
 
-def writerow(writer: csv.DictWriter, row: dict, filespec: FileSpec):
-    writer.writerow(
-        {key: value for key, value in row.items() if key in filespec.columns}
-    )
-
-
-def flatten_authors():
-    file_spec = csv_files["authors"]
-
-    with (
-        gzip.open(file_spec["authors"].name, "wt", encoding="utf-8") as authors_csv,
-        gzip.open(file_spec["ids"].name, "wt", encoding="utf-8") as ids_csv,
-        gzip.open(
-            file_spec["counts_by_year"].name, "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
+class RowWriter(ABC):
+    """Collects rows as tuples in the column order of a FileSpec, and writes
+    them out in batches
+
+    With int_ids set, OpenAlex ids are written as their number.
+    """
+
+    def __init__(self, file_spec: FileSpec, batch_size: int, int_ids: bool = False):
+        self.columns = file_spec.columns
+        self.table_name = file_spec.table.name
+        self.extract = file_spec.table.extract
+        self.batch_size = batch_size
+        self.rows: list[tuple] = []
+        self.id_indexes = [
+            index
+            for index, column in enumerate(self.columns)
+            if int_ids and column in ID_COLUMNS
+        ]
+
+    def write(self, row: tuple):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def write_dict(self, row: dict):
+        self.write(self.extract(row))
+
+    def flush(self):
+        if self.rows:
+            with stats.timed("write"):
+                if self.id_indexes:
+                    self.write_rows(list(map(self.encode_ids, self.rows)))
+                else:
+                    self.write_rows(self.rows)
+            stats.current().rows[self.table_name] += len(self.rows)
+        self.rows.clear()
+
+    def encode_ids(self, row: tuple) -> list:
+        values = list(row)
+        for index in self.id_indexes:
+            values[index] = int_id(values[index])
+        return values
+
+    @abstractmethod
+    def write_rows(self, rows: Sequence[Sequence]): ...
+
+    @abstractmethod
+    def close(self): ...
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if exc_info[0] is None:
+                self.flush()
+        finally:
+            self.close()
+
+
+class CsvRowWriter(RowWriter):
+    """Hands the rows to csv.writer.writerows"""
+
+    def __init__(
+        self,
+        csv_file: TextIO,
+        file_spec: FileSpec,
+        header: bool = True,
+        batch_size: int = 4096,
+        int_ids: bool = False,
     ):
+        super().__init__(file_spec, batch_size, int_ids)
+        self.csv_file = csv_file
+        self.writer = csv.writer(csv_file)
 
-        authors_writer = csv.DictWriter(
-            authors_csv,
-            fieldnames=file_spec["authors"].columns,
-        )
-        authors_writer.writeheader()
-
-        ids_writer = csv.DictWriter(ids_csv, fieldnames=file_spec["ids"].columns)
-        ids_writer.writeheader()
+        if header:
+            self.writer.writerow(self.columns)
 
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv, fieldnames=file_spec["counts_by_year"].columns
-        )
-        counts_by_year_writer.writeheader()
+    def write_rows(self, rows: Sequence[Sequence]):
+        self.writer.writerows(rows)
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "authors", "*", "*.gz")
-        ):
-            print(jsonl_file_name)
-            with gzip.open(jsonl_file_name, "r") as authors_jsonl:
-                for author_json in authors_jsonl:
-                    if not author_json.strip():
-                        continue
+    def close(self):
+        self.csv_file.close()
 
-                    author = json.loads(author_json)
 
-                    if not (author_id := author.get("id")):
-                        continue
+# pyarrow types by column type, timestamps aside
+ARROW_TYPES = {
+    ColumnType.text: "string",
+    ColumnType.integer: "int32",
+    ColumnType.bigint: "int64",
+    ColumnType.real: "float32",
+    ColumnType.boolean: "bool_",
+    ColumnType.json: "json_",
+}
 
-                    # authors
-                    author["display_name_alternatives"] = json.dumps(
-                        author.get("display_name_alternatives"), ensure_ascii=False
-                    )
-                    author["last_known_institution"] = (
-                        author.get("last_known_institution") or {}
-                    ).get("id")
-                    writerow(authors_writer, author, file_spec["authors"])
-
-                    # ids
-                    if author_ids := author.get("ids"):
-                        author_ids["author_id"] = author_id
-                        writerow(ids_writer, author_ids, file_spec["ids"])
-
-                    # counts_by_year
-                    if counts_by_year := author.get("counts_by_year"):
-                        for count_by_year in counts_by_year:
-                            count_by_year["author_id"] = author_id
-                            writerow(
-                                counts_by_year_writer,
-                                count_by_year,
-                                file_spec["counts_by_year"],
-                            )
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
 
+def arrow_type(column: str, int_ids: bool):
+    assert pyarrow is not None
+    if (type_ := column_type(column, int_ids)) == ColumnType.timestamp:
+        return pyarrow.timestamp("us")
+    return getattr(pyarrow, ARROW_TYPES[type_])()
 
-def flatten_topics():
-    filespec = csv_files["topics"]["topics"]
 
-    with gzip.open(filespec.name, "wt", encoding="utf-8") as topics_csv:
-        topics_writer = csv.DictWriter(topics_csv, fieldnames=filespec.columns)
-        topics_writer.writeheader()
+class ParquetRowWriter(RowWriter):
+    """Writes every batch of rows as a row group of a Parquet file, typed
+    after openalex/columns.py like the tables of the schema"""
 
-        seen_topic_ids = set()
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "topics", "*", "*.gz")
-        ):
-            print(jsonl_file_name)
-            with gzip.open(jsonl_file_name, "r") as topics_jsonl:
-                for line in topics_jsonl:
-                    if not line.strip():
-                        continue
-                    topic = json.loads(line)
-                    topic["keywords"] = "; ".join(topic.get("keywords", ""))
-                    if not (topic_id := topic.get("id")) or topic_id in seen_topic_ids:
-                        continue
-                    seen_topic_ids.add(topic_id)
-                    for key in ("subfield", "field", "domain"):
-                        topic[f"{key}_id"] = topic[key]["id"]
-                        topic[f"{key}_display_name"] = topic[key]["display_name"]
-                        del topic[key]
-
-                    if "updated" in topic:
-                        topic["updated_date"] = topic["updated"]
-                        del topic["updated"]
-
-                    topic["wikipedia_id"] = topic["ids"].get("wikipedia")
-                    del topic["ids"]
-                    del topic["created_date"]
-
-                    topic["siblings"] = json.dumps(
-                        topic.get("siblings"), ensure_ascii=False
-                    )
-                    writerow(topics_writer, topic, filespec)
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_concepts():
-    filespec = csv_files["concepts"]
-
-    with (
-        gzip.open(filespec["concepts"].name, "wt", encoding="utf-8") as concepts_csv,
-        gzip.open(filespec["ancestors"].name, "wt", encoding="utf-8") as ancestors_csv,
-        gzip.open(
-            filespec["counts_by_year"].name, "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-        gzip.open(filespec["ids"].name, "wt", encoding="utf-8") as ids_csv,
-        gzip.open(
-            filespec["related_concepts"].name, "wt", encoding="utf-8"
-        ) as related_concepts_csv,
+    def __init__(
+        self,
+        file_name: str,
+        file_spec: FileSpec,
+        compression: Compression,
+        batch_size: int = 16384,
+        int_ids: bool = False,
     ):
+        if pyarrow is None:
+            raise RuntimeError("Parquet output needs the pyarrow package")
 
-        concepts_writer = csv.DictWriter(
-            concepts_csv,
-            fieldnames=filespec["concepts"].name,
+        super().__init__(file_spec, batch_size, int_ids)
+        self.schema = pyarrow.schema(
+            [(column, arrow_type(column, int_ids)) for column in self.columns]
         )
-        concepts_writer.writeheader()
-
-        ancestors_writer = csv.DictWriter(
-            ancestors_csv, fieldnames=filespec["ancestors"].columns
-        )
-        ancestors_writer.writeheader()
-
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv,
-            fieldnames=filespec["counts_by_year"].columns,
+        self.writer = pyarrow.parquet.ParquetWriter(
+            file_name,
+            self.schema,
+            compression=compression.codec.value,
+            compression_level=(
+                None
+                if compression.codec == Codec.none
+                else compression.compression_level
+            ),
         )
-        counts_by_year_writer.writeheader()
 
-        ids_writer = csv.DictWriter(ids_csv, fieldnames=filespec["ids"].columns)
-        ids_writer.writeheader()
-
-        related_concepts_writer = csv.DictWriter(
-            related_concepts_csv,
-            fieldnames=filespec["related_concepts"].columns,
+    def write_rows(self, rows: Sequence[Sequence]):
+        assert pyarrow is not None
+        self.writer.write_table(
+            pyarrow.table(
+                [
+                    self.to_array(values, field.type)
+                    for values, field in zip(zip(*rows), self.schema)
+                ],
+                schema=self.schema,
+            )
         )
-        related_concepts_writer.writeheader()
-
-        seen_concept_ids = set()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "concepts", "*", "*.gz")
+    @staticmethod
+    def to_array(values: Sequence, arrow_type):
+        assert pyarrow is not None
+        try:
+            return pyarrow.array(values, type=arrow_type)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            # e.g. ISO dates, which pyarrow only parses when casting strings
+            return pyarrow.array(
+                [None if value is None else str(value) for value in values],
+                type=pyarrow.string(),
+            ).cast(arrow_type)
+
+    def close(self):
+        self.writer.close()
+
+
+def flatten_authors_file(
+    jsonl_file_name: str, writers: dict[str, RowWriter], seen_ids: IdSet
+):
+    for author in read_records(jsonl_file_name, decode_author, seen_ids):
+        author_id = author["id"]
+
+        # authors
+        if "authors" in writers:
+            author["display_name_alternatives"] = dumps(
+                author.get("display_name_alternatives")
+            )
+            author["last_known_institution"] = (
+                author.get("last_known_institution") or {}
+            ).get("id")
+            writers["authors"].write_dict(author)
+
+        # ids
+        if "ids" in writers and (author_ids := author.get("ids")):
+            author_ids["author_id"] = author_id
+            writers["ids"].write_dict(author_ids)
+
+        # counts_by_year
+        if "counts_by_year" in writers and (
+            counts_by_year := author.get("counts_by_year")
         ):
-            print(jsonl_file_name)
-            with gzip.open(jsonl_file_name, "r") as concepts_jsonl:
-                for concept_json in concepts_jsonl:
-                    if not concept_json.strip():
-                        continue
-
-                    concept = json.loads(concept_json)
-
-                    if (
-                        not (concept_id := concept.get("id"))
-                        or concept_id in seen_concept_ids
-                    ):
-                        continue
-
-                    seen_concept_ids.add(concept_id)
-
-                    writerow(concepts_writer, concept, filespec["concepts"])
+            for count_by_year in counts_by_year:
+                count_by_year["author_id"] = author_id
+                writers["counts_by_year"].write_dict(count_by_year)
+
+
+def flatten_topics_file(
+    jsonl_file_name: str, writers: dict[str, RowWriter], seen_ids: IdSet
+):
+    for topic in read_records(jsonl_file_name, decode_topic, seen_ids):
+        topic["keywords"] = "; ".join(topic.get("keywords", ""))
+        for key in ("subfield", "field", "domain"):
+            topic[f"{key}_id"] = topic[key]["id"]
+            topic[f"{key}_display_name"] = topic[key]["display_name"]
+            del topic[key]
+
+        if "updated" in topic:
+            topic["updated_date"] = topic["updated"]
+            del topic["updated"]
+
+        topic["wikipedia_id"] = topic["ids"].get("wikipedia")
+        del topic["ids"]
+
+        topic["siblings"] = dumps(topic.get("siblings"))
+        writers["topics"].write_dict(topic)
+
+
+def flatten_concepts_file(
+    jsonl_file_name: str, writers: dict[str, RowWriter], seen_ids: IdSet
+):
+    for concept in read_records(jsonl_file_name, decode_concept, seen_ids):
+        concept_id = concept["id"]
+
+        if "concepts" in writers:
+            writers["concepts"].write_dict(concept)
+
+        if "ids" in writers and (concept_ids := concept.get("ids")):
+            concept_ids["concept_id"] = concept_id
+            concept_ids["umls_aui"] = dumps(concept_ids.get("umls_aui"))
+            concept_ids["umls_cui"] = dumps(concept_ids.get("umls_cui"))
+            writers["ids"].write_dict(concept_ids)
+
+        if "ancestors" in writers and (ancestors := concept.get("ancestors")):
+            for ancestor in ancestors:
+                if ancestor_id := ancestor.get("id"):
+                    writers["ancestors"].write((concept_id, ancestor_id))
+
+        if "counts_by_year" in writers and (
+            counts_by_year := concept.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["concept_id"] = concept_id
+                writers["counts_by_year"].write_dict(count_by_year)
 
-                    if concept_ids := concept.get("ids"):
-                        concept_ids["concept_id"] = concept_id
-                        concept_ids["umls_aui"] = json.dumps(
-                            concept_ids.get("umls_aui"), ensure_ascii=False
-                        )
-                        concept_ids["umls_cui"] = json.dumps(
-                            concept_ids.get("umls_cui"), ensure_ascii=False
+        if "related_concepts" in writers and (
+            related_concepts := concept.get("related_concepts")
+        ):
+            for related_concept in related_concepts:
+                if related_concept_id := related_concept.get("id"):
+                    writers["related_concepts"].write(
+                        (
+                            concept_id,
+                            related_concept_id,
+                            related_concept.get("score"),
                         )
-                        writerow(ids_writer, concept_ids, filespec["ids"])
-
-                    if ancestors := concept.get("ancestors"):
-                        for ancestor in ancestors:
-                            if ancestor_id := ancestor.get("id"):
-                                writerow(
-                                    ancestors_writer,
-                                    {
-                                        "concept_id": concept_id,
-                                        "ancestor_id": ancestor_id,
-                                    },
-                                    filespec["ancestors"],
-                                )
-
-                    if counts_by_year := concept.get("counts_by_year"):
-                        for count_by_year in counts_by_year:
-                            count_by_year["concept_id"] = concept_id
-                            writerow(
-                                counts_by_year_writer,
-                                count_by_year,
-                                filespec["counts_by_year"],
-                            )
-
-                    if related_concepts := concept.get("related_concepts"):
-                        for related_concept in related_concepts:
-                            if related_concept_id := related_concept.get("id"):
-                                writerow(
-                                    related_concepts_writer,
-                                    {
-                                        "concept_id": concept_id,
-                                        "related_concept_id": related_concept_id,
-                                        "score": related_concept.get("score"),
-                                    },
-                                    filespec["related_concepts"],
-                                )
-
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_institutions():
-    file_spec = csv_files["institutions"]
-
-    with (
-        gzip.open(
-            file_spec["institutions"].name, "wt", encoding="utf-8"
-        ) as institutions_csv,
-        gzip.open(file_spec["ids"].name, "wt", encoding="utf-8") as ids_csv,
-        gzip.open(file_spec["geo"].name, "wt", encoding="utf-8") as geo_csv,
-        gzip.open(
-            file_spec["associated_institutions"].name, "wt", encoding="utf-8"
-        ) as associated_institutions_csv,
-        gzip.open(
-            file_spec["counts_by_year"].name, "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-    ):
-
-        institutions_writer = csv.DictWriter(
-            institutions_csv,
-            fieldnames=file_spec["institutions"].columns,
-        )
-        institutions_writer.writeheader()
-
-        ids_writer = csv.DictWriter(ids_csv, fieldnames=file_spec["ids"].columns)
-        ids_writer.writeheader()
-
-        geo_writer = csv.DictWriter(geo_csv, fieldnames=file_spec["geo"].columns)
-        geo_writer.writeheader()
-
-        associated_institutions_writer = csv.DictWriter(
-            associated_institutions_csv,
-            fieldnames=file_spec["associated_institutions"].columns,
-        )
-        associated_institutions_writer.writeheader()
-
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv, fieldnames=file_spec["counts_by_year"].columns
-        )
-        counts_by_year_writer.writeheader()
+                    )
 
-        seen_institution_ids = set()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "institutions", "*", "*.gz")
+def flatten_institutions_file(
+    jsonl_file_name: str, writers: dict[str, RowWriter], seen_ids: IdSet
+):
+    for institution in read_records(jsonl_file_name, decode_institution, seen_ids):
+        institution_id = institution["id"]
+
+        # institutions
+        if "institutions" in writers:
+            institution["display_name_acronyms"] = dumps(
+                institution.get("display_name_acronyms")
+            )
+            institution["display_name_alternatives"] = dumps(
+                institution.get("display_name_alternatives")
+            )
+            writers["institutions"].write_dict(institution)
+
+        # ids
+        if "ids" in writers and (institution_ids := institution.get("ids")):
+            institution_ids["institution_id"] = institution_id
+            writers["ids"].write_dict(institution_ids)
+
+        # geo
+        if "geo" in writers and (institution_geo := institution.get("geo")):
+            institution_geo["institution_id"] = institution_id
+            writers["geo"].write_dict(institution_geo)
+
+        # associated_institutions
+        if "associated_institutions" in writers and (
+            associated_institutions := institution.get(
+                "associated_institutions",
+                institution.get("associated_insitutions"),
+                # typo in api
+            )
         ):
-            print(jsonl_file_name)
-            with gzip.open(jsonl_file_name, "r") as institutions_jsonl:
-                for institution_json in institutions_jsonl:
-                    if not institution_json.strip():
-                        continue
-
-                    institution = json.loads(institution_json)
-
-                    if (
-                        not (institution_id := institution.get("id"))
-                        or institution_id in seen_institution_ids
-                    ):
-                        continue
-
-                    seen_institution_ids.add(institution_id)
-
-                    # institutions
-                    institution["display_name_acronyms"] = json.dumps(
-                        institution.get("display_name_acronyms"), ensure_ascii=False
-                    )
-                    institution["display_name_alternatives"] = json.dumps(
-                        institution.get("display_name_alternatives"), ensure_ascii=False
-                    )
-                    writerow(
-                        institutions_writer, institution, file_spec["institutions"]
+            for associated_institution in associated_institutions:
+                if associated_institution_id := associated_institution.get("id"):
+                    writers["associated_institutions"].write(
+                        (
+                            institution_id,
+                            associated_institution_id,
+                            associated_institution.get("relationship"),
+                        )
                     )
 
-                    # ids
-                    if institution_ids := institution.get("ids"):
-                        institution_ids["institution_id"] = institution_id
-                        writerow(ids_writer, institution_ids, file_spec["ids"])
-
-                    # geo
-                    if institution_geo := institution.get("geo"):
-                        institution_geo["institution_id"] = institution_id
-                        writerow(geo_writer, institution_geo, file_spec["geo"])
-
-                    # associated_institutions
-                    if associated_institutions := institution.get(
-                        "associated_institutions",
-                        institution.get("associated_insitutions"),
-                        # typo in api
-                    ):
-                        for associated_institution in associated_institutions:
-                            if associated_institution_id := associated_institution.get(
-                                "id"
-                            ):
-                                writerow(
-                                    associated_institutions_writer,
-                                    {
-                                        "institution_id": institution_id,
-                                        "associated_institution_id": associated_institution_id,
-                                        "relationship": associated_institution.get(
-                                            "relationship"
-                                        ),
-                                    },
-                                    file_spec["associated_institutions"],
-                                )
-
-                    # counts_by_year
-                    if counts_by_year := institution.get("counts_by_year"):
-                        for count_by_year in counts_by_year:
-                            count_by_year["institution_id"] = institution_id
-                            writerow(
-                                counts_by_year_writer,
-                                count_by_year,
-                                file_spec["counts_by_year"],
-                            )
-
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_publishers():
-    filespec = csv_files["publishers"]
-
-    with (
-        gzip.open(
-            filespec["publishers"].name, "wt", encoding="utf-8"
-        ) as publishers_csv,
-        gzip.open(
-            filespec["counts_by_year"].name, "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-        gzip.open(filespec["ids"].name, "wt", encoding="utf-8") as ids_csv,
-    ):
+        # counts_by_year
+        if "counts_by_year" in writers and (
+            counts_by_year := institution.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["institution_id"] = institution_id
+                writers["counts_by_year"].write_dict(count_by_year)
 
-        publishers_writer = csv.DictWriter(
-            publishers_csv,
-            fieldnames=filespec["publishers"].columns,
-        )
-        publishers_writer.writeheader()
 
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv,
-            fieldnames=filespec["counts_by_year"].columns,
-        )
-        counts_by_year_writer.writeheader()
+def flatten_publishers_file(
+    jsonl_file_name: str, writers: dict[str, RowWriter], seen_ids: IdSet
+):
+    for publisher in read_records(jsonl_file_name, decode_publisher, seen_ids):
+        publisher_id = publisher["id"]
 
-        ids_writer = csv.DictWriter(ids_csv, fieldnames=filespec["ids"].columns)
-        ids_writer.writeheader()
+        # publishers
+        if "publishers" in writers:
+            publisher["alternate_titles"] = dumps(publisher.get("alternate_titles"))
+            publisher["country_codes"] = dumps(publisher.get("country_codes"))
+            writers["publishers"].write_dict(publisher)
 
-        seen_publisher_ids = set()
+        if "ids" in writers and (publisher_ids := publisher.get("ids")):
+            publisher_ids["publisher_id"] = publisher_id
+            writers["ids"].write_dict(publisher_ids)
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "publishers", "*", "*.gz")
+        if "counts_by_year" in writers and (
+            counts_by_year := publisher.get("counts_by_year")
         ):
-            print(jsonl_file_name)
-            with gzip.open(jsonl_file_name, "r") as concepts_jsonl:
-                for publisher_json in concepts_jsonl:
-                    if not publisher_json.strip():
-                        continue
+            for count_by_year in counts_by_year:
+                count_by_year["publisher_id"] = publisher_id
+                writers["counts_by_year"].write_dict(count_by_year)
+
 
-                    publisher = json.loads(publisher_json)
+def flatten_sources_file(
+    jsonl_file_name: str, writers: dict[str, RowWriter], seen_ids: IdSet
+):
+    for source in read_records(jsonl_file_name, decode_source, seen_ids):
+        source_id = source["id"]
 
-                    if (
-                        not (publisher_id := publisher.get("id"))
-                        or publisher_id in seen_publisher_ids
-                    ):
-                        continue
+        if "sources" in writers:
+            source["issn"] = dumps(source.get("issn"))
+            writers["sources"].write_dict(source)
 
-                    seen_publisher_ids.add(publisher_id)
+        if "ids" in writers and (source_ids := source.get("ids")):
+            source_ids["source_id"] = source_id
+            source_ids["issn"] = dumps(source_ids.get("issn"))
+            writers["ids"].write_dict(source_ids)
 
-                    # publishers
-                    publisher["alternate_titles"] = json.dumps(
-                        publisher.get("alternate_titles"), ensure_ascii=False
+        if "counts_by_year" in writers and (
+            counts_by_year := source.get("counts_by_year")
+        ):
+            for count_by_year in counts_by_year:
+                count_by_year["source_id"] = source_id
+                writers["counts_by_year"].write_dict(count_by_year)
+
+
+def flatten_works_file(
+    jsonl_file_name: str, writers: dict[str, RowWriter], seen_ids: IdSet
+):
+    for work in read_records(jsonl_file_name, decode_work, seen_ids):
+        work_id = work["id"]
+
+        # works
+        if "works" in writers:
+            if (abstract := work.get("abstract_inverted_index")) is not None:
+                work["abstract_inverted_index"] = dumps(abstract)
+            writers["works"].write_dict(work)
+
+        # primary_locations
+        if "primary_locations" in writers and (
+            primary_location := (work.get("primary_location") or {})
+        ):
+            if primary_location.get("source") and primary_location.get("source").get(
+                "id"
+            ):
+                writers["primary_locations"].write(
+                    (
+                        work_id,
+                        primary_location["source"]["id"],
+                        primary_location.get("landing_page_url"),
+                        primary_location.get("pdf_url"),
+                        primary_location.get("is_oa"),
+                        primary_location.get("version"),
+                        primary_location.get("license"),
                     )
-                    publisher["country_codes"] = json.dumps(
-                        publisher.get("country_codes"), ensure_ascii=False
+                )
+
+        # locations
+        if "locations" in writers and (locations := work.get("locations")):
+            for location in locations:
+                if location.get("source") and location.get("source").get("id"):
+                    writers["locations"].write(
+                        (
+                            work_id,
+                            location["source"]["id"],
+                            location.get("landing_page_url"),
+                            location.get("pdf_url"),
+                            location.get("is_oa"),
+                            location.get("version"),
+                            location.get("license"),
+                        )
                     )
-                    writerow(publishers_writer, publisher, filespec["publishers"])
-
-                    if publisher_ids := publisher.get("ids"):
-                        publisher_ids["publisher_id"] = publisher_id
-                        writerow(ids_writer, publisher_ids, filespec["ids"])
-
-                    if counts_by_year := publisher.get("counts_by_year"):
-                        for count_by_year in counts_by_year:
-                            count_by_year["publisher_id"] = publisher_id
-                            writerow(
-                                counts_by_year_writer,
-                                count_by_year,
-                                filespec["counts_by_year"],
-                            )
-
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_sources():
-    filespec = csv_files["sources"]
-
-    with (
-        gzip.open(filespec["sources"].name, "wt", encoding="utf-8") as sources_csv,
-        gzip.open(filespec["ids"].name, "wt", encoding="utf-8") as ids_csv,
-        gzip.open(
-            filespec["counts_by_year"].name, "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-    ):
-
-        sources_writer = csv.DictWriter(
-            sources_csv,
-            fieldnames=filespec["sources"].columns,
-        )
-        sources_writer.writeheader()
-
-        ids_writer = csv.DictWriter(ids_csv, fieldnames=filespec["ids"].columns)
-        ids_writer.writeheader()
-
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv,
-            fieldnames=filespec["counts_by_year"].columns,
-        )
-        counts_by_year_writer.writeheader()
-
-        seen_source_ids = set()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "sources", "*", "*.gz")
+        # best_oa_locations
+        if "best_oa_locations" in writers and (
+            best_oa_location := (work.get("best_oa_location") or {})
         ):
-            print(jsonl_file_name)
-            with gzip.open(jsonl_file_name, "r") as sources_jsonl:
-                for source_json in sources_jsonl:
-                    if not source_json.strip():
-                        continue
-
-                    source = json.loads(source_json)
-
-                    if (
-                        not (source_id := source.get("id"))
-                        or source_id in seen_source_ids
-                    ):
-                        continue
-
-                    seen_source_ids.add(source_id)
-
-                    source["issn"] = json.dumps(source.get("issn"))
-                    writerow(sources_writer, source, filespec["sources"])
-
-                    if source_ids := source.get("ids"):
-                        source_ids["source_id"] = source_id
-                        source_ids["issn"] = json.dumps(source_ids.get("issn"))
-                        writerow(ids_writer, source_ids, filespec["ids"])
-
-                    if counts_by_year := source.get("counts_by_year"):
-                        for count_by_year in counts_by_year:
-                            count_by_year["source_id"] = source_id
-                            writerow(
-                                counts_by_year_writer,
-                                count_by_year,
-                                filespec["counts_by_year"],
+            if best_oa_location.get("source") and best_oa_location.get("source").get(
+                "id"
+            ):
+                writers["best_oa_locations"].write(
+                    (
+                        work_id,
+                        best_oa_location["source"]["id"],
+                        best_oa_location.get("landing_page_url"),
+                        best_oa_location.get("pdf_url"),
+                        best_oa_location.get("is_oa"),
+                        best_oa_location.get("version"),
+                        best_oa_location.get("license"),
+                    )
+                )
+
+        # authorships
+        if "authorships" in writers and (authorships := work.get("authorships")):
+            for authorship in authorships:
+                if author_id := authorship.get("author", {}).get("id"):
+                    institutions = authorship.get("institutions")
+                    institution_ids = [i.get("id") for i in institutions]
+                    institution_ids = [i for i in institution_ids if i]
+                    institution_ids = institution_ids or [None]
+
+                    for institution_id in institution_ids:
+                        writers["authorships"].write(
+                            (
+                                work_id,
+                                authorship.get("author_position"),
+                                author_id,
+                                institution_id,
+                                authorship.get("raw_affiliation_string"),
                             )
+                        )
 
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_works():
-    file_spec = csv_files["works"]
-
-    with (
-        gzip.open(file_spec["works"].name, "wt", encoding="utf-8") as works_csv,
-        gzip.open(
-            file_spec["primary_locations"].name, "wt", encoding="utf-8"
-        ) as primary_locations_csv,
-        gzip.open(file_spec["locations"].name, "wt", encoding="utf-8") as locations,
-        gzip.open(
-            file_spec["best_oa_locations"].name, "wt", encoding="utf-8"
-        ) as best_oa_locations,
-        gzip.open(
-            file_spec["authorships"].name, "wt", encoding="utf-8"
-        ) as authorships_csv,
-        gzip.open(file_spec["biblio"].name, "wt", encoding="utf-8") as biblio_csv,
-        gzip.open(file_spec["topics"].name, "wt", encoding="utf-8") as topics_csv,
-        gzip.open(file_spec["concepts"].name, "wt", encoding="utf-8") as concepts_csv,
-        gzip.open(file_spec["ids"].name, "wt", encoding="utf-8") as ids_csv,
-        gzip.open(file_spec["mesh"].name, "wt", encoding="utf-8") as mesh_csv,
-        gzip.open(
-            file_spec["open_access"].name, "wt", encoding="utf-8"
-        ) as open_access_csv,
-        gzip.open(
-            file_spec["referenced_works"].name, "wt", encoding="utf-8"
-        ) as referenced_works_csv,
-        gzip.open(
-            file_spec["related_works"].name, "wt", encoding="utf-8"
-        ) as related_works_csv,
-    ):
+        # biblio
+        if "biblio" in writers and (biblio := work.get("biblio")):
+            biblio["work_id"] = work_id
+            writers["biblio"].write_dict(biblio)
+
+        # topics
+        if "topics" in writers:
+            for topic in work.get("topics", []):
+                if topic_id := topic.get("id"):
+                    writers["topics"].write((work_id, topic_id, topic.get("score")))
+
+        # concepts
+        if "concepts" in writers:
+            for concept in work.get("concepts"):
+                if concept_id := concept.get("id"):
+                    writers["concepts"].write(
+                        (work_id, concept_id, concept.get("score"))
+                    )
 
-        works_writer = init_dict_writer(works_csv, file_spec["works"])
-        primary_locations_writer = init_dict_writer(
-            primary_locations_csv, file_spec["primary_locations"]
-        )
-        locations_writer = init_dict_writer(locations, file_spec["locations"])
-        best_oa_locations_writer = init_dict_writer(
-            best_oa_locations, file_spec["best_oa_locations"]
+        # ids
+        if "ids" in writers and (ids := work.get("ids")):
+            ids["work_id"] = work_id
+            writers["ids"].write_dict(ids)
+
+        # mesh
+        if "mesh" in writers:
+            for mesh in work.get("mesh"):
+                mesh["work_id"] = work_id
+                writers["mesh"].write_dict(mesh)
+
+        # open_access
+        if "open_access" in writers and (open_access := work.get("open_access")):
+            open_access["work_id"] = work_id
+            writers["open_access"].write_dict(open_access)
+
+        # referenced_works
+        if "referenced_works" in writers:
+            for referenced_work in work.get("referenced_works"):
+                if referenced_work:
+                    writers["referenced_works"].write((work_id, referenced_work))
+
+        # related_works
+        if "related_works" in writers:
+            for related_work in work.get("related_works"):
+                if related_work:
+                    writers["related_works"].write((work_id, related_work))
+
+
+# flattens one snapshot file, skipping the entities whose id was seen before
+FlattenFile = Callable[[str, dict[str, RowWriter], IdSet], None]
+
+
+class OutputFormat(str, Enum):
+    csv = "csv"
+    parquet = "parquet"
+
+
+@dataclass(frozen=True)
+class Output:
+    """What the flattened files are written as"""
+
+    format: OutputFormat = OutputFormat.csv
+    compression: Compression = Compression()
+    int_ids: bool = False
+    # names of the tables written, all of them when None
+    tables: frozenset[str] | None = None
+
+    def file_specs(self, entity: str) -> dict[str, FileSpec]:
+        """csv_files[entity], limited to the tables written"""
+
+        return {
+            key: spec
+            for key, spec in csv_files[entity].items()
+            if self.tables is None or spec.table.name in self.tables
+        }
+
+    @property
+    def state_file(self) -> str:
+        if self.format == OutputFormat.parquet:
+            return os.path.join(PARQUET_DIR, "flattened-partitions.json")
+        return STATE_FILE
+
+    def file_name(self, file_spec: FileSpec) -> str:
+        if self.format == OutputFormat.parquet:
+            return os.path.basename(file_spec.name).removesuffix(".csv") + ".parquet"
+        return file_spec.name + self.compression.suffix
+
+    def open(
+        self, file_name: str, file_spec: FileSpec, header: bool = True
+    ) -> RowWriter:
+        if self.format == OutputFormat.parquet:
+            return ParquetRowWriter(
+                file_name, file_spec, self.compression, int_ids=self.int_ids
+            )
+        return CsvRowWriter(
+            self.compression.open(file_name),
+            file_spec,
+            header=header,
+            int_ids=self.int_ids,
         )
-        authorships_writer = init_dict_writer(authorships_csv, file_spec["authorships"])
-        biblio_writer = init_dict_writer(biblio_csv, file_spec["biblio"])
-        topics_writer = init_dict_writer(topics_csv, file_spec["topics"])
-        concepts_writer = init_dict_writer(concepts_csv, file_spec["concepts"])
-        ids_writer = init_dict_writer(ids_csv, file_spec["ids"])
-        mesh_writer = init_dict_writer(mesh_csv, file_spec["mesh"])
-        open_access_writer = init_dict_writer(open_access_csv, file_spec["open_access"])
-        referenced_works_writer = init_dict_writer(
-            referenced_works_csv, file_spec["referenced_works"]
-        )
-        related_works_writer = init_dict_writer(
-            related_works_csv, file_spec["related_works"]
-        )
-
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "works", "*", "*.gz")
-        ):
-            print(jsonl_file_name)
-            with gzip.open(jsonl_file_name, "r") as works_jsonl:
-                for work_json in works_jsonl:
-                    if not work_json.strip():
-                        continue
-
-                    work = json.loads(work_json)
 
-                    if not (work_id := work.get("id")):
-                        continue
 
-                    # works
-                    if (abstract := work.get("abstract_inverted_index")) is not None:
-                        work["abstract_inverted_index"] = json.dumps(
-                            abstract, ensure_ascii=False
-                        )
-
-                    writerow(works_writer, work, file_spec["works"])
-
-                    # primary_locations
-                    if primary_location := (work.get("primary_location") or {}):
-                        if primary_location.get("source") and primary_location.get(
-                            "source"
-                        ).get("id"):
-                            writerow(
-                                primary_locations_writer,
-                                {
-                                    "work_id": work_id,
-                                    "source_id": primary_location["source"]["id"],
-                                    "landing_page_url": primary_location.get(
-                                        "landing_page_url"
-                                    ),
-                                    "pdf_url": primary_location.get("pdf_url"),
-                                    "is_oa": primary_location.get("is_oa"),
-                                    "version": primary_location.get("version"),
-                                    "license": primary_location.get("license"),
-                                },
-                                file_spec["primary_locations"],
-                            )
+def file_key(jsonl_file_name: str) -> str:
+    # <entity>/<partition>/<file>, wherever the snapshot is
+    return "/".join(Path(jsonl_file_name).parts[-3:])
 
-                    # locations
-                    if locations := work.get("locations"):
-                        for location in locations:
-                            if location.get("source") and location.get("source").get(
-                                "id"
-                            ):
-                                writerow(
-                                    locations_writer,
-                                    {
-                                        "work_id": work_id,
-                                        "source_id": location["source"]["id"],
-                                        "landing_page_url": location.get(
-                                            "landing_page_url"
-                                        ),
-                                        "pdf_url": location.get("pdf_url"),
-                                        "is_oa": location.get("is_oa"),
-                                        "version": location.get("version"),
-                                        "license": location.get("license"),
-                                    },
-                                    file_spec["locations"],
-                                )
-
-                    # best_oa_locations
-                    if best_oa_location := (work.get("best_oa_location") or {}):
-                        if best_oa_location.get("source") and best_oa_location.get(
-                            "source"
-                        ).get("id"):
-                            writerow(
-                                best_oa_locations_writer,
-                                {
-                                    "work_id": work_id,
-                                    "source_id": best_oa_location["source"]["id"],
-                                    "landing_page_url": best_oa_location.get(
-                                        "landing_page_url"
-                                    ),
-                                    "pdf_url": best_oa_location.get("pdf_url"),
-                                    "is_oa": best_oa_location.get("is_oa"),
-                                    "version": best_oa_location.get("version"),
-                                    "license": best_oa_location.get("license"),
-                                },
-                                file_spec["best_oa_locations"],
-                            )
 
-                    # authorships
-                    if authorships := work.get("authorships"):
-                        for authorship in authorships:
-                            if author_id := authorship.get("author", {}).get("id"):
-                                institutions = authorship.get("institutions")
-                                institution_ids = [i.get("id") for i in institutions]
-                                institution_ids = [i for i in institution_ids if i]
-                                institution_ids = institution_ids or [None]
-
-                                for institution_id in institution_ids:
-                                    writerow(
-                                        authorships_writer,
-                                        {
-                                            "work_id": work_id,
-                                            "author_position": authorship.get(
-                                                "author_position"
-                                            ),
-                                            "author_id": author_id,
-                                            "institution_id": institution_id,
-                                            "raw_affiliation_string": authorship.get(
-                                                "raw_affiliation_string"
-                                            ),
-                                        },
-                                        file_spec["authorships"],
-                                    )
-
-                    # biblio
-                    if biblio := work.get("biblio"):
-                        biblio["work_id"] = work_id
-                        writerow(
-                            biblio_writer,
-                            {
-                                "work_id": work_id,
-                                "volume": work.get("volume"),
-                                "issue": work.get("issue"),
-                                "first_page": work.get("first_page"),
-                                "last_page": work.get("last_page"),
-                            },
-                            file_spec["biblio"],
-                        )
+def shard_dir(jsonl_file_name: str) -> str:
+    return os.path.join(SHARD_DIR, file_key(jsonl_file_name).removesuffix(".gz"))
 
-                    # topics
-                    for topic in work.get("topics", []):
-                        if topic_id := topic.get("id"):
-                            writerow(
-                                topics_writer,
-                                {
-                                    "work_id": work_id,
-                                    "topic_id": topic_id,
-                                    "score": topic.get("score"),
-                                },
-                                file_spec["topics"],
-                            )
 
-                    # concepts
-                    for concept in work.get("concepts"):
-                        if concept_id := concept.get("id"):
-                            writerow(
-                                concepts_writer,
-                                {
-                                    "work_id": work_id,
-                                    "concept_id": concept_id,
-                                    "score": concept.get("score"),
-                                },
-                                file_spec["concepts"],
-                            )
+def shard_name(file_spec: FileSpec, directory: str, output: Output) -> str:
+    return os.path.join(directory, os.path.basename(output.file_name(file_spec)))
 
-                    # ids
-                    if ids := work.get("ids"):
-                        ids["work_id"] = work_id
-                        writerow(ids_writer, ids, file_spec["ids"])
-
-                    # mesh
-                    for mesh in work.get("mesh"):
-                        mesh["work_id"] = work_id
-                        writerow(mesh_writer, mesh, file_spec["mesh"])
-
-                    # open_access
-                    if open_access := work.get("open_access"):
-                        open_access["work_id"] = work_id
-                        writerow(
-                            open_access_writer, open_access, file_spec["open_access"]
-                        )
 
-                    # referenced_works
-                    for referenced_work in work.get("referenced_works"):
-                        if referenced_work:
-                            writerow(
-                                referenced_works_writer,
-                                {
-                                    "work_id": work_id,
-                                    "referenced_work_id": referenced_work,
-                                },
-                                file_spec["referenced_works"],
-                            )
+def parquet_table_dir(file_spec: FileSpec) -> str:
+    return os.path.join(
+        PARQUET_DIR, os.path.basename(file_spec.name).removesuffix(".csv")
+    )
 
-                    # related_works
-                    for related_work in work.get("related_works"):
-                        if related_work:
-                            writerow(
-                                related_works_writer,
-                                {
-                                    "work_id": work_id,
-                                    "related_work_id": related_work,
-                                },
-                                file_spec["related_works"],
-                            )
 
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
+def ledger_name(entity: str) -> str:
+    return os.path.join(SHARD_DIR, entity, "finished.txt")
+
+
+def read_ledger(entity: str) -> set[str]:
+    """Snapshot files whose shards are complete"""
+
+    if not os.path.exists(ledger_name(entity)):
+        return set()
+
+    with open(ledger_name(entity)) as ledger:
+        return {
+            key
+            for key in ledger.read().splitlines()
+            if os.path.isdir(os.path.join(SHARD_DIR, key.removesuffix(".gz")))
+        }
+
+
+def read_flattened_partitions(output: Output) -> dict[str, list[str]]:
+    if not os.path.exists(output.state_file):
+        return {}
+
+    with open(output.state_file) as state_file:
+        return json.load(state_file)
+
+
+def record_flattened_partitions(
+    entity: str, partitions: list[str], incremental: bool, output: Output
+):
+    state = read_flattened_partitions(output)
+    if incremental:
+        partitions = state.get(entity, []) + partitions
+    state[entity] = sorted(set(partitions))
+
+    with open(output.state_file + ".tmp", "w") as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(output.state_file + ".tmp", output.state_file)
+
+
+def flatten_entity(
+    entity: str,
+    flatten_file: FlattenFile,
+    output: Output,
+    workers: int = 1,
+    incremental: bool = False,
+    sharded: bool = True,
+    resume: bool = False,
+):
+    """Flatten the files of an entity, newest partition first so that only
+    the latest version of an entity is kept"""
+
+    partitions = entity_partitions(SNAPSHOT_DIR, entity)
+    if incremental:
+        flattened = set(read_flattened_partitions(output).get(entity, []))
+        partitions = {
+            partition: jsonl_file_names
+            for partition, jsonl_file_names in partitions.items()
+            if partition not in flattened
+        }
+
+    jsonl_file_names = [
+        jsonl_file_name
+        for partition in sorted(partitions, reverse=True)
+        for jsonl_file_name in partitions[partition]
+    ]
+    if FILES_PER_ENTITY:
+        jsonl_file_names = jsonl_file_names[:FILES_PER_ENTITY]
+
+    with temporary_id_set(shared=sharded and workers > 1) as seen_ids:
+        if sharded:
+            _flatten_sharded(
+                entity,
+                flatten_file,
+                seen_ids,
+                jsonl_file_names,
+                output,
+                workers,
+                resume,
+                incremental,
+            )
+        else:
+            _flatten_files(entity, flatten_file, seen_ids, jsonl_file_names, output)
+
+    flattened_files = set(jsonl_file_names)
+    record_flattened_partitions(
+        entity,
+        [
+            partition
+            for partition, partition_files in partitions.items()
+            if flattened_files.issuperset(partition_files)
+        ],
+        incremental,
+        output,
+    )
 
 
-def init_dict_writer(csv_file: TextIO, file_spec: FileSpec, **kwargs):
-    writer = csv.DictWriter(csv_file, fieldnames=file_spec.columns, **kwargs)
-    writer.writeheader()
-    return writer
+def _flatten_files(
+    entity: str,
+    flatten_file: FlattenFile,
+    seen_ids: IdSet,
+    jsonl_file_names: list[str],
+    output: Output,
+):
+    with ExitStack() as stack:
+        writers = {
+            key: stack.enter_context(output.open(output.file_name(spec), spec))
+            for key, spec in output.file_specs(entity).items()
+        }
+
+        for done, jsonl_file_name in enumerate(jsonl_file_names):
+            metrics.set_status(entity, len(jsonl_file_names) - done)
+            print(jsonl_file_name)
+            flatten_file(jsonl_file_name, writers, seen_ids)
+            stats.collect()
+    # the last rows are written as the files are closed
+    stats.collect()
+
+
+def flatten_shard(
+    entity: str,
+    flatten_file: FlattenFile,
+    seen_ids: IdSet,
+    output: Output,
+    jsonl_file_name: str,
+) -> stats.Stats:
+    # the shards are written to a temporary directory, renamed at once when
+    # complete, so that an interrupted run never leaves a partial shard
+    directory = shard_dir(jsonl_file_name)
+    shutil.rmtree(directory + ".tmp", ignore_errors=True)
+    os.makedirs(directory + ".tmp")
+
+    with ExitStack() as stack:
+        # CSV shards have no header, so that they can be concatenated as is
+        writers = {
+            key: stack.enter_context(
+                output.open(
+                    shard_name(spec, directory + ".tmp", output), spec, header=False
+                )
+            )
+            for key, spec in output.file_specs(entity).items()
+        }
+        flatten_file(jsonl_file_name, writers, seen_ids)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.rename(directory + ".tmp", directory)
+    # handed back to the main process by workers
+    return stats.take()
+
+
+def record_finished(ledger: TextIO, jsonl_file_name: str):
+    print(jsonl_file_name)
+    ledger.write(file_key(jsonl_file_name) + "\n")
+    ledger.flush()
+    os.fsync(ledger.fileno())
+
+
+def _flatten_sharded(
+    entity: str,
+    flatten_file: FlattenFile,
+    seen_ids: IdSet,
+    jsonl_file_names: list[str],
+    output: Output,
+    workers: int,
+    resume: bool,
+    incremental: bool = False,
+):
+    if not resume:
+        shutil.rmtree(os.path.join(SHARD_DIR, entity), ignore_errors=True)
+    os.makedirs(os.path.join(SHARD_DIR, entity), exist_ok=True)
+
+    finished = read_ledger(entity)
+    add_file_ids(
+        seen_ids,
+        [
+            jsonl_file_name
+            for jsonl_file_name in jsonl_file_names
+            if file_key(jsonl_file_name) in finished
+        ],
+    )
+    pending = [
+        jsonl_file_name
+        for jsonl_file_name in jsonl_file_names
+        if file_key(jsonl_file_name) not in finished
+    ]
+
+    with open(ledger_name(entity), "a") as ledger:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # the files of a partition are flattened in parallel, but
+                # partitions one after the other, so that the newest one
+                # always gets to an id first
+                for _, partition_files in groupby(
+                    pending, key=lambda jsonl_file_name: Path(jsonl_file_name).parent
+                ):
+                    futures = {
+                        executor.submit(
+                            flatten_shard,
+                            entity,
+                            flatten_file,
+                            seen_ids,
+                            output,
+                            jsonl_file_name,
+                        ): jsonl_file_name
+                        for jsonl_file_name in partition_files
+                    }
+                    # keep recording the other files when one fails, so that
+                    # a rerun doesn't flatten them again
+                    errors = []
+                    metrics.set_status(entity, len(futures), workers)
+                    for done, future in enumerate(as_completed(futures), 1):
+                        if (error := future.exception()) is not None:
+                            errors.append(error)
+                        else:
+                            stats.collect(future.result())
+                            record_finished(ledger, futures[future])
+                        metrics.set_status(entity, len(futures) - done, workers)
+                    if errors:
+                        raise errors[0]
+        else:
+            for done, jsonl_file_name in enumerate(pending):
+                metrics.set_status(entity, len(pending) - done)
+                stats.collect(
+                    flatten_shard(
+                        entity, flatten_file, seen_ids, output, jsonl_file_name
+                    )
+                )
+                record_finished(ledger, jsonl_file_name)
+
+    metrics.set_status(entity, 0, workers)
+    with stats.timed("commit"):
+        if output.format == OutputFormat.parquet:
+            _collect_parquet(entity, jsonl_file_names, output, incremental)
+        else:
+            _concatenate_csv(entity, jsonl_file_names, output)
+    stats.collect()
+
+    shutil.rmtree(os.path.join(SHARD_DIR, entity))
+    with suppress(OSError):
+        # unless another entity still has shards to resume
+        os.rmdir(SHARD_DIR)
+
+
+def _concatenate_csv(entity: str, jsonl_file_names: list[str], output: Output):
+    # gzip members and zstd frames can be concatenated, so the shards are
+    # appended byte for byte after the header instead of being recompressed
+    for spec in output.file_specs(entity).values():
+        final_name = output.file_name(spec)
+        with output.compression.open(final_name + ".tmp") as header:
+            csv.writer(header).writerow(spec.columns)
+
+        with open(final_name + ".tmp", "ab") as final_file:
+            for jsonl_file_name in jsonl_file_names:
+                shard = shard_name(spec, shard_dir(jsonl_file_name), output)
+                with open(shard, "rb") as shard_file:
+                    shutil.copyfileobj(shard_file, final_file)
+        os.replace(final_name + ".tmp", final_name)
+
+
+def _collect_parquet(
+    entity: str, jsonl_file_names: list[str], output: Output, incremental: bool
+):
+    # every shard becomes a file of the table's directory, named after its
+    # partition and part, e.g. parquet-files/works/2024-01-01_part_000.parquet.
+    # The partitions aren't hive-style directories, whose updated_date key
+    # would clash with the updated_date column of the entity tables.
+    # A full run replaces the directories, while an incremental one adds the
+    # files of its partitions to those of the previous runs
+    for spec in output.file_specs(entity).values():
+        table_dir = parquet_table_dir(spec)
+        if incremental and os.path.isdir(table_dir):
+            target_dir = table_dir
+        else:
+            target_dir = table_dir + ".tmp"
+            shutil.rmtree(target_dir, ignore_errors=True)
+            os.makedirs(target_dir)
+
+        for jsonl_file_name in jsonl_file_names:
+            partition, part = Path(jsonl_file_name).parts[-2:]
+            os.replace(
+                shard_name(spec, shard_dir(jsonl_file_name), output),
+                os.path.join(
+                    target_dir,
+                    "{}_{}.parquet".format(
+                        partition.split("=")[-1], part.removesuffix(".gz")
+                    ),
+                ),
+            )
+
+        if target_dir != table_dir:
+            shutil.rmtree(table_dir, ignore_errors=True)
+            os.rename(target_dir, table_dir)
+
+
+def main(
+    workers: Annotated[
+        int, typer.Option(help="processes flattening works and authors in parallel")
+    ] = 1,
+    format: Annotated[
+        OutputFormat,
+        typer.Option(help="write CSV files, or a directory of Parquet files per table"),
+    ] = OutputFormat.csv,
+    compression: Annotated[
+        Codec, typer.Option(help="compression of the CSV or Parquet files")
+    ] = Codec.gzip,
+    compression_level: Annotated[
+        Optional[int],
+        typer.Option(help="compression level, defaults to 1 for gzip and 3 for zstd"),
+    ] = None,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            help="only flatten partitions not flattened before, the CSV files then "
+            "holding just those, to apply with merge-openalex-csv.sql"
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            help="reuse the works and authors shards of a previous, interrupted run"
+        ),
+    ] = False,
+    int_ids: Annotated[
+        bool,
+        typer.Option(
+            help="write OpenAlex ids as BIGINT numbers, for the *-int-ids.sql schemas"
+        ),
+    ] = False,
+    stats_interval: Annotated[
+        float,
+        typer.Option(help="seconds between progress lines on stderr, 0 for none"),
+    ] = 60,
+    stats_file: Annotated[
+        Optional[str],
+        typer.Option(help="write the final summary there as JSON, instead of stderr"),
+    ] = None,
+    metrics_port: Annotated[
+        Optional[int],
+        typer.Option(help="serve live metrics in the Prometheus format on this port"),
+    ] = None,
+    metrics_file: Annotated[
+        Optional[str],
+        typer.Option(help="write live metrics in the Prometheus format to this file"),
+    ] = None,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            help="profile the flattening of every entity, by worker, with cProfile"
+        ),
+    ] = False,
+    profile_dir: Annotated[
+        str, typer.Option(help="directory of the profile dumps and report")
+    ] = "profiles",
+    profile_top: Annotated[
+        int, typer.Option(help="functions listed in the profile report")
+    ] = 40,
+    entities: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help="entities to flatten, repeatable or comma-separated, defaults to all"
+        ),
+    ] = None,
+    tables: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help="tables to write, e.g. works_authorships, repeatable or "
+            "comma-separated, defaults to all those of the entities"
+        ),
+    ] = None,
+):
+    try:
+        selected = select_tables(entities or (), tables or ())
+    except ValueError as error:
+        raise typer.BadParameter(str(error))
+
+    stats.start(stats_interval)
+    metrics.start(metrics_port, metrics_file)
+    if profile:
+        profiling.prepare(profile_dir)
+    output = Output(
+        format,
+        Compression(compression, compression_level),
+        int_ids,
+        frozenset(spec.name for specs in selected.values() for spec in specs),
+    )
+    if format == OutputFormat.parquet:
+        os.makedirs(PARQUET_DIR, exist_ok=True)
+
+    # entities other than works and authors are small, they stay in this
+    # process and are only sharded to get a Parquet file per snapshot file
+    for entity, flatten_file in [
+        ("topics", flatten_topics_file),
+        ("concepts", flatten_concepts_file),
+        ("institutions", flatten_institutions_file),
+        ("publishers", flatten_publishers_file),
+        ("sources", flatten_sources_file),
+    ]:
+        if entity not in selected:
+            continue
+        flatten_entity(
+            entity,
+            profiling.profiled(flatten_file, entity, profile_dir if profile else None),
+            output,
+            incremental=incremental,
+            sharded=format == OutputFormat.parquet,
+        )
+    for entity, flatten_file in [
+        ("authors", flatten_authors_file),
+        ("works", flatten_works_file),
+    ]:
+        if entity not in selected:
+            continue
+        flatten_entity(
+            entity,
+            profiling.profiled(flatten_file, entity, profile_dir if profile else None),
+            output,
+            workers,
+            incremental,
+            resume=resume,
+        )
+    stats.write_summary(stats_file)
+    metrics.stop()
+    if profile:
+        print(f"profile report: {profiling.report(profile_dir, profile_top)}")
 
 
 if __name__ == "__main__":
-    flatten_topics()
-    flatten_authors()
-    flatten_concepts()
-    flatten_institutions()
-    flatten_publishers()
-    flatten_sources()
-    flatten_works()
+    typer.run(main)
@@ -0,0 +1,194 @@
+import sys
+from pathlib import Path
+from typing import Annotated
+import typer
+
+from openalex.columns import ColumnType, column_type
+from openalex.tables import SCHEMA, TableSpec
+
+SQL_TYPES = {
+    ColumnType.text: "text",
+    ColumnType.integer: "integer",
+    ColumnType.bigint: "bigint",
+    ColumnType.real: "real",
+    ColumnType.boolean: "boolean",
+    ColumnType.timestamp: "timestamp without time zone",
+    ColumnType.json: "json",
+}
+
+HEADER = """--
+-- Written by generate-sql.py from openalex/tables.py, edit the tables there
+--
+"""
+
+POSTGRES_SETTINGS = """
+SET statement_timeout = 0;
+SET lock_timeout = 0;
+SET idle_in_transaction_session_timeout = 0;
+SET client_encoding = 'UTF8';
+SET standard_conforming_strings = on;
+SELECT pg_catalog.set_config('search_path', '', false);
+SET check_function_bodies = false;
+SET xmloption = content;
+SET client_min_messages = warning;
+SET row_security = off;
+"""
+
+
+def comment(name: str, kind: str, schema: str = "openalex", prefix: str = "--") -> str:
+    # the comments pg_dump puts above every object
+    return (
+        f"{prefix}\n{prefix} Name: {name}; Type: {kind}; Schema: {schema}; Owner: -\n"
+        f"{prefix}\n"
+    )
+
+
+def create_table(spec: TableSpec, int_ids: bool) -> str:
+    columns = ",\n".join(
+        "    {} {}{}".format(
+            column,
+            SQL_TYPES[column_type(column, int_ids)],
+            " NOT NULL" if column in spec.primary_key else "",
+        )
+        for column in spec.columns
+    )
+    return f"CREATE TABLE openalex.{spec.name} (\n{columns}\n);\n"
+
+
+def primary_key(spec: TableSpec, dialect: str) -> str:
+    # commented out, as in the original dump: primary keys slow the loads
+    # down, and db-import.py only needs them to upsert
+    columns = ", ".join(spec.primary_key)
+    if dialect == "duckdb":
+        statement = f"ALTER TABLE openalex.{spec.name} ADD PRIMARY KEY ({columns});"
+    else:
+        statement = (
+            f"ALTER TABLE ONLY openalex.{spec.name}\n"
+            f"    ADD CONSTRAINT {spec.name}_pkey PRIMARY KEY ({columns});"
+        )
+    lines = comment(f"{spec.name} {spec.name}_pkey", "CONSTRAINT").splitlines()
+    lines += ["", *statement.splitlines(), "", ""]
+    return "".join(f"--{line}\n" for line in lines)
+
+
+def create_index(spec: TableSpec, column: str, dialect: str) -> str:
+    name = spec.index_name(column)
+    using = " USING btree" if dialect == "postgres" else ""
+    return (
+        comment(name, "INDEX")
+        + f"\nCREATE INDEX {name} ON openalex.{spec.name}{using} ({column});\n"
+    )
+
+
+def schema_sql(dialect: str, int_ids: bool = False) -> str:
+    parts = [HEADER]
+    if dialect == "postgres":
+        parts.append(POSTGRES_SETTINGS)
+    parts.append("\n" + comment("openalex", "SCHEMA", "-"))
+    parts.append("\nCREATE SCHEMA openalex;\n")
+    if dialect == "postgres":
+        parts.append(
+            "\n\nSET default_tablespace = '';\n"
+            "\nSET default_table_access_method = heap;\n"
+        )
+
+    specs = [spec for specs in SCHEMA.values() for spec in specs]
+    for spec in specs:
+        parts.append("\n\n" + comment(spec.name, "TABLE"))
+        parts.append("\n" + create_table(spec, int_ids))
+    parts.append("\n\n")
+    for spec in specs:
+        if spec.primary_key:
+            parts.append(primary_key(spec, dialect))
+    for spec in specs:
+        for column in spec.indexes:
+            parts.append("\n" + create_index(spec, column, dialect))
+    return "".join(parts)
+
+
+def copy_statement(table: str, spec: TableSpec, dialect: str) -> str:
+    columns = ", ".join(spec.columns)
+    file_name = f"csv-files/{spec.name}.csv.gz"
+    if dialect == "duckdb":
+        return f"COPY {table} ({columns}) FROM '{file_name}';\n"
+    return (
+        f"\\copy {table} ({columns})"
+        f" from program 'gunzip -c {file_name}' csv header\n"
+    )
+
+
+def copy_sql(dialect: str) -> str:
+    parts = [HEADER]
+    for entity, specs in SCHEMA.items():
+        parts.append(f"\n-- {entity}\n\n")
+        for spec in specs:
+            parts.append(copy_statement(f"openalex.{spec.name}", spec, dialect))
+    return "".join(parts)
+
+
+def merge_sql(dialect: str) -> str:
+    # the CSV files of flatten-openalex-jsonl.py --incremental only hold the
+    # new and updated entities: they're copied into staging tables, and every
+    # staged entity replaces the stored one and all its rows, as db-import.py
+    # --merge does. The first column of every table is the entity id
+    parts = [HEADER, "\nBEGIN;\n"]
+    for entity, specs in SCHEMA.items():
+        parts.append(f"\n-- {entity}\n\n")
+        for spec in specs:
+            parts.append(
+                f"CREATE TEMPORARY TABLE staging_{spec.name} AS"
+                f" SELECT * FROM openalex.{spec.name} LIMIT 0;\n"
+            )
+        for spec in specs:
+            parts.append(copy_statement(f"staging_{spec.name}", spec, dialect))
+        for spec in specs:
+            parts.append(
+                f"DELETE FROM openalex.{spec.name} WHERE {spec.columns[0]} IN"
+                f" (SELECT id FROM staging_{specs[0].name});\n"
+            )
+        for spec in specs:
+            parts.append(
+                f"INSERT INTO openalex.{spec.name} SELECT * FROM staging_{spec.name};\n"
+            )
+        for spec in specs:
+            parts.append(f"DROP TABLE staging_{spec.name};\n")
+    parts.append("\nCOMMIT;\n")
+    return "".join(parts)
+
+
+SQL_FILES = {
+    "postgres/openalex-pg-schema.sql": lambda: schema_sql("postgres"),
+    "postgres/openalex-pg-schema-int-ids.sql": lambda: schema_sql("postgres", True),
+    "postgres/copy-openalex-csv.sql": lambda: copy_sql("postgres"),
+    "postgres/merge-openalex-csv.sql": lambda: merge_sql("postgres"),
+    "duckdb/openalex-duckdb-schema.sql": lambda: schema_sql("duckdb"),
+    "duckdb/openalex-duckdb-schema-int-ids.sql": lambda: schema_sql("duckdb", True),
+    "duckdb/copy-openalex-csv.sql": lambda: copy_sql("duckdb"),
+    "duckdb/merge-openalex-csv.sql": lambda: merge_sql("duckdb"),
+}
+
+
+def main(
+    check: Annotated[
+        bool,
+        typer.Option(help="only check that the SQL files are up to date"),
+    ] = False,
+):
+    outdated = []
+    for file_name, sql in SQL_FILES.items():
+        path = Path(__file__).parent / file_name
+        if path.exists() and path.read_text() == sql():
+            continue
+
+        outdated.append(file_name)
+        if not check:
+            path.write_text(sql())
+
+    for file_name in outdated:
+        print(f"{file_name} is out of date" if check else f"wrote {file_name}")
+    if check and outdated:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
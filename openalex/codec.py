@@ -0,0 +1,78 @@
+"""JSON decoding and encoding for snapshot records
+
+Uses orjson or msgspec when one of them is installed and falls back to the
+standard library otherwise. Values a fast backend refuses to handle (e.g.
+orjson can't encode integers wider than 64 bits) are retried with the
+standard library.
+
+Every backend encodes to the same text, compact and without escaping
+non-ASCII characters, so that the JSON columns don't depend on what is
+installed.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _json_loads(data: bytes | str) -> Any:
+    return json.loads(data)
+
+
+def _json_dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    from orjson import JSONDecodeError, JSONEncodeError
+    from orjson import dumps as _orjson_dumps
+    from orjson import loads as _orjson_loads
+
+    def loads(data: bytes | str) -> Any:
+        try:
+            return _orjson_loads(data)
+        except JSONDecodeError:
+            return _json_loads(data)
+
+    def dumps(value: Any) -> str:
+        try:
+            return _orjson_dumps(value).decode()
+        except JSONEncodeError:
+            return _json_dumps(value)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+
+    from msgspec import DecodeError, EncodeError
+
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+
+    def loads(data: bytes | str) -> Any:
+        try:
+            return _decoder.decode(data)
+        except DecodeError:
+            return _json_loads(data)
+
+    def dumps(value: Any) -> str:
+        try:
+            return _encoder.encode(value).decode()
+        except (EncodeError, OverflowError):
+            return _json_dumps(value)
+
+else:
+    BACKEND = "json"
+
+    loads = _json_loads
+    dumps = _json_dumps
@@ -0,0 +1,57 @@
+"""Types of the table columns
+
+A column name means the same thing in every table it appears in, so the
+types are listed by column name, as declared in the schema files. Columns
+not listed here are text.
+"""
+
+from enum import Enum
+
+from openalex.ids import ID_COLUMNS
+
+
+class ColumnType(str, Enum):
+    text = "text"
+    integer = "integer"
+    bigint = "bigint"
+    real = "real"
+    boolean = "boolean"
+    timestamp = "timestamp"
+    json = "json"
+
+
+COLUMN_TYPES = {
+    "abstract_inverted_index": ColumnType.json,
+    "alternate_titles": ColumnType.json,
+    "country_codes": ColumnType.json,
+    "display_name_acronyms": ColumnType.json,
+    "display_name_alternatives": ColumnType.json,
+    "issn": ColumnType.json,
+    "siblings": ColumnType.json,
+    "umls_aui": ColumnType.json,
+    "umls_cui": ColumnType.json,
+    "cited_by_count": ColumnType.integer,
+    "hierarchy_level": ColumnType.integer,
+    "level": ColumnType.integer,
+    "oa_works_count": ColumnType.integer,
+    "publication_year": ColumnType.integer,
+    "works_count": ColumnType.integer,
+    "year": ColumnType.integer,
+    "mag": ColumnType.bigint,
+    "latitude": ColumnType.real,
+    "longitude": ColumnType.real,
+    "score": ColumnType.real,
+    "any_repository_has_fulltext": ColumnType.boolean,
+    "is_in_doaj": ColumnType.boolean,
+    "is_major_topic": ColumnType.boolean,
+    "is_oa": ColumnType.boolean,
+    "is_paratext": ColumnType.boolean,
+    "is_retracted": ColumnType.boolean,
+    "updated_date": ColumnType.timestamp,
+}
+
+
+def column_type(column: str, int_ids: bool = False) -> ColumnType:
+    if int_ids and column in ID_COLUMNS:
+        return ColumnType.bigint
+    return COLUMN_TYPES.get(column, ColumnType.text)
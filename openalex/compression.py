@@ -0,0 +1,125 @@
+"""Compressed text outputs for the flattened CSV files
+
+Every output gets its own background thread doing the compression and the
+disk writes, so the thread producing CSV rows only has to hand over
+buffers. zlib, zlib-ng and zstandard all release the GIL while compressing.
+"""
+
+import gzip
+import io
+import queue
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import IO, TextIO, cast
+
+try:
+    from zlib_ng import gzip_ng
+except ImportError:
+    gzip_ng = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BUFFER_SIZE = 1024 * 1024
+
+
+class Codec(str, Enum):
+    gzip = "gzip"
+    zstd = "zstd"
+    none = "none"
+
+
+SUFFIXES = {Codec.gzip: ".gz", Codec.zstd: ".zst", Codec.none: ""}
+# fast levels by default, the CSV files are only an intermediate step
+DEFAULT_LEVELS = {Codec.gzip: 1, Codec.zstd: 3, Codec.none: 0}
+
+
+class BackgroundWriter(io.RawIOBase):
+    """Writes to another binary file from a background thread"""
+
+    def __init__(self, target: IO[bytes]):
+        self.target = target
+        self.chunks: queue.Queue[bytes | None] = queue.Queue(maxsize=16)
+        self.error: BaseException | None = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            while (chunk := self.chunks.get()) is not None:
+                if self.error is None:
+                    self.target.write(chunk)
+        except BaseException as e:
+            self.error = e
+            # keep draining so that the producer never blocks on a full queue
+            while self.chunks.get() is not None:
+                pass
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.error is not None:
+            raise self.error
+
+        self.chunks.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+
+        super().close()
+        self.chunks.put(None)
+        self.thread.join()
+        self.target.close()
+
+        if self.error is not None:
+            raise self.error
+
+
+@dataclass(frozen=True)
+class Compression:
+    codec: Codec = Codec.gzip
+    level: int | None = None
+
+    @property
+    def suffix(self) -> str:
+        return SUFFIXES[self.codec]
+
+    @property
+    def compression_level(self) -> int:
+        return DEFAULT_LEVELS[self.codec] if self.level is None else self.level
+
+    def _open_binary(self, file_name: str) -> IO[bytes]:
+        level = self.compression_level
+
+        if self.codec == Codec.gzip:
+            gzip_module = gzip_ng.GzipNGFile if gzip_ng is not None else gzip.GzipFile
+            # a binary file, though typeshed doesn't make GzipFile an IO[bytes]
+            return cast(IO[bytes], gzip_module(file_name, "wb", compresslevel=level))
+
+        if self.codec == Codec.zstd:
+            if zstandard is None:
+                raise RuntimeError("zstd output needs the zstandard package")
+
+            return zstandard.ZstdCompressor(level=level).stream_writer(
+                open(file_name, "wb")
+            )
+
+        return open(file_name, "wb")
+
+    def open(self, file_name: str) -> TextIO:
+        """Open file_name for writing text, compressed in a background thread"""
+
+        return io.TextIOWrapper(
+            io.BufferedWriter(
+                BackgroundWriter(self._open_binary(file_name)),
+                buffer_size=BUFFER_SIZE,
+            ),
+            encoding="utf-8",
+            newline="",
+        )
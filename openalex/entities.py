@@ -0,0 +1,242 @@
+"""Typed definitions of the OpenAlex entities, limited to the fields that end
+up in a table
+
+With msgspec installed, snapshot lines are decoded straight into these
+TypedDicts: fields that aren't declared here are skipped by the parser
+instead of being materialized and thrown away. The result is still a plain
+dict, so the flatten_*/load_* functions don't care which path was taken.
+Without msgspec, or for a record that doesn't match its definition, the
+whole line is decoded with openalex.codec.loads.
+"""
+
+from typing import Any, Callable, TypedDict
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from openalex.codec import loads
+
+
+class Identified(TypedDict, total=False):
+    id: str | None
+
+
+class DehydratedEntity(TypedDict, total=False):
+    id: str | None
+    display_name: str | None
+
+
+class ScoredEntity(TypedDict, total=False):
+    id: str | None
+    score: float | None
+
+
+class CountByYear(TypedDict, total=False):
+    year: int | None
+    works_count: int | None
+    cited_by_count: int | None
+    oa_works_count: int | None
+
+
+class Author(TypedDict, total=False):
+    id: str | None
+    orcid: str | None
+    display_name: str | None
+    display_name_alternatives: list[str] | None
+    works_count: int | None
+    cited_by_count: int | None
+    last_known_institution: DehydratedEntity | None
+    works_api_url: str | None
+    updated_date: str | None
+    ids: dict[str, Any] | None
+    counts_by_year: list[CountByYear] | None
+
+
+class Topic(TypedDict, total=False):
+    id: str | None
+    display_name: str | None
+    subfield: DehydratedEntity
+    field: DehydratedEntity
+    domain: DehydratedEntity
+    description: str | None
+    keywords: list[str] | None
+    works_api_url: str | None
+    ids: dict[str, Any]
+    works_count: int | None
+    cited_by_count: int | None
+    updated_date: str | None
+    updated: str | None
+    siblings: list[Any] | None
+
+
+class Concept(TypedDict, total=False):
+    id: str | None
+    wikidata: str | None
+    display_name: str | None
+    level: int | None
+    description: str | None
+    works_count: int | None
+    cited_by_count: int | None
+    image_url: str | None
+    image_thumbnail_url: str | None
+    works_api_url: str | None
+    updated_date: str | None
+    ids: dict[str, Any] | None
+    ancestors: list[DehydratedEntity] | None
+    counts_by_year: list[CountByYear] | None
+    related_concepts: list[ScoredEntity] | None
+
+
+class AssociatedInstitution(TypedDict, total=False):
+    id: str | None
+    relationship: str | None
+
+
+class Institution(TypedDict, total=False):
+    id: str | None
+    ror: str | None
+    display_name: str | None
+    country_code: str | None
+    type: str | None
+    homepage_url: str | None
+    image_url: str | None
+    image_thumbnail_url: str | None
+    display_name_acronyms: list[str] | None
+    display_name_alternatives: list[str] | None
+    works_count: int | None
+    cited_by_count: int | None
+    works_api_url: str | None
+    updated_date: str | None
+    ids: dict[str, Any] | None
+    geo: dict[str, Any] | None
+    associated_institutions: list[AssociatedInstitution] | None
+    # typo in api
+    associated_insitutions: list[AssociatedInstitution] | None
+    counts_by_year: list[CountByYear] | None
+
+
+class Publisher(TypedDict, total=False):
+    id: str | None
+    display_name: str | None
+    alternate_titles: list[str] | None
+    country_codes: list[str] | None
+    hierarchy_level: int | None
+    parent_publisher: Any
+    works_count: int | None
+    cited_by_count: int | None
+    sources_api_url: str | None
+    updated_date: str | None
+    ids: dict[str, Any] | None
+    counts_by_year: list[CountByYear] | None
+
+
+class Source(TypedDict, total=False):
+    id: str | None
+    issn_l: str | None
+    issn: list[str] | None
+    display_name: str | None
+    publisher: str | None
+    works_count: int | None
+    cited_by_count: int | None
+    is_oa: bool | None
+    is_in_doaj: bool | None
+    homepage_url: str | None
+    works_api_url: str | None
+    updated_date: str | None
+    ids: dict[str, Any] | None
+    counts_by_year: list[CountByYear] | None
+
+
+class Location(TypedDict, total=False):
+    source: DehydratedEntity | None
+    landing_page_url: str | None
+    pdf_url: str | None
+    is_oa: bool | None
+    version: str | None
+    license: str | None
+
+
+class Authorship(TypedDict, total=False):
+    author: DehydratedEntity
+    author_position: str | None
+    institutions: list[DehydratedEntity]
+    raw_affiliation_string: str | None
+
+
+class Biblio(TypedDict, total=False):
+    volume: str | None
+    issue: str | None
+    first_page: str | None
+    last_page: str | None
+
+
+class Mesh(TypedDict, total=False):
+    descriptor_ui: str | None
+    descriptor_name: str | None
+    qualifier_ui: str | None
+    qualifier_name: str | None
+    is_major_topic: bool | None
+
+
+class OpenAccess(TypedDict, total=False):
+    is_oa: bool | None
+    oa_status: str | None
+    oa_url: str | None
+    any_repository_has_fulltext: bool | None
+
+
+class Work(TypedDict, total=False):
+    id: str | None
+    doi: str | None
+    title: str | None
+    display_name: str | None
+    publication_year: int | None
+    publication_date: str | None
+    type: str | None
+    cited_by_count: int | None
+    is_retracted: bool | None
+    is_paratext: bool | None
+    cited_by_api_url: str | None
+    abstract_inverted_index: dict[str, list[int]] | None
+    language: str | None
+    primary_location: Location | None
+    locations: list[Location] | None
+    best_oa_location: Location | None
+    authorships: list[Authorship] | None
+    biblio: Biblio | None
+    topics: list[ScoredEntity]
+    concepts: list[ScoredEntity]
+    ids: dict[str, Any] | None
+    mesh: list[Mesh]
+    open_access: OpenAccess | None
+    referenced_works: list[str | None]
+    related_works: list[str | None]
+
+
+def decoder(entity_type: type) -> Callable[[bytes], Any]:
+    if msgspec is None:
+        return loads
+
+    typed_decoder = msgspec.json.Decoder(entity_type)
+    decode_error = msgspec.DecodeError
+
+    def decode(data: bytes) -> Any:
+        try:
+            return typed_decoder.decode(data)
+        except decode_error:
+            return loads(data)
+
+    return decode
+
+
+# only the id, to find the entities of a file again
+decode_id = decoder(Identified)
+decode_author = decoder(Author)
+decode_topic = decoder(Topic)
+decode_concept = decoder(Concept)
+decode_institution = decoder(Institution)
+decode_publisher = decoder(Publisher)
+decode_source = decoder(Source)
+decode_work = decoder(Work)
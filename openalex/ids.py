@@ -0,0 +1,41 @@
+"""OpenAlex ids as integers
+
+Ids are URLs ending in a letter for the entity type and a number
+(https://openalex.org/W2741809807), or just a number for the topic
+hierarchy (https://openalex.org/subfields/1702). Within a column the
+entity type is always the same, so the number alone identifies the entity.
+"""
+
+import string
+
+# columns holding OpenAlex ids, stored as BIGINT with --int-ids
+ID_COLUMNS = frozenset(
+    [
+        "id",
+        "openalex",
+        "last_known_institution",
+        "ancestor_id",
+        "associated_institution_id",
+        "author_id",
+        "concept_id",
+        "domain_id",
+        "field_id",
+        "institution_id",
+        "publisher_id",
+        "referenced_work_id",
+        "related_concept_id",
+        "related_work_id",
+        "source_id",
+        "subfield_id",
+        "topic_id",
+        "work_id",
+    ]
+)
+
+
+def id_number(entity_id: str) -> int:
+    return int(entity_id.rsplit("/", 1)[-1].lstrip(string.ascii_letters))
+
+
+def int_id(entity_id: str | None) -> int | None:
+    return id_number(entity_id) if entity_id else None
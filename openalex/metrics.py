@@ -0,0 +1,193 @@
+"""Live metrics of a run, in the Prometheus text format
+
+The totals of openalex/stats.py, along with the progress of the entity being
+processed, are served over HTTP (--metrics-port, any path, e.g. /metrics) or
+written to a file every few seconds for node_exporter's textfile collector
+(--metrics-file, which must end in .prom there). Only the standard library is
+used, nothing is pulled in when neither option is given.
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openalex import stats
+
+FILE_INTERVAL = 15.0
+
+# progress of the entity being processed, set by the scripts
+_status = {"entity": "", "workers": 1, "pending": 0}
+
+
+def set_status(entity: str, pending: int, workers: int = 1):
+    """Record that pending files of entity are submitted but not done yet,
+    to workers processes or threads"""
+
+    _status.update(entity=entity, pending=pending, workers=workers)
+
+
+def _metric(lines: list[str], name: str, kind: str, description: str, samples: dict):
+    lines.append(f"# HELP openalex_{name} {description}")
+    lines.append(f"# TYPE openalex_{name} {kind}")
+    for labels, value in samples.items():
+        lines.append(f"openalex_{name}{labels} {value}")
+
+
+def render() -> str:
+    totals = stats.totals()
+    pending, workers = _status["pending"], _status["workers"]
+
+    lines: list[str] = []
+    _metric(
+        lines,
+        "start_time_seconds",
+        "gauge",
+        "Unix time the run started",
+        {"": round(time.time() - stats.elapsed(), 3)},
+    )
+    _metric(
+        lines,
+        "last_progress_time_seconds",
+        "gauge",
+        "Unix time a snapshot file was last done, to alert on stalls",
+        {"": round(stats.collected_at(), 3)},
+    )
+    _metric(
+        lines,
+        "files_done_total",
+        "counter",
+        "Snapshot files done",
+        {"": totals.files},
+    )
+    _metric(
+        lines,
+        "records_total",
+        "counter",
+        "Snapshot records decoded",
+        {"": totals.records},
+    )
+    _metric(
+        lines,
+        "bytes_read_total",
+        "counter",
+        "Compressed bytes of the snapshot files done",
+        {"": totals.bytes_read},
+    )
+    _metric(
+        lines,
+        "rows_total",
+        "counter",
+        "Rows written, by table",
+        {f'{{table="{table}"}}': count for table, count in sorted(totals.rows.items())},
+    )
+    _metric(
+        lines,
+        "stage_seconds_total",
+        "counter",
+        "Seconds spent by stage, summed over the workers",
+        {
+            f'{{stage="{stage}"}}': round(seconds, 3)
+            for stage, seconds in totals.seconds.items()
+        },
+    )
+
+    lines.append("# HELP openalex_commit_seconds Duration of the commits")
+    lines.append("# TYPE openalex_commit_seconds histogram")
+    count = 0
+    for bound, commits in zip(stats.COMMIT_BUCKETS, totals.commits):
+        count += commits
+        le = "+Inf" if bound == float("inf") else bound
+        lines.append(f'openalex_commit_seconds_bucket{{le="{le}"}} {count}')
+    lines.append(f"openalex_commit_seconds_sum {totals.seconds['commit']:.3f}")
+    lines.append(f"openalex_commit_seconds_count {count}")
+
+    _metric(
+        lines,
+        "entity",
+        "gauge",
+        "Entity being processed",
+        {f'{{entity="{_status["entity"]}"}}': 1} if _status["entity"] else {},
+    )
+    _metric(
+        lines,
+        "files_pending",
+        "gauge",
+        "Snapshot files of the entity submitted but not done",
+        {"": pending},
+    )
+    _metric(
+        lines,
+        "files_queued",
+        "gauge",
+        "Snapshot files of the entity waiting for a worker",
+        {"": max(pending - workers, 0)},
+    )
+    _metric(
+        lines,
+        "workers",
+        "gauge",
+        "Workers by status",
+        {
+            '{status="busy"}': min(pending, workers),
+            '{status="idle"}': max(workers - pending, 0),
+        },
+    )
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_file(file_name: str):
+    # renamed into place, so that the collector never reads half a file
+    with open(file_name + ".tmp", "w") as metrics_file:
+        metrics_file.write(render())
+    os.replace(file_name + ".tmp", file_name)
+
+
+def _write_periodically(file_name: str, stop: threading.Event):
+    while not stop.wait(FILE_INTERVAL):
+        write_file(file_name)
+
+
+_exporters = {}
+
+
+def start(port: int | None = None, file_name: str | None = None):
+    """Serve the metrics on port and/or write them to file_name, from
+    daemon threads, until stop()"""
+
+    if port is not None:
+        server = ThreadingHTTPServer(("", port), _Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        _exporters["server"] = server
+    if file_name is not None:
+        stop_writing = threading.Event()
+        threading.Thread(
+            target=_write_periodically, args=(file_name, stop_writing), daemon=True
+        ).start()
+        _exporters["file_name"] = file_name
+        _exporters["stop_writing"] = stop_writing
+
+
+def stop():
+    """Stop exporting, writing the final metrics to the file"""
+
+    if (server := _exporters.pop("server", None)) is not None:
+        server.shutdown()
+        server.server_close()
+    if (file_name := _exporters.pop("file_name", None)) is not None:
+        _exporters.pop("stop_writing").set()
+        write_file(file_name)
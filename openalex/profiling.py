@@ -0,0 +1,102 @@
+"""cProfile of the flatten_*/load_* functions, by entity and worker
+
+With --profile, the function flattening or loading a snapshot file is
+wrapped in Profiled, which runs it under a cProfile.Profile kept per entity
+by every process, and dumps that profile to <profile dir>/<entity>-<pid>.prof
+whenever no file of the entity is in progress in the process. Profiled is
+picklable, so it goes to worker processes like the function it wraps. Once
+the run is done, report() merges the dumps into a report of the hottest
+functions.
+
+Since Python 3.12 a single profiler can be active at a time, and it sees
+every thread, so worker threads (DuckDB's) share the profile of their
+process instead of getting one each.
+
+Sampling profilers such as py-spy attach from the outside instead, e.g.
+py-spy record --subprocesses -- python db-import.py ...
+"""
+
+import cProfile
+import glob
+import io
+import os
+import pstats
+import threading
+from collections import Counter
+from typing import Any, Callable
+
+# profiles of this process, by entity, with the calls in progress
+_profiles: dict[str, cProfile.Profile] = {}
+_active: Counter[str] = Counter()
+_lock = threading.Lock()
+
+
+class Profiled:
+    def __init__(self, function: Callable, entity: str, directory: str):
+        self.function = function
+        self.entity = entity
+        self.directory = directory
+
+    def __call__(self, *args, **kwargs) -> Any:
+        with _lock:
+            if (profile := _profiles.get(self.entity)) is None:
+                profile = _profiles[self.entity] = cProfile.Profile()
+            if not _active[self.entity]:
+                profile.enable()
+            _active[self.entity] += 1
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            with _lock:
+                _active[self.entity] -= 1
+                if not _active[self.entity]:
+                    profile.disable()
+                    profile.dump_stats(
+                        os.path.join(
+                            self.directory, f"{self.entity}-{os.getpid()}.prof"
+                        )
+                    )
+
+
+def profiled(function: Callable, entity: str, directory: str | None) -> Callable:
+    """function, profiled into directory unless that is None"""
+
+    if directory is None:
+        return function
+    return Profiled(function, entity, directory)
+
+
+def prepare(directory: str):
+    """Create directory, removing the dumps of a previous run"""
+
+    os.makedirs(directory, exist_ok=True)
+    for file_name in glob.glob(os.path.join(directory, "*.prof")):
+        os.remove(file_name)
+
+
+def report(directory: str, top: int = 40) -> str:
+    """Merge the dumps in directory, overall and by entity, into
+    directory/all.prof and a report of the top functions by own time in
+    directory/report.txt, whose name is returned"""
+
+    file_names = sorted(glob.glob(os.path.join(directory, "*-*.prof")))
+    by_entity: dict[str, list[str]] = {}
+    for file_name in file_names:
+        entity = os.path.basename(file_name).split("-")[0]
+        by_entity.setdefault(entity, []).append(file_name)
+
+    output = io.StringIO()
+    if file_names:
+        merged = pstats.Stats(*file_names, stream=output)
+        merged.dump_stats(os.path.join(directory, "all.prof"))
+        output.write(f"all entities, {len(file_names)} profiles\n")
+        merged.sort_stats(pstats.SortKey.TIME).print_stats(top)
+        for entity, entity_file_names in by_entity.items():
+            output.write(f"\n{entity}, {len(entity_file_names)} profiles\n")
+            stats = pstats.Stats(*entity_file_names, stream=output)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+
+    report_name = os.path.join(directory, "report.txt")
+    with open(report_name, "w") as report_file:
+        report_file.write(output.getvalue())
+    return report_name
@@ -0,0 +1,176 @@
+"""Reading of gzipped snapshot files
+
+The fastest available inflater is used, in order of preference:
+
+- python-isal (`isal`), decompressing in a background thread
+- zlib-ng (`zlib-ng`), decompressing in a background thread
+- an external `igzip` or `pigz` process, read through a pipe
+- the standard library gzip module
+
+OPENALEX_GZIP_READER can be set to one of isal, zlib-ng, igzip, pigz or gzip
+to pick a backend explicitly.
+"""
+
+import gzip
+import io
+import os
+import shutil
+import subprocess
+import time
+from contextlib import AbstractContextManager, contextmanager
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator, cast
+
+from openalex.stats import current
+
+if TYPE_CHECKING:
+    # openalex.idset reads snapshot files with open_jsonl()
+    from openalex.idset import IdSet
+
+try:
+    from isal import igzip_threaded
+except ImportError:
+    igzip_threaded = None
+
+try:
+    from zlib_ng import gzip_ng_threaded
+except ImportError:
+    gzip_ng_threaded = None
+
+BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def _open_isal(file_name: str) -> IO[bytes]:
+    # a binary file in "rb" mode, whose close() stops its thread, though its
+    # stubs don't make it an IO[bytes]
+    assert igzip_threaded is not None
+    return cast(IO[bytes], igzip_threaded.open(file_name, "rb", block_size=BUFFER_SIZE))
+
+
+def _open_zlib_ng(file_name: str) -> IO[bytes]:
+    assert gzip_ng_threaded is not None
+    return cast(
+        IO[bytes], gzip_ng_threaded.open(file_name, "rb", block_size=BUFFER_SIZE)
+    )
+
+
+@contextmanager
+def _open_process(command: str, file_name: str) -> Iterator[IO[bytes]]:
+    process = subprocess.Popen(
+        [command, "-dc", file_name], stdout=subprocess.PIPE, bufsize=BUFFER_SIZE
+    )
+    assert process.stdout is not None
+    try:
+        yield process.stdout
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, [command, "-dc", file_name])
+
+
+@contextmanager
+def _open_gzip(file_name: str) -> Iterator[IO[bytes]]:
+    with (
+        open(file_name, "rb", buffering=BUFFER_SIZE) as raw,
+        gzip.GzipFile(fileobj=raw, mode="rb") as inflated,
+        io.BufferedReader(inflated, buffer_size=BUFFER_SIZE) as file,
+    ):
+        yield file
+
+
+def _available_backends() -> dict[str, bool]:
+    return {
+        "isal": igzip_threaded is not None,
+        "zlib-ng": gzip_ng_threaded is not None,
+        "igzip": shutil.which("igzip") is not None,
+        "pigz": shutil.which("pigz") is not None,
+        "gzip": True,
+    }
+
+
+def _choose_backend() -> str:
+    backends = _available_backends()
+    if requested := os.environ.get("OPENALEX_GZIP_READER"):
+        if not backends.get(requested):
+            raise RuntimeError(f"gzip reader {requested!r} is not available")
+        return requested
+
+    return next(name for name, available in backends.items() if available)
+
+
+BACKEND = _choose_backend()
+
+
+def open_jsonl(file_name: str) -> AbstractContextManager[IO[bytes]]:
+    """Open a gzipped JSON lines file for iterating over its lines as bytes"""
+
+    if BACKEND == "isal":
+        return _open_isal(file_name)
+    if BACKEND == "zlib-ng":
+        return _open_zlib_ng(file_name)
+    if BACKEND in ("igzip", "pigz"):
+        return _open_process(BACKEND, file_name)
+    return _open_gzip(file_name)
+
+
+def _decoded_records(
+    jsonl_file_name: str, decode: Callable[[bytes], Any]
+) -> Iterator[Any]:
+    stats = current()
+    seconds = stats.seconds
+    try:
+        with open_jsonl(jsonl_file_name) as jsonl:
+            lines = iter(jsonl)
+            while True:
+                before = time.perf_counter()
+                line = next(lines, None)
+                read = time.perf_counter()
+                seconds["decompress"] += read - before
+                if line is None:
+                    break
+                if not line.strip():
+                    continue
+
+                record = decode(line)
+                seconds["decode"] += time.perf_counter() - read
+                stats.records += 1
+                yield record
+    finally:
+        stats.files += 1
+        stats.bytes_read += os.path.getsize(jsonl_file_name)
+
+
+def read_records(
+    jsonl_file_name: str,
+    decode: Callable[[bytes], Any],
+    seen_ids: "IdSet | None" = None,
+) -> Iterator[Any]:
+    """Decoded records of a gzipped JSON lines file, skipping blank lines,
+    and with seen_ids only those whose id wasn't seen yet
+
+    The time spent waiting for lines and decoding them is accounted in the
+    Stats of the calling thread, and the time the caller spends in between,
+    writes aside, as building rows.
+    """
+
+    seconds = current().seconds
+    start = time.perf_counter()
+    accounted = seconds["decompress"] + seconds["decode"] + seconds["write"]
+    records = _decoded_records(jsonl_file_name, decode)
+    if seen_ids is not None:
+        # checked a batch at a time, so the rows of a batch are built after
+        # its file may be read to the end: accounted until the last record
+        # is done with, not until the last line is read
+        records = seen_ids.new_records(records)
+    try:
+        yield from records
+    finally:
+        seconds["build"] += (
+            time.perf_counter()
+            - start
+            - (seconds["decompress"] + seconds["decode"] + seconds["write"] - accounted)
+        )
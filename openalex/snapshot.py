@@ -0,0 +1,45 @@
+"""Layout of a downloaded snapshot
+
+OpenAlex publishes every entity as data/<entity>/updated_date=YYYY-MM-DD/part_*.gz
+partitions, listed in data/<entity>/manifest. When the manifest is there it
+is the authoritative file list, otherwise the directories are globbed.
+"""
+
+import glob
+import json
+import os
+
+S3_PREFIX = "s3://openalex/"
+
+
+def _manifest_files(snapshot_dir: str, entity: str) -> list[str] | None:
+    manifest_name = os.path.join(snapshot_dir, "data", entity, "manifest")
+    if not os.path.exists(manifest_name):
+        return None
+
+    with open(manifest_name) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    file_names = []
+    for entry in manifest["entries"]:
+        file_name = os.path.join(snapshot_dir, entry["url"].removeprefix(S3_PREFIX))
+        if not os.path.exists(file_name):
+            raise FileNotFoundError(f"{file_name} is listed in {manifest_name}")
+        file_names.append(file_name)
+
+    return file_names
+
+
+def entity_partitions(snapshot_dir: str, entity: str) -> dict[str, list[str]]:
+    """Snapshot files of an entity grouped by partition, oldest partition first"""
+
+    file_names = _manifest_files(snapshot_dir, entity)
+    if file_names is None:
+        file_names = glob.glob(os.path.join(snapshot_dir, "data", entity, "*", "*.gz"))
+
+    partitions: dict[str, list[str]] = {}
+    for file_name in sorted(file_names):
+        partition = os.path.basename(os.path.dirname(file_name))
+        partitions.setdefault(partition, []).append(file_name)
+
+    return partitions
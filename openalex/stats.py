@@ -0,0 +1,208 @@
+"""Time spent per stage and rows written per table
+
+Every thread accounts its own time, split into stages:
+
+- decompress: waiting for the next line of a snapshot file
+- decode: JSON decoding of the line
+- build: everything else of a flatten_*/load_* function, turning records
+  into rows, left over once the other stages are accounted
+- write: writing batches of rows to CSV/Parquet files or to the database
+- commit: committing a file's rows, or for the flattener moving the shards
+  of a file into the output files
+
+Workers hand their Stats back with take() along with their result, and the
+main process adds them to the totals of the run with collect(), which prints
+a progress line every so often. summary() is the final report.
+"""
+
+import json
+import sys
+from bisect import bisect_left
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, TextIO
+
+STAGES = ("decompress", "decode", "build", "write", "commit")
+# upper bounds of the buckets of commit durations, in seconds
+COMMIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+
+@dataclass
+class Stats:
+    seconds: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(STAGES, 0.0)
+    )
+    rows: Counter[str] = field(default_factory=Counter)
+    files: int = 0
+    records: int = 0
+    bytes_read: int = 0
+    # commits by the first bucket of COMMIT_BUCKETS they fit in
+    commits: list[int] = field(default_factory=lambda: [0] * len(COMMIT_BUCKETS))
+
+    def add(self, other: "Stats"):
+        for stage, seconds in other.seconds.items():
+            self.seconds[stage] += seconds
+        self.rows.update(other.rows)
+        self.files += other.files
+        self.records += other.records
+        self.bytes_read += other.bytes_read
+        self.commits = [a + b for a, b in zip(self.commits, other.commits)]
+
+    def copy(self) -> "Stats":
+        return Stats(
+            seconds=dict(self.seconds),
+            rows=self.rows.copy(),
+            files=self.files,
+            records=self.records,
+            bytes_read=self.bytes_read,
+            commits=list(self.commits),
+        )
+
+    def observe_commit(self, seconds: float):
+        self.commits[bisect_left(COMMIT_BUCKETS, seconds)] += 1
+
+
+_local = threading.local()
+
+
+def current() -> Stats:
+    """Stats of the calling thread"""
+
+    if (stats := getattr(_local, "stats", None)) is None:
+        stats = _local.stats = Stats()
+    return stats
+
+
+def take() -> Stats:
+    """Stats of the calling thread since the last take(), to hand them over"""
+
+    stats = current()
+    _local.stats = Stats()
+    return stats
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stats = current()
+        stats.seconds[stage] += seconds
+        if stage == "commit":
+            stats.observe_commit(seconds)
+
+
+# totals of the run, in the main process
+_run = {
+    "stats": Stats(),
+    "start": time.perf_counter(),
+    "interval": 60.0,
+    "last": 0.0,
+    # wall clock time of the last collect(), to tell a stalled run
+    "collected_at": time.time(),
+}
+# taken to add to the totals and to copy them, which the metrics exporters do
+# from their own threads
+_lock = threading.Lock()
+
+
+def start(interval: float = 60.0):
+    """Start accounting a run, printing progress every interval seconds, or
+    never with 0"""
+
+    _run.update(
+        stats=Stats(),
+        start=time.perf_counter(),
+        interval=interval,
+        last=0.0,
+        collected_at=time.time(),
+    )
+    take()
+
+
+def totals() -> Stats:
+    """Copy of the totals of the run so far, safe to read from any thread"""
+
+    with _lock:
+        return _run["stats"].copy()
+
+
+def elapsed() -> float:
+    return time.perf_counter() - _run["start"]
+
+
+def collected_at() -> float:
+    return _run["collected_at"]
+
+
+def collect(stats: Stats | None = None, output: TextIO = sys.stderr):
+    """Add stats, or those of the calling thread, to the totals of the run"""
+
+    stats = take() if stats is None else stats
+    with _lock:
+        _run["stats"].add(stats)
+    _run["collected_at"] = time.time()
+
+    now = time.perf_counter()
+    if _run["interval"] and now - (_run["last"] or _run["start"]) >= _run["interval"]:
+        _run["last"] = now
+        print(progress_line(), file=output, flush=True)
+
+
+def progress_line() -> str:
+    stats = _run["stats"]
+    run_seconds = elapsed()
+    busy = sum(stats.seconds.values()) or 1
+    return (
+        "stats {:.0f}s: {} files, {} records ({:.0f}/s), {} rows ({:.0f}/s); {}".format(
+            run_seconds,
+            stats.files,
+            stats.records,
+            stats.records / run_seconds,
+            stats.rows.total(),
+            stats.rows.total() / run_seconds,
+            " ".join(
+                f"{stage} {seconds / busy:.0%}"
+                for stage, seconds in stats.seconds.items()
+            ),
+        )
+    )
+
+
+def summary() -> dict:
+    stats = _run["stats"]
+    run_seconds = elapsed()
+    busy = sum(stats.seconds.values()) or 1
+    return {
+        "elapsed_seconds": round(run_seconds, 3),
+        "files": stats.files,
+        "records": stats.records,
+        "records_per_second": round(stats.records / run_seconds, 1),
+        "bytes_read": stats.bytes_read,
+        "mb_per_second": round(stats.bytes_read / 2**20 / run_seconds, 3),
+        # summed over the workers, so they may add up to more than elapsed
+        "stages": {
+            stage: {"seconds": round(seconds, 3), "share": round(seconds / busy, 4)}
+            for stage, seconds in stats.seconds.items()
+        },
+        "tables": {
+            table: {"rows": rows, "rows_per_second": round(rows / run_seconds, 1)}
+            for table, rows in sorted(stats.rows.items())
+        },
+    }
+
+
+def write_summary(file_name: str | None = None):
+    """Write the summary of the run as JSON to file_name, or to stderr"""
+
+    collect()
+    if file_name is None:
+        print(json.dumps(summary()), file=sys.stderr)
+    else:
+        with open(file_name, "w") as summary_file:
+            json.dump(summary(), summary_file, indent=2)
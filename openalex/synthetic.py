@@ -0,0 +1,397 @@
+"""Synthetic snapshots, to benchmark the scripts without the real one
+
+Writes data/<entity>/updated_date=YYYY-MM-DD/part_NNN.gz files and their
+manifests, laid out like the OpenAlex snapshot, with records shaped like the
+real ones (the fields of openalex/entities.py plus some that no table uses).
+Records reference each other's ids, and a share of those of the older
+partitions is repeated in the newest one as an updated version, like
+entities updated between snapshots. Every record has the updated_date of its
+partition.
+"""
+
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable
+
+from openalex.codec import dumps
+from openalex.compression import Codec, Compression
+
+# id numbers of the real snapshot have 8 to 10 digits
+ID_BASE = 2_000_000_000
+# the snapshot files are compressed with gzip's default level
+SNAPSHOT_COMPRESSION = Compression(Codec.gzip, 6)
+WORDS = (
+    "the of and to in a is that for with as on by this are from we be an at "
+    "which results study these data cells using analysis between was were "
+    "model patients effect protein method used two based high different can "
+    "has have also its or been may our expression after during than"
+).split()
+
+
+@dataclass
+class SnapshotSize:
+    """Records per entity and fan-out of the works"""
+
+    works: int = 20_000
+    authors: int = 10_000
+    topics: int = 500
+    concepts: int = 1_000
+    institutions: int = 1_000
+    publishers: int = 500
+    sources: int = 1_000
+    # per work
+    authorships: int = 6
+    references: int = 25
+    abstract_words: int = 120
+    # share of the records that is repeated, updated, in the newest partition,
+    # taken from the older ones
+    updated: float = 0.05
+    partitions: int = 2
+    files_per_partition: int = 4
+    seed: int = 0
+    counts: dict[str, int] = field(init=False)
+
+    def __post_init__(self):
+        self.counts = {
+            "authors": self.authors,
+            "topics": self.topics,
+            "concepts": self.concepts,
+            "institutions": self.institutions,
+            "publishers": self.publishers,
+            "sources": self.sources,
+            "works": self.works,
+        }
+
+
+class Generator:
+    def __init__(self, size: SnapshotSize):
+        self.size = size
+        self.random = random.Random(size.seed)
+        # of the partition being written
+        self.updated_date = "2024-01-01T00:00:00.000000"
+
+    def id(self, prefix: str, entity: str, number: int | None = None) -> str:
+        if number is None:
+            number = self.random.randrange(self.size.counts[entity])
+        return f"https://openalex.org/{prefix}{ID_BASE + number}"
+
+    def words(self, count: int) -> str:
+        return " ".join(self.random.choices(WORDS, k=count)).capitalize()
+
+    def counts_by_year(self) -> list[dict]:
+        return [
+            {
+                "year": year,
+                "works_count": self.random.randrange(100),
+                "cited_by_count": self.random.randrange(1000),
+                "oa_works_count": self.random.randrange(50),
+            }
+            for year in range(2012, 2025)
+        ]
+
+    def common(self, number: int, prefix: str, entity: str) -> dict:
+        return {
+            "id": self.id(prefix, entity, number),
+            "display_name": self.words(3),
+            "works_count": self.random.randrange(10_000),
+            "cited_by_count": self.random.randrange(100_000),
+            "updated_date": self.updated_date,
+            "created_date": "2016-06-24",
+            "counts_by_year": self.counts_by_year(),
+        }
+
+    def author(self, number: int) -> dict:
+        author_id = self.id("A", "authors", number)
+        return self.common(number, "A", "authors") | {
+            "orcid": f"https://orcid.org/0000-0002-{number % 10_000:04d}-{number % 9_999:04d}",
+            "display_name_alternatives": [self.words(2) for _ in range(3)],
+            "last_known_institution": {
+                "id": self.id("I", "institutions"),
+                "display_name": self.words(4),
+            },
+            "works_api_url": f"https://api.openalex.org/works?filter=author.id:{author_id}",
+            "ids": {"openalex": author_id, "orcid": "https://orcid.org/0000"},
+            "summary_stats": {"h_index": 10, "i10_index": 12},
+        }
+
+    def dehydrated(self, prefix: str, entity: str) -> dict:
+        return {"id": self.id(prefix, entity), "display_name": self.words(2)}
+
+    def topic(self, number: int) -> dict:
+        topic_id = self.id("T", "topics", number)
+        return self.common(number, "T", "topics") | {
+            "subfield": {
+                "id": f"https://openalex.org/subfields/{1000 + number % 250}",
+                "display_name": self.words(2),
+            },
+            "field": {
+                "id": f"https://openalex.org/fields/{10 + number % 26}",
+                "display_name": self.words(2),
+            },
+            "domain": {
+                "id": f"https://openalex.org/domains/{1 + number % 4}",
+                "display_name": self.words(2),
+            },
+            "description": self.words(30),
+            "keywords": [self.words(2) for _ in range(10)],
+            "works_api_url": f"https://api.openalex.org/works?filter=topics.id:{topic_id}",
+            "ids": {"openalex": topic_id, "wikipedia": "https://en.wikipedia.org/"},
+            "siblings": [self.dehydrated("T", "topics") for _ in range(5)],
+        }
+
+    def concept(self, number: int) -> dict:
+        concept_id = self.id("C", "concepts", number)
+        return self.common(number, "C", "concepts") | {
+            "wikidata": f"https://www.wikidata.org/wiki/Q{number}",
+            "level": number % 6,
+            "description": self.words(8),
+            "image_url": "https://upload.wikimedia.org/image.svg",
+            "image_thumbnail_url": "https://upload.wikimedia.org/thumbnail.svg",
+            "works_api_url": f"https://api.openalex.org/works?filter=concepts.id:{concept_id}",
+            "ids": {
+                "openalex": concept_id,
+                "wikidata": f"https://www.wikidata.org/wiki/Q{number}",
+                "umls_aui": ["A0000001"],
+                "umls_cui": ["C0000001"],
+                "mag": ID_BASE + number,
+            },
+            "ancestors": [self.dehydrated("C", "concepts") for _ in range(3)],
+            "related_concepts": [
+                self.dehydrated("C", "concepts") | {"score": self.random.random()}
+                for _ in range(10)
+            ],
+        }
+
+    def institution(self, number: int) -> dict:
+        institution_id = self.id("I", "institutions", number)
+        return self.common(number, "I", "institutions") | {
+            "ror": f"https://ror.org/0{number:08d}",
+            "country_code": "US",
+            "type": "education",
+            "homepage_url": "https://example.edu",
+            "image_url": None,
+            "image_thumbnail_url": None,
+            "display_name_acronyms": ["EU"],
+            "display_name_alternatives": [self.words(3)],
+            "works_api_url": f"https://api.openalex.org/works?filter=institutions.id:{institution_id}",
+            "ids": {
+                "openalex": institution_id,
+                "ror": f"https://ror.org/0{number:08d}",
+                "grid": f"grid.{number}.1",
+                "mag": ID_BASE + number,
+            },
+            "geo": {
+                "city": self.words(1),
+                "geonames_city_id": str(number),
+                "region": None,
+                "country_code": "US",
+                "country": "United States",
+                "latitude": self.random.uniform(-90, 90),
+                "longitude": self.random.uniform(-180, 180),
+            },
+            "associated_institutions": [
+                self.dehydrated("I", "institutions") | {"relationship": "related"}
+                for _ in range(2)
+            ],
+        }
+
+    def publisher(self, number: int) -> dict:
+        publisher_id = self.id("P", "publishers", number)
+        return self.common(number, "P", "publishers") | {
+            "alternate_titles": [self.words(2)],
+            "country_codes": ["US", "GB"],
+            "hierarchy_level": 0,
+            "parent_publisher": None,
+            "sources_api_url": f"https://api.openalex.org/sources?filter=host_organization.id:{publisher_id}",
+            "ids": {"openalex": publisher_id, "wikidata": "https://www.wikidata.org/"},
+        }
+
+    def source(self, number: int) -> dict:
+        source_id = self.id("S", "sources", number)
+        issn = f"{number % 10_000:04d}-{number % 9_999:04d}"
+        return self.common(number, "S", "sources") | {
+            "issn_l": issn,
+            "issn": [issn],
+            "publisher": self.words(3),
+            "is_oa": self.random.random() < 0.3,
+            "is_in_doaj": self.random.random() < 0.2,
+            "homepage_url": "https://example.org",
+            "works_api_url": f"https://api.openalex.org/works?filter=primary_location.source.id:{source_id}",
+            "ids": {
+                "openalex": source_id,
+                "issn_l": issn,
+                "issn": [issn],
+                "mag": ID_BASE + number,
+            },
+        }
+
+    def location(self) -> dict:
+        return {
+            "source": self.dehydrated("S", "sources"),
+            "landing_page_url": "https://doi.org/10.1000/example",
+            "pdf_url": None,
+            "is_oa": self.random.random() < 0.4,
+            "version": "publishedVersion",
+            "license": "cc-by",
+        }
+
+    def abstract(self) -> dict[str, list[int]]:
+        index: dict[str, list[int]] = {}
+        for position in range(self.size.abstract_words):
+            word = self.random.choice(WORDS)
+            index.setdefault(word, []).append(position)
+        return index
+
+    def work(self, number: int) -> dict:
+        work_id = self.id("W", "works", number)
+        title = self.words(10)
+        return {
+            "id": work_id,
+            "doi": f"https://doi.org/10.1000/{number}",
+            "title": title,
+            "display_name": title,
+            "publication_year": 2000 + number % 25,
+            "publication_date": f"{2000 + number % 25}-01-01",
+            "type": "article",
+            "cited_by_count": self.random.randrange(500),
+            "is_retracted": False,
+            "is_paratext": False,
+            "cited_by_api_url": f"https://api.openalex.org/works?filter=cites:{work_id}",
+            "abstract_inverted_index": self.abstract(),
+            "language": "en",
+            "primary_location": self.location(),
+            "locations": [self.location() for _ in range(2)],
+            "best_oa_location": self.location(),
+            "authorships": [
+                {
+                    "author_position": "first" if position == 0 else "middle",
+                    "author": self.dehydrated("A", "authors"),
+                    "institutions": [self.dehydrated("I", "institutions")],
+                    "raw_affiliation_string": self.words(6),
+                }
+                for position in range(self.size.authorships)
+            ],
+            "biblio": {
+                "volume": "12",
+                "issue": "3",
+                "first_page": "1",
+                "last_page": "9",
+            },
+            "topics": [
+                self.dehydrated("T", "topics") | {"score": self.random.random()}
+                for _ in range(3)
+            ],
+            "concepts": [
+                self.dehydrated("C", "concepts") | {"score": self.random.random()}
+                for _ in range(8)
+            ],
+            "ids": {
+                "openalex": work_id,
+                "doi": f"https://doi.org/10.1000/{number}",
+                "mag": ID_BASE + number,
+                "pmid": f"https://pubmed.ncbi.nlm.nih.gov/{number}",
+            },
+            "mesh": [
+                {
+                    "descriptor_ui": "D000001",
+                    "descriptor_name": self.words(2),
+                    "qualifier_ui": "",
+                    "qualifier_name": None,
+                    "is_major_topic": self.random.random() < 0.3,
+                }
+                for _ in range(3)
+            ],
+            "open_access": {
+                "is_oa": True,
+                "oa_status": "gold",
+                "oa_url": "https://example.org/pdf",
+                "any_repository_has_fulltext": False,
+            },
+            "referenced_works": [
+                self.id("W", "works") for _ in range(self.size.references)
+            ],
+            "related_works": [self.id("W", "works") for _ in range(10)],
+            "counts_by_year": self.counts_by_year(),
+            "updated_date": self.updated_date,
+            "created_date": "2016-06-24",
+        }
+
+    def records(self, entity: str) -> Callable[[int], dict]:
+        return {
+            "authors": self.author,
+            "topics": self.topic,
+            "concepts": self.concept,
+            "institutions": self.institution,
+            "publishers": self.publisher,
+            "sources": self.source,
+            "works": self.work,
+        }[entity]
+
+
+def write_snapshot(snapshot_dir: str, size: SnapshotSize) -> dict[str, int]:
+    """Write a synthetic snapshot, returning the records written per entity"""
+
+    generator = Generator(size)
+    written = {}
+    first_date = date(2024, 1, 1)
+    for entity, count in size.counts.items():
+        record = generator.records(entity)
+
+        # the records are spread over the partitions, and some of the older
+        # ones are written again into the newest, which never holds an id twice
+        partitions = [
+            list(range(partition, count, size.partitions))
+            for partition in range(size.partitions)
+        ]
+        older = [number for numbers in partitions[:-1] for number in numbers]
+        updated = generator.random.sample(
+            older, min(int(count * size.updated), len(older))
+        )
+        partitions[-1] = sorted(partitions[-1] + updated)
+
+        entries = []
+        for partition, numbers in enumerate(partitions):
+            partition_date = first_date + timedelta(days=partition)
+            generator.updated_date = f"{partition_date}T00:00:00.000000"
+            partition_dir = os.path.join(
+                snapshot_dir, "data", entity, f"updated_date={partition_date}"
+            )
+            os.makedirs(partition_dir, exist_ok=True)
+            for part in range(size.files_per_partition):
+                file_name = os.path.join(partition_dir, f"part_{part:03d}.gz")
+                file_numbers = numbers[part :: size.files_per_partition]
+                with SNAPSHOT_COMPRESSION.open(file_name) as jsonl:
+                    for number in file_numbers:
+                        jsonl.write(dumps(record(number)) + "\n")
+                entries.append(
+                    {
+                        "url": "s3://openalex/"
+                        + os.path.relpath(file_name, snapshot_dir),
+                        "meta": {
+                            "content_length": os.path.getsize(file_name),
+                            "record_count": len(file_numbers),
+                        },
+                    }
+                )
+            written[entity] = written.get(entity, 0) + len(numbers)
+
+        with open(
+            os.path.join(snapshot_dir, "data", entity, "manifest"), "w"
+        ) as manifest:
+            manifest.write(
+                dumps(
+                    {
+                        "entries": entries,
+                        "meta": {
+                            "content_length": sum(
+                                entry["meta"]["content_length"] for entry in entries
+                            ),
+                            "record_count": written[entity],
+                        },
+                    }
+                )
+            )
+
+    return written
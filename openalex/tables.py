@@ -0,0 +1,562 @@
+"""The tables an OpenAlex snapshot is flattened into
+
+This is the one list of tables and columns: the flattener writes a CSV file
+per table, db-import.py declares its SQLAlchemy tables from it, and
+generate-sql.py writes the schema and COPY scripts of postgres/ and duckdb/
+from it. Column types are in openalex/columns.py.
+"""
+
+from dataclasses import dataclass
+from functools import cache
+from operator import itemgetter
+from typing import Callable, Iterable
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    name: str
+    columns: tuple[str, ...]
+    # NOT NULL in the schema, and the primary key when it's enabled
+    primary_key: tuple[str, ...] = ()
+    # columns with an index of their own
+    indexes: tuple[str, ...] = ()
+
+    @property
+    def extract(self) -> Callable[[dict], tuple]:
+        return row_getter(self.columns)
+
+    def index_name(self, column: str) -> str:
+        return f"{self.name}_{column}_idx"
+
+
+@cache
+def row_getter(columns: tuple[str, ...]) -> Callable[[dict], tuple]:
+    """A function returning the values of a row dict in the order of
+    columns, None when missing
+
+    Rows usually have every column, which an itemgetter gets twice as fast
+    as tuple(map(row.get, columns)), left for the rows missing some.
+    """
+
+    if len(columns) == 1:
+        # an itemgetter of a single item returns the value itself
+        return lambda row: (row.get(columns[0]),)
+
+    get_all = itemgetter(*columns)
+
+    def get(row: dict) -> tuple:
+        try:
+            return get_all(row)
+        except KeyError:
+            return tuple(map(row.get, columns))
+
+    return get
+
+
+# tables of each entity, the entity's own table first; the first column of
+# every table is the entity id, indexed in every other table, where merges
+# delete the stored rows of the entities they replace
+SCHEMA: dict[str, tuple[TableSpec, ...]] = {
+    "authors": (
+        TableSpec(
+            "authors",
+            (
+                "id",
+                "orcid",
+                "display_name",
+                "display_name_alternatives",
+                "works_count",
+                "cited_by_count",
+                "last_known_institution",
+                "works_api_url",
+                "updated_date",
+            ),
+            primary_key=("id",),
+        ),
+        TableSpec(
+            "authors_ids",
+            (
+                "author_id",
+                "openalex",
+                "orcid",
+                "scopus",
+                "twitter",
+                "wikipedia",
+                "mag",
+            ),
+            primary_key=("author_id",),
+            indexes=("author_id",),
+        ),
+        TableSpec(
+            "authors_counts_by_year",
+            (
+                "author_id",
+                "year",
+                "works_count",
+                "cited_by_count",
+                "oa_works_count",
+            ),
+            primary_key=(
+                "author_id",
+                "year",
+            ),
+            indexes=("author_id",),
+        ),
+    ),
+    "topics": (
+        TableSpec(
+            "topics",
+            (
+                "id",
+                "display_name",
+                "subfield_id",
+                "subfield_display_name",
+                "field_id",
+                "field_display_name",
+                "domain_id",
+                "domain_display_name",
+                "description",
+                "keywords",
+                "works_api_url",
+                "wikipedia_id",
+                "works_count",
+                "cited_by_count",
+                "updated_date",
+                "siblings",
+            ),
+            primary_key=("id",),
+        ),
+    ),
+    "concepts": (
+        TableSpec(
+            "concepts",
+            (
+                "id",
+                "wikidata",
+                "display_name",
+                "level",
+                "description",
+                "works_count",
+                "cited_by_count",
+                "image_url",
+                "image_thumbnail_url",
+                "works_api_url",
+                "updated_date",
+            ),
+            primary_key=("id",),
+        ),
+        TableSpec(
+            "concepts_ancestors",
+            (
+                "concept_id",
+                "ancestor_id",
+            ),
+            indexes=("concept_id",),
+        ),
+        TableSpec(
+            "concepts_counts_by_year",
+            (
+                "concept_id",
+                "year",
+                "works_count",
+                "cited_by_count",
+                "oa_works_count",
+            ),
+            primary_key=(
+                "concept_id",
+                "year",
+            ),
+            indexes=("concept_id",),
+        ),
+        TableSpec(
+            "concepts_ids",
+            (
+                "concept_id",
+                "openalex",
+                "wikidata",
+                "wikipedia",
+                "umls_aui",
+                "umls_cui",
+                "mag",
+            ),
+            primary_key=("concept_id",),
+            indexes=("concept_id",),
+        ),
+        TableSpec(
+            "concepts_related_concepts",
+            (
+                "concept_id",
+                "related_concept_id",
+                "score",
+            ),
+            indexes=(
+                "concept_id",
+                "related_concept_id",
+            ),
+        ),
+    ),
+    "institutions": (
+        TableSpec(
+            "institutions",
+            (
+                "id",
+                "ror",
+                "display_name",
+                "country_code",
+                "type",
+                "homepage_url",
+                "image_url",
+                "image_thumbnail_url",
+                "display_name_acronyms",
+                "display_name_alternatives",
+                "works_count",
+                "cited_by_count",
+                "works_api_url",
+                "updated_date",
+            ),
+            primary_key=("id",),
+        ),
+        TableSpec(
+            "institutions_ids",
+            (
+                "institution_id",
+                "openalex",
+                "ror",
+                "grid",
+                "wikipedia",
+                "wikidata",
+                "mag",
+            ),
+            primary_key=("institution_id",),
+            indexes=("institution_id",),
+        ),
+        TableSpec(
+            "institutions_geo",
+            (
+                "institution_id",
+                "city",
+                "geonames_city_id",
+                "region",
+                "country_code",
+                "country",
+                "latitude",
+                "longitude",
+            ),
+            primary_key=("institution_id",),
+            indexes=("institution_id",),
+        ),
+        TableSpec(
+            "institutions_associated_institutions",
+            (
+                "institution_id",
+                "associated_institution_id",
+                "relationship",
+            ),
+            indexes=("institution_id",),
+        ),
+        TableSpec(
+            "institutions_counts_by_year",
+            (
+                "institution_id",
+                "year",
+                "works_count",
+                "cited_by_count",
+                "oa_works_count",
+            ),
+            primary_key=(
+                "institution_id",
+                "year",
+            ),
+            indexes=("institution_id",),
+        ),
+    ),
+    "publishers": (
+        TableSpec(
+            "publishers",
+            (
+                "id",
+                "display_name",
+                "alternate_titles",
+                "country_codes",
+                "hierarchy_level",
+                "parent_publisher",
+                "works_count",
+                "cited_by_count",
+                "sources_api_url",
+                "updated_date",
+            ),
+            primary_key=("id",),
+        ),
+        TableSpec(
+            "publishers_ids",
+            (
+                "publisher_id",
+                "openalex",
+                "ror",
+                "wikidata",
+            ),
+            indexes=("publisher_id",),
+        ),
+        TableSpec(
+            "publishers_counts_by_year",
+            (
+                "publisher_id",
+                "year",
+                "works_count",
+                "cited_by_count",
+                "oa_works_count",
+            ),
+            primary_key=(
+                "publisher_id",
+                "year",
+            ),
+            indexes=("publisher_id",),
+        ),
+    ),
+    "sources": (
+        TableSpec(
+            "sources",
+            (
+                "id",
+                "issn_l",
+                "issn",
+                "display_name",
+                "publisher",
+                "works_count",
+                "cited_by_count",
+                "is_oa",
+                "is_in_doaj",
+                "homepage_url",
+                "works_api_url",
+                "updated_date",
+            ),
+            primary_key=("id",),
+        ),
+        TableSpec(
+            "sources_ids",
+            (
+                "source_id",
+                "openalex",
+                "issn_l",
+                "issn",
+                "mag",
+                "wikidata",
+                "fatcat",
+            ),
+            indexes=("source_id",),
+        ),
+        TableSpec(
+            "sources_counts_by_year",
+            (
+                "source_id",
+                "year",
+                "works_count",
+                "cited_by_count",
+                "oa_works_count",
+            ),
+            primary_key=(
+                "source_id",
+                "year",
+            ),
+            indexes=("source_id",),
+        ),
+    ),
+    "works": (
+        TableSpec(
+            "works",
+            (
+                "id",
+                "doi",
+                "title",
+                "display_name",
+                "publication_year",
+                "publication_date",
+                "type",
+                "cited_by_count",
+                "is_retracted",
+                "is_paratext",
+                "cited_by_api_url",
+                "abstract_inverted_index",
+                "language",
+            ),
+            primary_key=("id",),
+        ),
+        TableSpec(
+            "works_primary_locations",
+            (
+                "work_id",
+                "source_id",
+                "landing_page_url",
+                "pdf_url",
+                "is_oa",
+                "version",
+                "license",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_locations",
+            (
+                "work_id",
+                "source_id",
+                "landing_page_url",
+                "pdf_url",
+                "is_oa",
+                "version",
+                "license",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_best_oa_locations",
+            (
+                "work_id",
+                "source_id",
+                "landing_page_url",
+                "pdf_url",
+                "is_oa",
+                "version",
+                "license",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_authorships",
+            (
+                "work_id",
+                "author_position",
+                "author_id",
+                "institution_id",
+                "raw_affiliation_string",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_biblio",
+            (
+                "work_id",
+                "volume",
+                "issue",
+                "first_page",
+                "last_page",
+            ),
+            primary_key=("work_id",),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_topics",
+            (
+                "work_id",
+                "topic_id",
+                "score",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_concepts",
+            (
+                "work_id",
+                "concept_id",
+                "score",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_ids",
+            (
+                "work_id",
+                "openalex",
+                "doi",
+                "mag",
+                "pmid",
+                "pmcid",
+            ),
+            primary_key=("work_id",),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_mesh",
+            (
+                "work_id",
+                "descriptor_ui",
+                "descriptor_name",
+                "qualifier_ui",
+                "qualifier_name",
+                "is_major_topic",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_open_access",
+            (
+                "work_id",
+                "is_oa",
+                "oa_status",
+                "oa_url",
+                "any_repository_has_fulltext",
+            ),
+            primary_key=("work_id",),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_referenced_works",
+            (
+                "work_id",
+                "referenced_work_id",
+            ),
+            indexes=("work_id",),
+        ),
+        TableSpec(
+            "works_related_works",
+            (
+                "work_id",
+                "related_work_id",
+            ),
+            indexes=("work_id",),
+        ),
+    ),
+}
+
+
+def table_spec(name: str) -> TableSpec:
+    for specs in SCHEMA.values():
+        for spec in specs:
+            if spec.name == name:
+                return spec
+    raise KeyError(name)
+
+
+def select_tables(
+    entities: Iterable[str] = (), tables: Iterable[str] = ()
+) -> dict[str, tuple[TableSpec, ...]]:
+    """The tables of SCHEMA to write, by entity, for the selected entities
+    (all by default) and tables (all of those entities by default)
+
+    Names may also be given comma-separated. Entities left without a table
+    are left out, and unknown names or tables of entities that aren't
+    selected raise a ValueError.
+    """
+
+    entities = {name for value in entities for name in value.split(",") if name}
+    tables = {name for value in tables for name in value.split(",") if name}
+    if unknown := entities - SCHEMA.keys():
+        raise ValueError(f"unknown entities: {', '.join(sorted(unknown))}")
+    table_names = {spec.name for specs in SCHEMA.values() for spec in specs}
+    if unknown := tables - table_names:
+        raise ValueError(f"unknown tables: {', '.join(sorted(unknown))}")
+
+    selected = {}
+    left = set(tables)
+    for entity, specs in SCHEMA.items():
+        if entities and entity not in entities:
+            continue
+        selected[entity] = tuple(
+            spec for spec in specs if not tables or spec.name in tables
+        )
+        left -= {spec.name for spec in specs}
+    if left:
+        raise ValueError(
+            f"tables of entities that aren't selected: {', '.join(sorted(left))}"
+        )
+
+    return {entity: specs for entity, specs in selected.items() if specs}
@@ -1,10 +1,7 @@
 --
--- PostgreSQL database dump
+-- Written by generate-sql.py from openalex/tables.py, edit the tables there
 --
 
--- Dumped from database version 13.5 (Ubuntu 13.5-2.heroku1+1)
--- Dumped by pg_dump version 14.1
-
 SET statement_timeout = 0;
 SET lock_timeout = 0;
 SET idle_in_transaction_session_timeout = 0;
@@ -27,6 +24,7 @@ SET default_tablespace = '';
 
 SET default_table_access_method = heap;
 
+
 --
 -- Name: authors; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -44,6 +42,21 @@ CREATE TABLE openalex.authors (
 );
 
 
+--
+-- Name: authors_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.authors_ids (
+    author_id text NOT NULL,
+    openalex text,
+    orcid text,
+    scopus text,
+    twitter text,
+    wikipedia text,
+    mag bigint
+);
+
+
 --
 -- Name: authors_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -58,20 +71,9 @@ CREATE TABLE openalex.authors_counts_by_year (
 
 
 --
--- Name: authors_ids; Type: TABLE; Schema: openalex; Owner: -
+-- Name: topics; Type: TABLE; Schema: openalex; Owner: -
 --
 
-CREATE TABLE openalex.authors_ids (
-    author_id text NOT NULL,
-    openalex text,
-    orcid text,
-    scopus text,
-    twitter text,
-    wikipedia text,
-    mag bigint
-);
-
-
 CREATE TABLE openalex.topics (
     id text NOT NULL,
     display_name text,
@@ -91,6 +93,7 @@ CREATE TABLE openalex.topics (
     siblings json
 );
 
+
 --
 -- Name: concepts; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -182,26 +185,17 @@ CREATE TABLE openalex.institutions (
 
 
 --
--- Name: institutions_associated_institutions; Type: TABLE; Schema: openalex; Owner: -
---
-
-CREATE TABLE openalex.institutions_associated_institutions (
-    institution_id text,
-    associated_institution_id text,
-    relationship text
-);
-
-
---
--- Name: institutions_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+-- Name: institutions_ids; Type: TABLE; Schema: openalex; Owner: -
 --
 
-CREATE TABLE openalex.institutions_counts_by_year (
+CREATE TABLE openalex.institutions_ids (
     institution_id text NOT NULL,
-    year integer NOT NULL,
-    works_count integer,
-    cited_by_count integer,
-    oa_works_count integer
+    openalex text,
+    ror text,
+    grid text,
+    wikipedia text,
+    wikidata text,
+    mag bigint
 );
 
 
@@ -222,17 +216,26 @@ CREATE TABLE openalex.institutions_geo (
 
 
 --
--- Name: institutions_ids; Type: TABLE; Schema: openalex; Owner: -
+-- Name: institutions_associated_institutions; Type: TABLE; Schema: openalex; Owner: -
 --
 
-CREATE TABLE openalex.institutions_ids (
+CREATE TABLE openalex.institutions_associated_institutions (
+    institution_id text,
+    associated_institution_id text,
+    relationship text
+);
+
+
+--
+-- Name: institutions_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.institutions_counts_by_year (
     institution_id text NOT NULL,
-    openalex text,
-    ror text,
-    grid text,
-    wikipedia text,
-    wikidata text,
-    mag bigint
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
 );
 
 
@@ -254,6 +257,18 @@ CREATE TABLE openalex.publishers (
 );
 
 
+--
+-- Name: publishers_ids; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.publishers_ids (
+    publisher_id text,
+    openalex text,
+    ror text,
+    wikidata text
+);
+
+
 --
 -- Name: publishers_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -267,18 +282,6 @@ CREATE TABLE openalex.publishers_counts_by_year (
 );
 
 
---
--- Name: publishers_ids; Type: TABLE; Schema: openalex; Owner: -
---
-
-CREATE TABLE openalex.publishers_ids (
-    publisher_id text,
-    openalex text,
-    ror text,
-    wikidata text
-);
-
-
 --
 -- Name: sources; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -299,19 +302,6 @@ CREATE TABLE openalex.sources (
 );
 
 
---
--- Name: sources_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
---
-
-CREATE TABLE openalex.sources_counts_by_year (
-    source_id text NOT NULL,
-    year integer NOT NULL,
-    works_count integer,
-    cited_by_count integer,
-    oa_works_count integer
-);
-
-
 --
 -- Name: sources_ids; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -327,6 +317,19 @@ CREATE TABLE openalex.sources_ids (
 );
 
 
+--
+-- Name: sources_counts_by_year; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.sources_counts_by_year (
+    source_id text NOT NULL,
+    year integer NOT NULL,
+    works_count integer,
+    cited_by_count integer,
+    oa_works_count integer
+);
+
+
 --
 -- Name: works; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -347,6 +350,7 @@ CREATE TABLE openalex.works (
     language text
 );
 
+
 --
 -- Name: works_primary_locations; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -417,6 +421,7 @@ CREATE TABLE openalex.works_biblio (
     last_page text
 );
 
+
 --
 -- Name: works_topics; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -427,6 +432,7 @@ CREATE TABLE openalex.works_topics (
     score real
 );
 
+
 --
 -- Name: works_concepts; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -500,11 +506,11 @@ CREATE TABLE openalex.works_related_works (
 
 
 ----
----- Name: authors_counts_by_year authors_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: authors authors_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.authors_counts_by_year
---    ADD CONSTRAINT authors_counts_by_year_pkey PRIMARY KEY (author_id, year);
+--ALTER TABLE ONLY openalex.authors
+--    ADD CONSTRAINT authors_pkey PRIMARY KEY (id);
 --
 --
 ----
@@ -516,11 +522,27 @@ CREATE TABLE openalex.works_related_works (
 --
 --
 ----
----- Name: authors authors_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: authors_counts_by_year authors_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.authors
---    ADD CONSTRAINT authors_pkey PRIMARY KEY (id);
+--ALTER TABLE ONLY openalex.authors_counts_by_year
+--    ADD CONSTRAINT authors_counts_by_year_pkey PRIMARY KEY (author_id, year);
+--
+--
+----
+---- Name: topics topics_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE ONLY openalex.topics
+--    ADD CONSTRAINT topics_pkey PRIMARY KEY (id);
+--
+--
+----
+---- Name: concepts concepts_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE ONLY openalex.concepts
+--    ADD CONSTRAINT concepts_pkey PRIMARY KEY (id);
 --
 --
 ----
@@ -540,19 +562,19 @@ CREATE TABLE openalex.works_related_works (
 --
 --
 ----
----- Name: concepts concepts_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: institutions institutions_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.concepts
---    ADD CONSTRAINT concepts_pkey PRIMARY KEY (id);
+--ALTER TABLE ONLY openalex.institutions
+--    ADD CONSTRAINT institutions_pkey PRIMARY KEY (id);
 --
 --
 ----
----- Name: institutions_counts_by_year institutions_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: institutions_ids institutions_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.institutions_counts_by_year
---    ADD CONSTRAINT institutions_counts_by_year_pkey PRIMARY KEY (institution_id, year);
+--ALTER TABLE ONLY openalex.institutions_ids
+--    ADD CONSTRAINT institutions_ids_pkey PRIMARY KEY (institution_id);
 --
 --
 ----
@@ -564,27 +586,35 @@ CREATE TABLE openalex.works_related_works (
 --
 --
 ----
----- Name: institutions_ids institutions_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: institutions_counts_by_year institutions_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.institutions_ids
---    ADD CONSTRAINT institutions_ids_pkey PRIMARY KEY (institution_id);
+--ALTER TABLE ONLY openalex.institutions_counts_by_year
+--    ADD CONSTRAINT institutions_counts_by_year_pkey PRIMARY KEY (institution_id, year);
 --
 --
 ----
----- Name: institutions institutions_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: publishers publishers_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
---ALTER TABLE ONLY openalex.institutions
---    ADD CONSTRAINT institutions_pkey PRIMARY KEY (id);
+--ALTER TABLE ONLY openalex.publishers
+--    ADD CONSTRAINT publishers_pkey PRIMARY KEY (id);
 --
 --
 ----
----- Name: sources source_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+---- Name: publishers_counts_by_year publishers_counts_by_year_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE ONLY openalex.publishers_counts_by_year
+--    ADD CONSTRAINT publishers_counts_by_year_pkey PRIMARY KEY (publisher_id, year);
+--
+--
+----
+---- Name: sources sources_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
 --ALTER TABLE ONLY openalex.sources
---    ADD CONSTRAINT source_pkey PRIMARY KEY (id);
+--    ADD CONSTRAINT sources_pkey PRIMARY KEY (id);
 --
 --
 ----
@@ -596,6 +626,14 @@ CREATE TABLE openalex.works_related_works (
 --
 --
 ----
+---- Name: works works_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE ONLY openalex.works
+--    ADD CONSTRAINT works_pkey PRIMARY KEY (id);
+--
+--
+----
 ---- Name: works_biblio works_biblio_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
@@ -619,20 +657,36 @@ CREATE TABLE openalex.works_related_works (
 --    ADD CONSTRAINT works_open_access_pkey PRIMARY KEY (work_id);
 --
 --
-----
----- Name: works works_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
-----
+
 --
---ALTER TABLE ONLY openalex.works
---    ADD CONSTRAINT works_pkey PRIMARY KEY (id);
+-- Name: authors_ids_author_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
+CREATE INDEX authors_ids_author_id_idx ON openalex.authors_ids USING btree (author_id);
+
+--
+-- Name: authors_counts_by_year_author_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX authors_counts_by_year_author_id_idx ON openalex.authors_counts_by_year USING btree (author_id);
+
 --
 -- Name: concepts_ancestors_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX concepts_ancestors_concept_id_idx ON openalex.concepts_ancestors USING btree (concept_id);
 
+--
+-- Name: concepts_counts_by_year_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_counts_by_year_concept_id_idx ON openalex.concepts_counts_by_year USING btree (concept_id);
+
+--
+-- Name: concepts_ids_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX concepts_ids_concept_id_idx ON openalex.concepts_ids USING btree (concept_id);
 
 --
 -- Name: concepts_related_concepts_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
@@ -640,34 +694,128 @@ CREATE INDEX concepts_ancestors_concept_id_idx ON openalex.concepts_ancestors US
 
 CREATE INDEX concepts_related_concepts_concept_id_idx ON openalex.concepts_related_concepts USING btree (concept_id);
 
-
 --
 -- Name: concepts_related_concepts_related_concept_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX concepts_related_concepts_related_concept_id_idx ON openalex.concepts_related_concepts USING btree (related_concept_id);
 
+--
+-- Name: institutions_ids_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_ids_institution_id_idx ON openalex.institutions_ids USING btree (institution_id);
+
+--
+-- Name: institutions_geo_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_geo_institution_id_idx ON openalex.institutions_geo USING btree (institution_id);
+
+--
+-- Name: institutions_associated_institutions_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_associated_institutions_institution_id_idx ON openalex.institutions_associated_institutions USING btree (institution_id);
+
+--
+-- Name: institutions_counts_by_year_institution_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX institutions_counts_by_year_institution_id_idx ON openalex.institutions_counts_by_year USING btree (institution_id);
+
+--
+-- Name: publishers_ids_publisher_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX publishers_ids_publisher_id_idx ON openalex.publishers_ids USING btree (publisher_id);
+
+--
+-- Name: publishers_counts_by_year_publisher_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX publishers_counts_by_year_publisher_id_idx ON openalex.publishers_counts_by_year USING btree (publisher_id);
+
+--
+-- Name: sources_ids_source_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX sources_ids_source_id_idx ON openalex.sources_ids USING btree (source_id);
+
+--
+-- Name: sources_counts_by_year_source_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX sources_counts_by_year_source_id_idx ON openalex.sources_counts_by_year USING btree (source_id);
+
 --
 -- Name: works_primary_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX works_primary_locations_work_id_idx ON openalex.works_primary_locations USING btree (work_id);
 
-
 --
 -- Name: works_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX works_locations_work_id_idx ON openalex.works_locations USING btree (work_id);
 
-
 --
 -- Name: works_best_oa_locations_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
 
 CREATE INDEX works_best_oa_locations_work_id_idx ON openalex.works_best_oa_locations USING btree (work_id);
 
+--
+-- Name: works_authorships_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_authorships_work_id_idx ON openalex.works_authorships USING btree (work_id);
+
+--
+-- Name: works_biblio_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_biblio_work_id_idx ON openalex.works_biblio USING btree (work_id);
+
+--
+-- Name: works_topics_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_topics_work_id_idx ON openalex.works_topics USING btree (work_id);
+
+--
+-- Name: works_concepts_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_concepts_work_id_idx ON openalex.works_concepts USING btree (work_id);
 
 --
--- PostgreSQL database dump complete
+-- Name: works_ids_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
 --
+
+CREATE INDEX works_ids_work_id_idx ON openalex.works_ids USING btree (work_id);
+
+--
+-- Name: works_mesh_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_mesh_work_id_idx ON openalex.works_mesh USING btree (work_id);
+
+--
+-- Name: works_open_access_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_open_access_work_id_idx ON openalex.works_open_access USING btree (work_id);
+
+--
+-- Name: works_referenced_works_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_referenced_works_work_id_idx ON openalex.works_referenced_works USING btree (work_id);
+
+--
+-- Name: works_related_works_work_id_idx; Type: INDEX; Schema: openalex; Owner: -
+--
+
+CREATE INDEX works_related_works_work_id_idx ON openalex.works_related_works USING btree (work_id);